@@ -1,4 +1,8 @@
 import heapq
+import math
+from operator import sub
+import numpy as np
+from collections import OrderedDict
 from typing import Dict, Tuple, List, Optional
 from graph_utils import euclidean_distance
 
@@ -32,4 +36,258 @@ def astar(graph: Dict[int, List[Tuple[int, float]]], nodes_pos: Dict[int, Tuple[
                 g_score[neighbor] = tentative_g
                 f_score[neighbor] = tentative_g + euclidean_distance(nodes_pos[neighbor], nodes_pos[goal])
                 heapq.heappush(open_set, (f_score[neighbor], neighbor))
-    return None 
\ No newline at end of file
+    return None 
+
+class CSRGraph:
+    """
+    Sıkıştırılmış satır (CSR) biçiminde yönlü graf.
+    i. düğümün kenarları targets[offsets[i]:offsets[i+1]] ve aynı aralıktaki weights'tir.
+    node_ids: indeks -> düğüm id, positions: (V, 2) koordinatlar (opsiyonel)
+    version, kenarlar her değiştiğinde artar; önbellekler buna göre geçersiz kılınır.
+    """
+
+    def __init__(self, node_ids: List[int], offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray, positions: Optional[np.ndarray] = None):
+        self.node_ids = list(node_ids)
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=float)
+        self.positions = positions
+        self.version = 0
+
+    @classmethod
+    def from_adjacency(cls, graph: Dict[int, List[Tuple[int, float]]], nodes_pos: Optional[Dict[int, Tuple[float, float]]] = None) -> "CSRGraph":
+        """build_graph / build_sparse_graph çıktısından CSR graf üretir."""
+        node_ids = list(graph)
+        known = set(node_ids)
+        for edges in graph.values():
+            for neighbor, _ in edges:
+                if neighbor not in known:
+                    known.add(neighbor)
+                    node_ids.append(neighbor)
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        counts = [len(graph.get(node_id, [])) for node_id in node_ids]
+        offsets = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        targets = np.fromiter((index[n] for node_id in node_ids for n, _ in graph.get(node_id, [])), dtype=np.int64, count=int(offsets[-1]))
+        weights = np.fromiter((c for node_id in node_ids for _, c in graph.get(node_id, [])), dtype=float, count=int(offsets[-1]))
+        positions = None
+        if nodes_pos is not None:
+            positions = np.array([nodes_pos[node_id] for node_id in node_ids], dtype=float).reshape(len(node_ids), 2)
+        return cls(node_ids, offsets, targets, weights, positions)
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def reverse(self) -> "CSRGraph":
+        """Kenar yönleri ters çevrilmiş graf."""
+        sources = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        order = np.argsort(self.targets, kind="stable")
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.targets, minlength=len(self)), out=offsets[1:])
+        return CSRGraph(self.node_ids, offsets, sources[order], self.weights[order], self.positions)
+
+    def set_weight(self, src: int, dst: int, weight: float):
+        """src -> dst kenarının (düğüm id) ağırlığını değiştirir."""
+        u, v = self.index[src], self.index[dst]
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        hits = np.flatnonzero(self.targets[lo:hi] == v)
+        if len(hits) == 0:
+            raise KeyError((src, dst))
+        self.weights[lo + hits] = weight
+        self.version += 1
+
+    def lists(self):
+        """Sıcak döngüler için Python listeleri (numpy skaler erişiminden hızlı)."""
+        return self.offsets.tolist(), self.targets.tolist(), self.weights.tolist()
+
+
+def dijkstra(csr: CSRGraph, source: int, edges=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tek kaynaktan tüm düğümlere en kısa yol (düğüm indeksleriyle).
+    edges: önceden alınmış csr.lists() (tekrarlı çağrılarda)
+    Dönüş: (dist, pred) — ulaşılamayan düğümlerde dist=inf, pred=-1
+    """
+    offsets, targets, weights = edges if edges is not None else csr.lists()
+    n = len(offsets) - 1
+    dist = [math.inf] * n
+    pred = [-1] * n
+    done = [False] * n
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            nd = d + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+    return np.array(dist), np.array(pred, dtype=np.int64)
+
+
+class AStarEngine:
+    """
+    CSR graf üzerinde kapalı kümeli A* ve ALT (landmark + üçgen eşitsizliği) sezgiseli.
+    Landmark mesafeleri graf başına bir kez hesaplanır; sezgisel her kenar ağırlığı için
+    kabul edilebilirdir (öklid mesafesinin aksine, maliyet < mesafe olduğunda da).
+    (start, goal) sonuçları sınırlı bir LRU önbellekte tutulur; graf değişince boşaltılır.
+    """
+
+    def __init__(self, csr: CSRGraph, num_landmarks: int = 4, cache_size: int = 4096):
+        self.csr = csr
+        self.num_landmarks = num_landmarks
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._prepare()
+
+    def _prepare(self):
+        csr = self.csr
+        self._edges = csr.lists()
+        reverse_edges = csr.reverse().lists()
+        self._version = csr.version
+        self.cache.clear()
+        n = len(csr)
+        landmarks, from_landmark, to_landmark = [], [], []
+        # Uzak nokta seçimi: her yeni landmark, seçilenlere en uzak erişilebilir düğüm
+        closest = np.full(n, np.inf)
+        candidate = 0
+        for _ in range(min(self.num_landmarks, n)):
+            landmarks.append(candidate)
+            forward, _ = dijkstra(csr, candidate, self._edges)
+            backward, _ = dijkstra(csr, candidate, reverse_edges)
+            from_landmark.append(forward)
+            to_landmark.append(backward)
+            closest = np.minimum(closest, np.where(np.isfinite(forward), forward, np.inf))
+            reachable = np.where(np.isfinite(closest), closest, -1.0)
+            reachable[landmarks] = -1.0
+            if reachable.max() <= 0:
+                break
+            candidate = int(reachable.argmax())
+        self.landmarks = landmarks
+        self.from_landmark = np.array(from_landmark).reshape(len(landmarks), n)
+        self.to_landmark = np.array(to_landmark).reshape(len(landmarks), n)
+        # Sezgisel düğüm başına, düğüm ilk görüldüğünde hesaplanır. Düğüm v'nin satırı (d(L,v)..., -d(v,L)...)
+        # olduğundan hedefin satırıyla farkların en büyüğü heuristic_to sınırıdır.
+        self._columns = np.concatenate((self.from_landmark, -self.to_landmark)).T.tolist()
+        self._all_finite = bool(np.isfinite(self.from_landmark).all() and np.isfinite(self.to_landmark).all())
+        # Sorgular arası yeniden kullanılan arama durumu; her sorgu yalnızca dokunduğu girdileri sıfırlar
+        self._g = [math.inf] * n
+        self._h = [None] * n
+        self._came_from = [-1] * n
+        self._closed = [False] * n
+
+    def invalidate(self):
+        """Graf değiştiğinde landmark'ları ve önbelleği yeniler."""
+        self._prepare()
+
+    def heuristic_to(self, goal: int) -> np.ndarray:
+        """Tüm düğümler için hedefe alt sınır: max_L(d(L,t)-d(L,v), d(v,L)-d(t,L))."""
+        with np.errstate(invalid="ignore"):
+            forward = self.from_landmark[:, goal][:, None] - self.from_landmark
+            backward = self.to_landmark - self.to_landmark[:, goal][:, None]
+            bound = np.fmax(np.fmax.reduce(forward, axis=0), np.fmax.reduce(backward, axis=0))
+        return np.fmax(bound, 0.0)
+
+    def search(self, start: int, goal: int) -> Tuple[Optional[List[int]], float]:
+        """
+        İki düğüm id'si arasında en düşük maliyetli yol.
+        Dönüş: (düğüm id listesi veya None, maliyet)
+        """
+        if self.csr.version != self._version:
+            self.invalidate()
+        key = (start, goal)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key]
+        self.misses += 1
+        result = self._search(self.csr.index[start], self.csr.index[goal])
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def _search(self, start: int, goal: int) -> Tuple[Optional[List[int]], float]:
+        """
+        Yalnızca ziyaret edilen düğümlere dokunur: sezgisel bir düğüm ilk kez görüldüğünde hedefin
+        landmark sütunlarıyla hesaplanır; g/h/came_from/closed listeleri sorgu sonunda dokunulan
+        düğümlerde sıfırlanır.
+        """
+        offsets, targets, weights = self._edges
+        columns = self._columns
+        goal_row = columns[goal]
+        g, h, came_from, closed = self._g, self._h, self._came_from, self._closed
+        if self._all_finite:
+            def heuristic(v: int) -> float:
+                bound = max(map(sub, goal_row, columns[v]))
+                return bound if bound > 0.0 else 0.0
+        else:
+            def heuristic(v: int) -> float:
+                # inf - inf (nan) farkları heuristic_to'daki gibi yok sayılır
+                bound = 0.0
+                for a, b in zip(goal_row, columns[v]):
+                    if a - b > bound:
+                        bound = a - b
+                return bound
+
+        touched = [start]
+        g[start] = 0.0
+        h[start] = heuristic(start)
+        open_set = [(h[start], start)]
+        result = None, math.inf
+        try:
+            while open_set:
+                _, current = heapq.heappop(open_set)
+                if closed[current]:
+                    continue
+                if current == goal:
+                    path = [current]
+                    while came_from[current] >= 0:
+                        current = came_from[current]
+                        path.append(current)
+                    node_ids = self.csr.node_ids
+                    result = [node_ids[i] for i in reversed(path)], g[goal]
+                    break
+                closed[current] = True
+                base = g[current]
+                for e in range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[e]
+                    if closed[neighbor]:
+                        continue
+                    tentative_g = base + weights[e]
+                    if tentative_g < g[neighbor]:
+                        estimate = h[neighbor]
+                        if estimate is None:
+                            estimate = h[neighbor] = heuristic(neighbor)
+                            touched.append(neighbor)
+                        if estimate == math.inf:
+                            continue
+                        g[neighbor] = tentative_g
+                        came_from[neighbor] = current
+                        heapq.heappush(open_set, (tentative_g + estimate, neighbor))
+        finally:
+            for v in touched:
+                g[v] = math.inf
+                h[v] = None
+                came_from[v] = -1
+                closed[v] = False
+        return result
+
+    def route(self, stops: List[int]) -> Optional[List[int]]:
+        """Ardışık duraklar (ör. drone başlangıcı + teslimatlar) için tam düğüm yolu."""
+        if not stops:
+            return []
+        full = [stops[0]]
+        for a, b in zip(stops, stops[1:]):
+            path, _ = self.search(a, b)
+            if path is None:
+                return None
+            full.extend(path[1:])
+        return full
@@ -0,0 +1,154 @@
+import matplotlib
+matplotlib.use("Agg")  # Toplu çalıştırmada pencere açılmaz
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+from data_loader import load_drones, load_deliveries, load_noflyzones, load_scenario_objects
+from scenario import compile_scenario
+from genetic import genetic_algorithm, simulate_chromosome
+from decomposition import decomposed_genetic_algorithm, simulate_by_drone
+
+# Çözücüye aktarılan parametreler ve varsayılanları
+DEFAULT_PARAMS = {"pop_size": 30, "generations": 50, "crossover_rate": 0.7, "mutation_rate": 0.2, "seed": 0,
+                  "memetic": False, "incremental": False, "cluster_size": None, "heuristic_fraction": 0.0,
+                  "time_budget": None, "stall_generations": None, "adaptive": False, "deduplicate": False}
+
+# Kümeli çözücünün (cluster_size) desteklemediği parametreler; varsayılan dışı değerler reddedilir
+CLUSTER_UNSUPPORTED = ("time_budget", "stall_generations", "adaptive", "deduplicate", "incremental")
+
+_TEXT_SCENARIO = re.compile(r"^(drones|deliveries|noflyzones)(.*)\.txt$")
+
+def find_scenarios(patterns: Iterable[str]) -> List[Tuple[str, Tuple[str, ...]]]:
+    """
+    Dosya yollarını / glob desenlerini senaryolara çevirir.
+    .bin dosyaları ikili senaryodur; drones*/deliveries*/noflyzones*.txt dosyalarından
+    herhangi biri üçlünün tamamını seçer. Dönüş: [(senaryo adı, dosyalar), ...] (sıralı, tekrarsız)
+    """
+    scenarios = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            directory, name = os.path.split(path)
+            if name.endswith(".bin"):
+                scenarios[path] = (os.path.splitext(name)[0], (path,))
+                continue
+            match = _TEXT_SCENARIO.match(name)
+            if match is None:
+                raise ValueError(f"Senaryo dosyası tanınmadı: {path}")
+            suffix = match.group(2)
+            files = tuple(os.path.join(directory, f"{kind}{suffix}.txt") for kind in ("drones", "deliveries", "noflyzones"))
+            scenarios[files] = (suffix.lstrip("_") or "default", files)
+    return sorted(scenarios.values())
+
+def parameter_grid(grid: Dict[str, List]) -> List[Dict]:
+    """{"pop_size": [20, 50], "seed": [0, 1]} -> tüm kombinasyonlar (DEFAULT_PARAMS ile tamamlanmış)."""
+    unknown = set(grid) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Bilinmeyen parametre: {', '.join(sorted(unknown))}")
+    keys = list(grid)
+    combinations = [{**DEFAULT_PARAMS, **dict(zip(keys, values))} for values in itertools.product(*(grid[k] for k in keys))]
+    for params in combinations:
+        if params["cluster_size"] is not None:
+            ignored = [name for name in CLUSTER_UNSUPPORTED if params[name] != DEFAULT_PARAMS[name]]
+            if ignored:
+                raise ValueError(f"cluster_size ile desteklenmeyen parametre: {', '.join(ignored)}")
+    return combinations
+
+def _load(files: Tuple[str, ...]):
+    if len(files) == 1:
+        return load_scenario_objects(files[0])
+    return load_drones(files[0]), load_deliveries(files[1]), load_noflyzones(files[2])
+
+def run_job(job: Dict) -> Dict:
+    """
+    Tek bir (senaryo, parametre) çalıştırması; işçi süreçte çağrılır.
+    Hata olursa istisna yerine "error" alanlı bir kayıt döner, böylece süpürme durmaz.
+    """
+    record = {"job": job["job"], "scenario": job["name"], "params": job["params"]}
+    try:
+        drones, deliveries, noflyzones = _load(job["files"])
+        params = dict(job["params"])
+        cluster_size = params.pop("cluster_size")
+        incremental = params.pop("incremental")
+        start = time.perf_counter()
+        if cluster_size is not None:
+            # İşçi süreç zaten paraleldir; kümeler sırayla çözülür
+            for name in CLUSTER_UNSUPPORTED:
+                params.pop(name, None)
+            solution, best_fitness = decomposed_genetic_algorithm(drones, deliveries, noflyzones, cluster_size=cluster_size, workers=1, **params)
+            elapsed = time.perf_counter() - start
+            routes = simulate_by_drone(solution, drones, deliveries, noflyzones)
+        else:
+            scenario = compile_scenario(drones, deliveries, noflyzones)
+            solution, best_fitness = genetic_algorithm(drones, deliveries, noflyzones, scenario=scenario, incremental=incremental, **params)
+            elapsed = time.perf_counter() - start
+            routes = simulate_chromosome(solution, drones, deliveries, noflyzones, scenario=scenario).routes
+        record.update({
+            "deliveries": len(deliveries), "drones": len(drones), "noflyzones": len(noflyzones),
+            "delivered": sum(route.delivered[-1] for route in routes),
+            "violations": sum(route.violations[-1] for route in routes),
+            "time_violations": sum(route.time_violations[-1] for route in routes),
+            "fitness": best_fitness, "elapsed": elapsed,
+        })
+        if job.get("png_dir"):
+            from visualize import plot_solution
+            path = os.path.join(job["png_dir"], f"{job['name']}_{job['job']}.png")
+            plot_solution(drones, deliveries, noflyzones, solution, output=path)
+            record["png"] = path
+    except Exception as error:
+        record["error"] = f"{type(error).__name__}: {error}"
+    return record
+
+def run_batch(patterns: Iterable[str], grid: Optional[Dict[str, List]] = None, workers: Optional[int] = None, output=sys.stdout, png_dir: Optional[str] = None) -> int:
+    """
+    Her senaryo x parametre kombinasyonunu bir süreç havuzunda çalıştırır ve her biten
+    çalıştırma için output'a bir JSON satırı yazar (bitiş sırasıyla). Dönüş: hatalı çalıştırma sayısı
+    """
+    if png_dir:
+        os.makedirs(png_dir, exist_ok=True)
+    jobs = [{"job": i, "name": name, "files": files, "params": params, "png_dir": png_dir}
+            for i, ((name, files), params) in enumerate(itertools.product(find_scenarios(patterns), parameter_grid(grid or {})))]
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(run_job, job) for job in jobs]):
+            record = future.result()
+            failures += "error" in record
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+    return failures
+
+def _parse_grid(items: List[str]) -> Dict[str, List]:
+    grid = {}
+    for item in items:
+        key, _, values = item.partition("=")
+        parsed = []
+        for value in values.split(","):
+            try:
+                parsed.append(json.loads(value))
+            except ValueError:
+                parsed.append(value)
+        grid[key] = parsed
+    return grid
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Senaryo süpürmeleri için grafik arayüzsüz toplu çalıştırıcı")
+    parser.add_argument("scenarios", nargs="+", help="senaryo dosyaları ya da glob desenleri (ör. 'data/drones_*.txt' data/*.bin)")
+    parser.add_argument("--grid", action="append", default=[], help="parametre=değer1,değer2 (tekrarlanabilir), ör. pop_size=20,50")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="JSON satırlarının yazılacağı dosya (varsayılan: stdout)")
+    parser.add_argument("--png-dir", help="verilirse her çözüm PNG olarak bu klasöre kaydedilir")
+    args = parser.parse_args()
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        failed = run_batch(args.scenarios, _parse_grid(args.grid), args.workers, out, args.png_dir)
+    finally:
+        if args.output:
+            out.close()
+    sys.exit(1 if failed else 0)
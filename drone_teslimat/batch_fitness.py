@@ -0,0 +1,115 @@
+import numpy as np
+from chromosome import position_drones
+from scenario import CompiledScenario, US_PER_HOUR, US_PER_MINUTE
+from route_state import IncrementalEvaluator
+
+def _hours_to_us(hours: np.ndarray) -> np.ndarray:
+    # timedelta(hours=h) ile aynı mikro saniye yuvarlaması (tam kısım + kesirli kısmın çifte yuvarlanması)
+    whole = np.floor(hours)
+    return whole.astype(np.int64) * US_PER_HOUR + np.rint((hours - whole) * float(US_PER_HOUR)).astype(np.int64)
+
+class PopulationEvaluator:
+    """
+    Popülasyonun tamamını tek NumPy geçişiyle puanlar.
+    Puanlar genetic.fitness ile birebir aynıdır:
+    teslimat × 50 – enerji × 0.1 – ihlal × 1000 – zaman ihlali × time_penalty
+    Batarya kontrolü rota üzerindeki kümülatif enerjiden yapılır; bataryanın yetmediği
+    (ve rotanın geri kalanının değiştiği) nadir satırlar skaler değerlendiriciyle yeniden hesaplanır.
+    """
+
+    def __init__(self, scenario: CompiledScenario, time_penalty: float = 500.0):
+        self.scenario = scenario
+        self.cache = scenario.cache
+        self.time_penalty = time_penalty
+        self.weight = scenario.weight
+        self.window_start = scenario.window_start.astype(np.int64) * US_PER_MINUTE
+        self.window_end = scenario.window_end.astype(np.int64) * US_PER_MINUTE
+        self.max_weight = scenario.max_weight
+        self.battery = scenario.battery
+        self.speed = scenario.speed
+        self.start_node = scenario.start_node
+        self.start_time = np.rint(scenario.ready_minute * US_PER_MINUTE).astype(np.int64)
+        self._scalar = None
+
+    def __call__(self, tours: np.ndarray, splits: np.ndarray) -> np.ndarray:
+        """
+        tours: (P, L) teslimat indeksleri, splits: (P, D+1) rota sınırları
+        Dönüş: (P,) fitness dizisi
+        """
+        tours = np.atleast_2d(tours)
+        splits = np.atleast_2d(splits)
+        rows, length = tours.shape
+        if length == 0:
+            return np.zeros(rows, dtype=float)
+        row_idx = np.arange(rows)[:, None]
+        positions = np.arange(length)[None, :]
+        drone = position_drones(splits, length)
+        seg_start = splits[row_idx, drone]
+
+        # Kapasite ihlali olan teslimatlar atlanır, konum değişmez
+        capacity_ok = self.weight[tours] <= self.max_weight[drone]
+        marked = np.where(capacity_ok, positions, -1)
+        prev_pos = np.full((rows, length), -1, dtype=np.int64)
+        prev_pos[:, 1:] = np.maximum.accumulate(marked, axis=1)[:, :-1]
+        from_start = prev_pos < seg_start
+        prev_node = np.where(from_start, self.start_node[drone], tours[row_idx, np.maximum(prev_pos, 0)])
+        straight = self.cache.distance[prev_node, tours]
+        speed = self.speed[drone]
+
+        # Zone kesişimi uçuş aralığına ([kalkış, varış]), kalkış anı da önceki bacakların kesişimine bağlıdır.
+        # Sabit nokta yinelemesi: her turda en az bir bacak daha kesinleşir, pratikte 2-3 tur yeter.
+        # Etkin zone kesen bacak dolanma yolu varsa onu uçar (mesafe ve süre değişir), yoksa ihlaldir.
+        may_cross = capacity_ok & self.cache.crosses[prev_node, tours]
+        travel_straight = _hours_to_us(straight / speed)
+        if self.cache.detour is not None:
+            detour = self.cache.detour[prev_node, tours]
+            can_detour = may_cross & np.isfinite(detour)
+            travel_detour = _hours_to_us(np.where(can_detour, detour, 0.0) / speed)
+        else:
+            can_detour = np.zeros_like(may_cross)
+        crosses = may_cross
+        for _ in range(length + 1):
+            rerouted = crosses & can_detour
+            delivered = capacity_ok & ~(crosses & ~can_detour)
+            travel_all = np.where(rerouted, travel_detour, travel_straight) if rerouted.any() else travel_straight
+            # Zaman yalnızca başarılı teslimatlarda ilerler
+            travel = np.where(delivered, travel_all, 0)
+            time_cum = np.cumsum(travel, axis=1)
+            time_before = time_cum - travel
+            departure = self.start_time[drone] + time_before - time_before[row_idx, seg_start]
+            updated = np.zeros_like(may_cross)
+            rr, cc = np.nonzero(may_cross)
+            updated[rr, cc] = self.cache.crosses_at(prev_node[rr, cc], tours[rr, cc], departure[rr, cc] / US_PER_MINUTE,
+                                                    (departure[rr, cc] + travel_straight[rr, cc]) / US_PER_MINUTE)
+            if np.array_equal(updated, crosses):
+                break
+            crosses = updated
+        crosses = crosses & ~can_detour
+        distance = np.where(rerouted, detour, straight) if rerouted.any() else straight
+
+        # Rota içi kümülatif enerji (bacaktan önce harcanan)
+        energy = np.where(capacity_ok, distance, 0.0)
+        energy_cum = np.cumsum(energy, axis=1)
+        energy_before = energy_cum - energy
+        consumed = energy_before - energy_before[row_idx, seg_start]
+        remaining = self.battery[drone] - consumed
+        # Sınırdaki yuvarlama farkları da skaler yola bırakılır
+        battery_fail = (capacity_ok & (distance > remaining - 1e-6)).any(axis=1)
+
+        arrival = departure + travel
+        window_start = self.window_start[tours]
+        window_end = self.window_end[tours]
+        time_violations = (delivered & ((arrival < window_start) | (arrival > window_end))).sum(axis=1)
+
+        total_delivered = delivered.sum(axis=1)
+        total_violations = (~capacity_ok).sum(axis=1) + crosses.sum(axis=1)
+        # Skaler fitness ile aynı toplama sırası (bacak bacak ardışık)
+        total_energy = energy_cum[:, -1]
+        scores = (total_delivered * 50) - (total_energy * 0.1) - (total_violations * 1000) - (time_violations * self.time_penalty)
+
+        if battery_fail.any():
+            if self._scalar is None:
+                self._scalar = IncrementalEvaluator(self.scenario, self.time_penalty)
+            for r in np.flatnonzero(battery_fail):
+                scores[r] = self._scalar.evaluate(tours[r], splits[r]).score
+        return scores
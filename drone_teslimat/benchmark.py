@@ -0,0 +1,192 @@
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from data_generator import generate_scenario_arrays
+from graph_utils import build_graph, build_sparse_graph
+from astar import astar, CSRGraph, AStarEngine
+from scenario import CompiledScenario, compile_scenario
+from batch_fitness import PopulationEvaluator
+from route_state import IncrementalEvaluator
+from geometry import LegGeometry
+from chromosome import decode_chromosome
+from genetic import create_initial_population, fitness, genetic_algorithm, simulate_chromosome
+from decomposition import decomposed_genetic_algorithm, simulate_by_drone
+
+# Varsayılan ölçekler: (teslimat, drone)
+DEFAULT_SIZES = [(20, 5), (200, 5), (200, 50), (2000, 50), (2000, 500), (20000, 500)]
+# Yoğun graf (build_graph + astar) en fazla bu kadar düğüme kadar ölçülür
+DENSE_GRAPH_LIMIT = 1000
+# Bu düğüm sayısının üstünde M x M matrisler kurulmaz: fitness bacak bacak (LegGeometry),
+# GA uzamsal ayrıştırmayla (decomposed_genetic_algorithm) ölçülür
+DENSE_MATRIX_LIMIT = 3000
+
+def _timed(fn, *args, repeat: int = 1, **kwargs):
+    """fn'i repeat kez çalıştırır; en kısa süre ve son sonuç döner (gürültüye karşı)."""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def benchmark_scenario(num_deliveries: int, num_drones: int, seed: int = 0, num_noflyzones: Optional[int] = None,
+                       queries: int = 20, fitness_calls: int = 50, pop_size: int = 30, generations: int = 30, repeat: int = 3,
+                       dense_graph_limit: int = DENSE_GRAPH_LIMIT, dense_matrix_limit: int = DENSE_MATRIX_LIMIT, cluster_size: int = 200) -> Dict:
+    """
+    Tek bir ölçekte her adımı ayrı ayrı zamanlar. Senaryo seed ile data_generator'dan üretilir;
+    harita boyutu teslimat yoğunluğu sabit kalacak şekilde büyütülür.
+    Her adım repeat kez çalıştırılıp en kısa süresi kaydedilir; sınırı aşan adımlar {"skipped": neden} olarak kaydedilir.
+    dense_matrix_limit üstünde fitness adımları bacak bacak, GA cluster_size kümelerle ölçülür ("mode" alanı);
+    böylece her ölçekte GA süresi ve çözüm kalitesi kaydedilir.
+    """
+    if num_noflyzones is None:
+        num_noflyzones = max(3, num_deliveries // 100)
+    map_size = int(100 * math.sqrt(max(1.0, num_deliveries / 20)))
+    elapsed, arrays = _timed(generate_scenario_arrays, num_drones, num_deliveries, num_noflyzones, map_size, seed=seed)
+    drones, deliveries, noflyzones = arrays.to_objects()
+    rng = np.random.default_rng(seed)
+    nodes = num_deliveries + num_drones
+    steps = {"generate": {"seconds": elapsed}}
+    query_pairs = [tuple(deliveries[i].id for i in rng.choice(num_deliveries, 2, replace=False)) for _ in range(queries)] if num_deliveries > 1 else []
+
+    if nodes <= dense_graph_limit:
+        elapsed, graph = _timed(build_graph, deliveries, drones, noflyzones, repeat=repeat)
+        steps["build_graph"] = {"seconds": elapsed, "edges": sum(len(edges) for edges in graph.values())}
+        nodes_pos = {d.id: d.pos for d in deliveries}
+        nodes_pos.update({-(i+1): d.start_pos for i, d in enumerate(drones)})
+        times, found = [], 0
+        for start, goal in query_pairs:
+            elapsed, path = _timed(astar, graph, nodes_pos, start, goal, repeat=repeat)
+            times.append(elapsed)
+            found += path is not None
+        steps["astar"] = {"seconds": float(np.mean(times)) if times else 0.0, "queries": len(times), "found": found}
+    else:
+        steps["build_graph"] = steps["astar"] = {"skipped": f"{nodes} düğüm > {dense_graph_limit}"}
+
+    elapsed, sparse = _timed(build_sparse_graph, deliveries, drones, noflyzones, repeat=repeat)
+    steps["build_sparse_graph"] = {"seconds": elapsed, "edges": sum(len(edges) for edges in sparse.graph.values())}
+    elapsed, engine = _timed(lambda: AStarEngine(CSRGraph.from_adjacency(sparse.graph, sparse.nodes_pos)), repeat=repeat)
+    steps["alt_prepare"] = {"seconds": elapsed}
+    times, costs = [], []
+    for start, goal in query_pairs:
+        # Tekrar eden sorgular LRU önbellekten döneceğinden bu adım tek sefer ölçülür
+        elapsed, (path, cost) = _timed(engine.search, start, goal)
+        times.append(elapsed)
+        if path is not None:
+            costs.append(cost)
+    steps["alt_astar"] = {"seconds": float(np.mean(times)) if times else 0.0, "queries": len(times), "found": len(costs),
+                          "mean_cost": float(np.mean(costs)) if costs else None}
+
+    if nodes <= dense_matrix_limit:
+        elapsed, scenario = _timed(compile_scenario, drones, deliveries, noflyzones, repeat=repeat)
+        steps["compile_scenario"] = {"seconds": elapsed}
+        tours, splits = create_initial_population(max(fitness_calls, pop_size), drones, deliveries, rng)
+        chromosomes = [decode_chromosome(tours[i], splits[i], drones, deliveries) for i in range(fitness_calls)]
+        elapsed, _ = _timed(lambda: [fitness(c, drones, deliveries, noflyzones, scenario=scenario) for c in chromosomes], repeat=repeat)
+        steps["fitness"] = {"seconds": elapsed / max(fitness_calls, 1), "calls": fitness_calls}
+        evaluate = PopulationEvaluator(scenario)
+        elapsed, _ = _timed(evaluate, tours, splits, repeat=repeat)
+        steps["batch_fitness"] = {"seconds": elapsed / len(tours), "population": len(tours)}
+        elapsed, (solution, best_fitness) = _timed(genetic_algorithm, drones, deliveries, noflyzones, pop_size=pop_size,
+                                                    generations=generations, seed=seed, scenario=scenario, repeat=repeat)
+        state = simulate_chromosome(solution, drones, deliveries, noflyzones, scenario=scenario)
+        steps["genetic_algorithm"] = {
+            "seconds": elapsed, "pop_size": pop_size, "generations": generations,
+            "best_fitness": best_fitness,
+            "delivered": sum(route.delivered[-1] for route in state.routes),
+            "violations": sum(route.violations[-1] for route in state.routes),
+            "time_violations": sum(route.time_violations[-1] for route in state.routes),
+        }
+    else:
+        steps["compile_scenario"] = {"skipped": f"{nodes} düğüm > {dense_matrix_limit}"}
+        tours, splits = create_initial_population(max(fitness_calls, pop_size), drones, deliveries, rng)
+        chromosomes = [decode_chromosome(tours[i], splits[i], drones, deliveries) for i in range(fitness_calls)]
+        elapsed, _ = _timed(lambda: [fitness(c, drones, deliveries, noflyzones) for c in chromosomes], repeat=repeat)
+        steps["fitness"] = {"seconds": elapsed / max(fitness_calls, 1), "calls": fitness_calls, "mode": "legs"}
+        evaluate = IncrementalEvaluator(CompiledScenario(drones, deliveries, noflyzones, LegGeometry(drones, deliveries, noflyzones)))
+        elapsed, _ = _timed(evaluate, tours, splits, repeat=repeat)
+        steps["batch_fitness"] = {"seconds": elapsed / len(tours), "population": len(tours), "mode": "legs"}
+        elapsed, (solution, best_fitness) = _timed(decomposed_genetic_algorithm, drones, deliveries, noflyzones, cluster_size=cluster_size,
+                                                    pop_size=pop_size, generations=generations, seed=seed, repeat=repeat)
+        routes = simulate_by_drone(solution, drones, deliveries, noflyzones)
+        steps["genetic_algorithm"] = {
+            "seconds": elapsed, "pop_size": pop_size, "generations": generations, "mode": "decomposed", "cluster_size": cluster_size,
+            "best_fitness": best_fitness,
+            "delivered": sum(route.delivered[-1] for route in routes),
+            "violations": sum(route.violations[-1] for route in routes),
+            "time_violations": sum(route.time_violations[-1] for route in routes),
+        }
+    return {"deliveries": num_deliveries, "drones": num_drones, "noflyzones": num_noflyzones, "map_size": map_size,
+            "seed": seed, "steps": steps}
+
+def run_benchmarks(sizes: List[Tuple[int, int]] = DEFAULT_SIZES, seed: int = 0, **options) -> Dict:
+    """Tüm ölçekleri sırayla çalıştırır; sonuç JSON'a yazılabilir bir sözlüktür."""
+    results = []
+    for num_deliveries, num_drones in sizes:
+        print(f"- {num_deliveries} teslimat, {num_drones} drone", file=sys.stderr)
+        results.append(benchmark_scenario(num_deliveries, num_drones, seed=seed, **options))
+    meta = {"commit": _git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "numpy": np.__version__, "platform": platform.platform(), "seed": seed, "options": options}
+    return {"meta": meta, "results": results}
+
+def compare_results(baseline: Dict, current: Dict, tolerance: float = 0.25, min_seconds: float = 0.005) -> List[str]:
+    """
+    İki benchmark çıktısını karşılaştırır. Süresi tolerance oranından fazla artan adımları
+    (min_seconds altındaki gürültü hariç) ve aynı seed ile GA kalitesinin düştüğü ölçekleri listeler.
+    """
+    regressions = []
+    previous = {(r["deliveries"], r["drones"]): r["steps"] for r in baseline["results"]}
+    for result in current["results"]:
+        key = (result["deliveries"], result["drones"])
+        if key not in previous:
+            continue
+        for step, values in result["steps"].items():
+            old = previous[key].get(step, {})
+            if "seconds" not in values or "seconds" not in old:
+                continue
+            if values["seconds"] > max(old["seconds"] * (1 + tolerance), min_seconds):
+                regressions.append(f"{key[0]}x{key[1]} {step}: {old['seconds']:.4f}s -> {values['seconds']:.4f}s")
+            if "best_fitness" in values and values["best_fitness"] < old.get("best_fitness", float("-inf")):
+                regressions.append(f"{key[0]}x{key[1]} {step}: fitness {old['best_fitness']:.2f} -> {values['best_fitness']:.2f}")
+    return regressions
+
+def _parse_sizes(text: str) -> List[Tuple[int, int]]:
+    return [tuple(int(v) for v in item.split("x")) for item in text.split(",")]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Planlayıcılar için tekrarlanabilir ölçekleme benchmark'ı")
+    parser.add_argument("--sizes", type=_parse_sizes, default=DEFAULT_SIZES, help="teslimatxdrone listesi, ör. 20x5,200x50")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--generations", type=int, default=30)
+    parser.add_argument("--pop-size", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cluster-size", type=int, default=200, help="matris sınırı üstündeki ölçeklerde GA küme büyüklüğü")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="karşılaştırılacak önceki benchmark JSON dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    report = run_benchmarks(args.sizes, args.seed, generations=args.generations, pop_size=args.pop_size, repeat=args.repeat,
+                            cluster_size=args.cluster_size)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Sonuçlar {args.output} dosyasına yazıldı")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_results(json.load(f), report, args.tolerance)
+        for line in regressions:
+            print(f"Gerileme: {line}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,56 @@
+import numpy as np
+from typing import Dict, List, Tuple
+from drone import Drone, DeliveryPoint
+
+# Dizi tabanlı kromozom gösterimi:
+#   tour:   teslimat indekslerinin (deliveries listesindeki sıra) dev tur permütasyonu
+#   splits: drone sırasına göre rota sınırları, uzunluk D+1; i. drone'un rotası tour[splits[i]:splits[i+1]]
+
+def encode_chromosome(chromosome: Dict[int, List[int]], drones: List[Drone], deliveries: List[DeliveryPoint]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    {drone_id: [teslimat_id, ...]} sözlüğünü (tour, splits) dizilerine çevirir.
+    """
+    delivery_index = {d.id: i for i, d in enumerate(deliveries)}
+    tour = []
+    splits = [0]
+    for drone in drones:
+        tour.extend(delivery_index[delivery_id] for delivery_id in chromosome.get(drone.id, []))
+        splits.append(len(tour))
+    return np.array(tour, dtype=np.int64), np.array(splits, dtype=np.int64)
+
+def decode_chromosome(tour: np.ndarray, splits: np.ndarray, drones: List[Drone], deliveries: List[DeliveryPoint]) -> Dict[int, List[int]]:
+    """
+    (tour, splits) dizilerini {drone_id: [teslimat_id, ...]} sözlüğüne çevirir.
+    """
+    ids = [deliveries[i].id for i in tour.tolist()]
+    bounds = splits.tolist()
+    return {drone.id: ids[bounds[k]:bounds[k + 1]] for k, drone in enumerate(drones)}
+
+def encode_population(population: List[Dict[int, List[int]]], drones: List[Drone], deliveries: List[DeliveryPoint]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Popülasyonu (P, L) tour ve (P, D+1) splits dizilerine çevirir.
+    Tüm kromozomlar aynı sayıda teslimat içermelidir.
+    """
+    encoded = [encode_chromosome(chrom, drones, deliveries) for chrom in population]
+    tours = np.array([t for t, _ in encoded], dtype=np.int64).reshape(len(encoded), -1)
+    splits = np.array([s for _, s in encoded], dtype=np.int64).reshape(len(encoded), len(drones) + 1)
+    return tours, splits
+
+def position_drones(splits: np.ndarray, length: int) -> np.ndarray:
+    """
+    (P, D+1) splits dizisinden her tur pozisyonunun drone indeksini (P, L) üretir.
+    """
+    splits = np.atleast_2d(splits)
+    rows = splits.shape[0]
+    marks = np.zeros((rows, length + 1), dtype=np.int64)
+    inner = splits[:, 1:-1]
+    np.add.at(marks, (np.repeat(np.arange(rows), inner.shape[1]), inner.ravel()), 1)
+    return np.cumsum(marks, axis=1)[:, :length]
+
+def delivery_owners(tour: np.ndarray, splits: np.ndarray) -> np.ndarray:
+    """
+    Teslimat indeksi -> drone indeksi dizisi (tour bir permütasyon olmalıdır).
+    """
+    owners = np.empty(len(tour), dtype=np.int64)
+    owners[tour] = np.repeat(np.arange(len(splits) - 1), np.diff(splits))
+    return owners
@@ -0,0 +1,190 @@
+import numpy as np
+from typing import List, Optional, Tuple
+from scenario import CompiledScenario
+from graph_utils import knn_pairs
+
+# Kromozom: (tour, splits) dizi çifti, bkz. chromosome.py
+Chromosome = Tuple[np.ndarray, np.ndarray]
+
+def routes_to_chromosome(routes: List[List[int]], leftovers: List[int] = ()) -> Chromosome:
+    """
+    Drone rotalarını (teslimat indeksleri) kromozoma çevirir.
+    Hiçbir drone'a sığmayan teslimatlar rotaların sonuna dağıtılır (kromozom her teslimatı içermelidir);
+    orada atlanmaları önlerindeki durakları etkilemez.
+    """
+    routes = [list(route) for route in routes]
+    for k, delivery in enumerate(leftovers):
+        routes[k % len(routes)].append(delivery)
+    tour = np.array([x for route in routes for x in route], dtype=np.int64)
+    splits = np.zeros(len(routes) + 1, dtype=np.int64)
+    np.cumsum([len(route) for route in routes], out=splits[1:])
+    return tour, splits
+
+class _Fleet:
+    """Kurucu sezgiseller için drone'ların anlık konumu, kalan bataryası ve zamanı (dakika)."""
+
+    def __init__(self, scenario: CompiledScenario):
+        self.scenario = scenario
+        self.distance = scenario.cache.distance
+        self.node = scenario.start_node.copy()
+        self.battery = scenario.battery.copy()
+        self.minute = scenario.ready_minute.copy()
+        self.routes = [[] for _ in range(scenario.num_drones)]
+
+    def fly(self, drone: int, target: int):
+        distance = self.distance[self.node[drone], target]
+        self.routes[drone].append(int(target))
+        self.battery[drone] -= distance
+        self.minute[drone] += distance / self.scenario.speed[drone] * 60
+        self.node[drone] = target
+
+def nearest_neighbor_chromosome(scenario: CompiledScenario, rng: Optional[np.random.Generator] = None, candidates: int = 1) -> Chromosome:
+    """
+    Paralel en yakın komşu: sırası gelen (zamanı en erken) drone, taşıyabildiği, bataryasının yettiği ve
+    uçuş süresince etkin bir zone'u kesmeyen en yakın atanmamış teslimata uçar; aday kalmayan drone durur.
+    rng verilirse en yakın `candidates` aday arasından rastgele seçilir (çeşitli tohumlar için).
+    """
+    fleet = _Fleet(scenario)
+    weight = scenario.weight
+    cache = scenario.cache
+    free = np.ones(scenario.num_deliveries, dtype=bool)
+    active = np.ones(scenario.num_drones, dtype=bool)
+    while free.any() and active.any():
+        drone = int(np.flatnonzero(active)[fleet.minute[active].argmin()])
+        node = fleet.node[drone]
+        idx = np.flatnonzero(free & (weight <= scenario.max_weight[drone]))
+        distance = fleet.distance[node, idx]
+        ok = distance <= fleet.battery[drone]
+        idx, distance = idx[ok], distance[ok]
+        ok = ~cache.crosses_at(node, idx, fleet.minute[drone], fleet.minute[drone] + distance / scenario.speed[drone] * 60)
+        idx, distance = idx[ok], distance[ok]
+        if len(idx) == 0:
+            active[drone] = False
+            continue
+        if rng is not None and candidates > 1 and len(idx) > 1:
+            nearest = np.argpartition(distance, min(candidates, len(idx)) - 1)[:candidates]
+            target = idx[rng.choice(nearest)]
+        else:
+            target = idx[distance.argmin()]
+        fleet.fly(drone, target)
+        free[target] = False
+    return routes_to_chromosome(fleet.routes, np.flatnonzero(free).tolist())
+
+def earliest_deadline_chromosome(scenario: CompiledScenario) -> Chromosome:
+    """
+    Teslimatlar zaman penceresinin bitişine (eşitlikte başlangıcına) göre sırayla atanır. Her teslimat,
+    taşıyabilen, bataryası yeten ve etkin zone kesmeyen drone'lar arasından önce pencereye
+    zamanında varabilen, sonra en kısa bacaklı olana eklenir.
+    """
+    fleet = _Fleet(scenario)
+    cache = scenario.cache
+    drones = np.arange(scenario.num_drones)
+    leftovers = []
+    for target in np.lexsort((scenario.window_start, scenario.window_end)).tolist():
+        distance = fleet.distance[fleet.node, target]
+        arrival = fleet.minute + distance / scenario.speed * 60
+        ok = ((scenario.weight[target] <= scenario.max_weight) & (distance <= fleet.battery)
+              & ~cache.crosses_at(fleet.node, target, fleet.minute, arrival))
+        if not ok.any():
+            leftovers.append(target)
+            continue
+        late = (arrival < scenario.window_start[target]) | (arrival > scenario.window_end[target])
+        # Önce pencereye uyan, sonra en kısa bacak; uygun olmayanlar sona
+        key = np.where(ok, late * (distance.max() + 1.0) + distance, np.inf)
+        fleet.fly(int(drones[key.argmin()]), target)
+    return routes_to_chromosome(fleet.routes, leftovers)
+
+def savings_chromosome(scenario: CompiledScenario, neighbors: int = 10) -> Chromosome:
+    """
+    Açık rotalar için Clarke-Wright tasarruf algoritması. Her teslimat tek duraklı bir zincirle başlar;
+    i ile biten zincir j ile başlayan zincire bağlanınca tasarruf s(i, j) = d(depo, j) - d(i, j)'dir
+    (d(depo, j): j'yi taşıyabilen en yakın drone başlangıcı). Yalnızca en yakın `neighbors` komşu
+    çiftleri, zone kesmeyen bacaklar ve en büyük bataryayı aşmayan zincirler birleştirilir.
+    Zincirler uzundan kısaya, taşıyabilen ve bataryası yeten, başlangıcına en yakın drone'a eklenir.
+    """
+    n = scenario.num_deliveries
+    distance = scenario.cache.distance
+    weight, max_weight = scenario.weight, scenario.max_weight
+    carriers = weight[:, None] <= max_weight[None, :]
+    depot = np.where(carriers.T, distance[scenario.start_node, :n], np.inf).min(axis=0)
+    depot = np.where(np.isfinite(depot), depot, distance[scenario.start_node, :n].min(axis=0))
+    src, dst = knn_pairs(scenario.cache.positions[:n], neighbors)
+    src, dst = np.concatenate((src, dst)), np.concatenate((dst, src))
+    saving = depot[dst] - distance[src, dst]
+    keep = (saving > 0) & ~scenario.cache.crosses[src, dst]
+    src, dst, saving = src[keep], dst[keep], saving[keep]
+    order = np.lexsort((dst, src, -saving))
+    limit = float(scenario.battery.max()) if scenario.num_drones else 0.0
+
+    after = [-1] * n
+    before = [-1] * n
+    # Zincirler birleşim-bul ormanıyla izlenir; uzunluk ve en ağır teslimat kökte tutulur
+    parent = list(range(n))
+    length = [0.0] * n
+    heaviest = weight.tolist()
+    top = float(max_weight.max()) if scenario.num_drones else 0.0
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in zip(src[order].tolist(), dst[order].tolist()):
+        if after[i] >= 0 or before[j] >= 0:
+            continue
+        a, b = find(i), find(j)
+        if a == b:
+            continue
+        merged = length[a] + distance[i, j] + length[b]
+        if merged > limit or max(heaviest[a], heaviest[b]) > top:
+            continue
+        after[i], before[j] = j, i
+        parent[b] = a
+        length[a], heaviest[a] = merged, max(heaviest[a], heaviest[b])
+
+    chains = []
+    for start in range(n):
+        if before[start] < 0:
+            chain, x = [], start
+            while x >= 0:
+                chain.append(x)
+                x = after[x]
+            root = find(start)
+            chains.append((length[root], heaviest[root], chain))
+    chains.sort(key=lambda c: (-c[0], c[2][0]))
+    fleet = _Fleet(scenario)
+    leftovers = []
+    for chain_length, chain_weight, chain in chains:
+        access = distance[fleet.node, chain[0]]
+        able = chain_weight <= max_weight
+        if not able.any():
+            leftovers.extend(chain)
+            continue
+        fits = able & (access + chain_length <= fleet.battery)
+        # Sığan drone yoksa en çok bataryası kalan taşıyıcıya eklenir (sondaki duraklar atlanabilir)
+        drone = int(np.where(fits, access, np.inf).argmin()) if fits.any() else int(np.where(able, fleet.battery, -np.inf).argmax())
+        for x in chain:
+            fleet.fly(drone, x)
+    return routes_to_chromosome(fleet.routes, leftovers)
+
+def heuristic_chromosomes(scenario: CompiledScenario, count: int, rng: np.random.Generator) -> List[Chromosome]:
+    """
+    En fazla count farklı kurucu kromozom: zaman penceresi öncelikli, tasarruf, en yakın komşu ve
+    kalan yerler için rastgeleleştirilmiş en yakın komşu (en yakın 3 aday arasından seçim).
+    """
+    builders = [lambda: earliest_deadline_chromosome(scenario), lambda: savings_chromosome(scenario),
+                lambda: nearest_neighbor_chromosome(scenario)]
+    chromosomes, seen = [], set()
+    attempts = 0
+    while len(chromosomes) < count and attempts < 3 * count + len(builders):
+        if attempts < len(builders):
+            tour, splits = builders[attempts]()
+        else:
+            tour, splits = nearest_neighbor_chromosome(scenario, rng, candidates=3)
+        attempts += 1
+        key = (tour.tobytes(), splits.tobytes())
+        if key not in seen:
+            seen.add(key)
+            chromosomes.append((tour, splits))
+    return chromosomes
@@ -1,6 +1,8 @@
 import random
-from typing import List, Tuple, Dict
+import numpy as np
+from typing import List, Tuple, Dict, Optional
 import datetime
+from scenario_format import ScenarioArrays, save_scenario
 
 def generate_random_drones(num_drones: int, 
                          min_weight: float = 2.0,
@@ -126,6 +128,52 @@ def generate_scenario(num_drones: int = 5,
     print(f"- {num_deliveries} teslimat noktası")
     print(f"- {num_noflyzones} no-fly zone")
 
+def generate_scenario_arrays(num_drones: int = 5,
+                             num_deliveries: int = 20,
+                             num_noflyzones: int = 3,
+                             map_size: int = 100,
+                             time_window_minutes: int = 60,
+                             seed: Optional[int] = None) -> ScenarioArrays:
+    """
+    generate_random_* ile aynı dağılımlardan, tek seferde NumPy ile senaryo dizileri üretir.
+    Aynı seed her zaman aynı senaryoyu verir.
+    """
+    rng = np.random.default_rng(seed)
+    base = 9 * 60  # 09:00
+    drone_start = rng.integers(0, map_size, size=(num_drones, 2), endpoint=True).astype(np.float64)
+    delivery_open = base + rng.integers(0, 60, size=num_deliveries, endpoint=True)
+    zone_open = base + rng.integers(0, 60, size=num_noflyzones, endpoint=True)
+    min_size, max_size = 10, 30
+    centers = rng.integers(min_size, map_size - min_size, size=(num_noflyzones, 2), endpoint=True)
+    half = rng.integers(min_size, max_size, size=num_noflyzones, endpoint=True) // 2
+    corners = np.array([(-1, -1), (1, -1), (1, 1), (-1, 1)])
+    return ScenarioArrays(
+        drone_id=np.arange(1, num_drones + 1, dtype=np.int64),
+        drone_max_weight=np.round(rng.uniform(2.0, 6.0, num_drones), 1),
+        drone_battery=rng.integers(8000, 20000, size=num_drones, endpoint=True, dtype=np.int64),
+        drone_speed=np.round(rng.uniform(5.0, 12.0, num_drones), 1),
+        drone_start=drone_start,
+        delivery_id=np.arange(1, num_deliveries + 1, dtype=np.int64),
+        delivery_pos=rng.integers(0, map_size, size=(num_deliveries, 2), endpoint=True).astype(np.float64),
+        delivery_weight=np.round(rng.uniform(0.5, 5.0, num_deliveries), 1),
+        delivery_priority=rng.integers(1, 5, size=num_deliveries, endpoint=True, dtype=np.int8),
+        delivery_window=np.stack((delivery_open, delivery_open + time_window_minutes), axis=1).astype(np.int16),
+        zone_id=np.arange(1, num_noflyzones + 1, dtype=np.int64),
+        zone_coordinates=(centers[:, None, :] + corners[None, :, :] * half[:, None, None]).astype(np.float64),
+        zone_active=np.stack((zone_open, zone_open + time_window_minutes), axis=1).astype(np.int16),
+    )
+
+def generate_scenario_binary(num_drones: int = 5,
+                             num_deliveries: int = 20,
+                             num_noflyzones: int = 3,
+                             map_size: int = 100,
+                             scenario_name: str = "random",
+                             seed: Optional[int] = None) -> str:
+    """Senaryoyu doğrudan ikili sütunlu formatta data/scenario_{ad}.bin dosyasına yazar."""
+    filename = f"data/scenario_{scenario_name}.bin"
+    save_scenario(filename, generate_scenario_arrays(num_drones, num_deliveries, num_noflyzones, map_size, seed=seed))
+    return filename
+
 if __name__ == "__main__":
     # Örnek kullanım
     generate_scenario(num_drones=5, 
@@ -1,5 +1,6 @@
 from drone import Drone, DeliveryPoint, NoFlyZone
-from typing import List
+from scenario_format import ScenarioArrays, load_scenario, save_scenario
+from typing import List, Tuple
 
 def load_drones(filename: str) -> List[Drone]:
     drones = []
@@ -52,4 +53,21 @@ def load_noflyzones(filename: str) -> List[NoFlyZone]:
             active_time = (parts[9], parts[10])
             zone = NoFlyZone(id=id, coordinates=coordinates, active_time=active_time)
             noflyzones.append(zone)
-    return noflyzones 
\ No newline at end of file
+    return noflyzones
+
+def load_scenario_binary(filename: str, mmap: bool = True) -> ScenarioArrays:
+    """
+    scenario_format ile yazılmış ikili senaryoyu sütunlar halinde yükler.
+    mmap=True iken diziler bellek eşlemlidir; büyük senaryolar tamamen belleğe okunmaz.
+    """
+    return load_scenario(filename, mmap)
+
+def load_scenario_objects(filename: str) -> Tuple[List[Drone], List[DeliveryPoint], List[NoFlyZone]]:
+    """İkili senaryoyu mevcut algoritmaların beklediği dataclass listeleri olarak yükler."""
+    return load_scenario(filename).to_objects()
+
+def convert_text_scenario(drones_file: str, deliveries_file: str, noflyzones_file: str, output_file: str) -> ScenarioArrays:
+    """Mevcut .txt senaryo dosyalarını ikili sütunlu formata çevirir."""
+    scenario = ScenarioArrays.from_objects(load_drones(drones_file), load_deliveries(deliveries_file), load_noflyzones(noflyzones_file))
+    save_scenario(output_file, scenario)
+    return scenario
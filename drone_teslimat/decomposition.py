@@ -0,0 +1,171 @@
+import math
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from drone import Drone, DeliveryPoint, NoFlyZone
+from scenario import compile_scenario
+from chromosome import encode_chromosome, decode_chromosome
+from genetic import genetic_algorithm, fitness, simulate_chromosome
+from local_search import LocalSearch
+from route_state import RouteState
+
+def bisect_clusters(points: np.ndarray, k: int) -> np.ndarray:
+    """
+    Noktaları özyinelemeli koordinat ikiye bölmeyle k eşit boyutlu kümeye ayırır (O(n log n)).
+    Her adımda daha geniş eksen, küme sayılarıyla orantılı sıradaki noktadan bölünür.
+    Dönüş: her noktanın küme indeksi
+    """
+    labels = np.zeros(len(points), dtype=np.int64)
+    stack = [(np.arange(len(points)), k, 0)]
+    while stack:
+        idx, parts, first = stack.pop()
+        if parts == 1 or len(idx) == 0:
+            labels[idx] = first
+            continue
+        left = parts // 2
+        spread = points[idx].max(axis=0) - points[idx].min(axis=0)
+        axis = int(spread.argmax())
+        order = idx[np.argsort(points[idx, axis], kind="stable")]
+        cut = round(len(idx) * left / parts)
+        stack.append((order[:cut], left, first))
+        stack.append((order[cut:], parts - left, first + left))
+    return labels
+
+def kmeans_clusters(points: np.ndarray, k: int, rng: np.random.Generator, iterations: int = 20) -> np.ndarray:
+    """Lloyd k-means (başlangıç: bisect_clusters merkezleri). Boş kalan kümeler atılır ve etiketler sıkıştırılır."""
+    labels = bisect_clusters(points, k)
+    centers = np.array([points[labels == c].mean(axis=0) for c in range(k)])
+    for _ in range(iterations):
+        dist = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_labels = dist.argmin(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for c in range(len(centers)):
+            members = points[labels == c]
+            centers[c] = members.mean(axis=0) if len(members) else points[rng.integers(len(points))]
+    return np.unique(labels, return_inverse=True)[1]
+
+def assign_drones(drone_positions: np.ndarray, centroids: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """
+    Drone'ları kümelere dağıtır: her kümeye teslimat sayısıyla orantılı (en az 1) kota verilir,
+    ardından (drone, küme) çiftleri başlangıç noktası-merkez mesafesine göre açgözlü eşlenir.
+    Dönüş: her drone'un küme indeksi
+    """
+    k, num_drones = len(centroids), len(drone_positions)
+    share = sizes / sizes.sum() * (num_drones - k)
+    quota = np.floor(share).astype(np.int64) + 1
+    # Kalan drone'lar en büyük kesirli paylara
+    for c in np.argsort(-(share - np.floor(share)), kind="stable")[:num_drones - quota.sum()]:
+        quota[c] += 1
+    dist = np.sqrt(((drone_positions[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2))
+    owner = np.full(num_drones, -1, dtype=np.int64)
+    for flat in np.argsort(dist, axis=None, kind="stable"):
+        d, c = divmod(int(flat), k)
+        if owner[d] < 0 and quota[c] > 0:
+            owner[d] = c
+            quota[c] -= 1
+    return owner
+
+def _zone_bboxes(noflyzones: List[NoFlyZone]) -> np.ndarray:
+    coords = [np.array(z.coordinates, dtype=float).reshape(-1, 2) for z in noflyzones]
+    return np.array([(c[:, 0].min(), c[:, 1].min(), c[:, 0].max(), c[:, 1].max()) for c in coords]).reshape(len(coords), 4)
+
+def _zones_within(noflyzones: List[NoFlyZone], bboxes: np.ndarray, points: np.ndarray) -> List[NoFlyZone]:
+    """Noktaların sınır kutusuyla çakışan zone'lar; bu noktalar arasındaki bacaklar yalnızca bunları kesebilir."""
+    if len(points) == 0 or len(noflyzones) == 0:
+        return []
+    x1, y1 = points.min(axis=0)
+    x2, y2 = points.max(axis=0)
+    keep = (bboxes[:, 0] <= x2) & (bboxes[:, 2] >= x1) & (bboxes[:, 1] <= y2) & (bboxes[:, 3] >= y1)
+    return [noflyzones[z] for z in np.flatnonzero(keep)]
+
+def _subproblem(drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], bboxes: np.ndarray):
+    points = np.array([d.pos for d in deliveries] + [d.start_pos for d in drones], dtype=float).reshape(-1, 2)
+    return drones, deliveries, _zones_within(noflyzones, bboxes, points)
+
+def simulate_by_drone(solution: Dict[int, List[int]], drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone]) -> List[RouteState]:
+    """
+    Çözümü drone drone, yalnızca o drone'un teslimatlarını içeren alt senaryolarda simüle eder.
+    simulate_chromosome ile aynı rota durumlarını verir ama tüm senaryo için M x M matris kurmaz.
+    """
+    delivery_by_id = {d.id: d for d in deliveries}
+    bboxes = _zone_bboxes(noflyzones)
+    states = []
+    for drone in drones:
+        route = solution.get(drone.id, [])
+        sub = _subproblem([drone], [delivery_by_id[x] for x in route], noflyzones, bboxes)
+        states.extend(simulate_chromosome({drone.id: route}, *sub).routes)
+    return states
+
+def _solve_cluster(task):
+    drones, deliveries, noflyzones, params = task
+    return genetic_algorithm(drones, deliveries, noflyzones, **params)
+
+def decomposed_genetic_algorithm(drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], cluster_size=50, pop_size=20, generations=50, crossover_rate=0.7, mutation_rate=0.2, seed: Optional[int] = None, workers: Optional[int] = None, memetic: bool = False, method: str = "bisection", repair_neighbors: int = 2, heuristic_fraction: float = 0.0) -> Tuple[Dict[int, List[int]], float]:
+    """
+    Büyük senaryolar için uzamsal ayrıştırma:
+    1) teslimatlar ~cluster_size büyüklüğünde uzamsal kümelere ayrılır ("bisection" ya da "kmeans"),
+    2) drone'lar kümelere teslimat sayısıyla orantılı ve başlangıç noktasına göre dağıtılır,
+    3) her küme ayrı bir genetic_algorithm ile bir süreç havuzunda eşzamanlı çözülür,
+    4) sonuçlar birleştirilir ve komşu küme çiftleri üzerinde yerel aramayla sınır onarımı yapılır.
+    Fitness drone'lar arasında toplanabilir olduğundan alt problemlerin puanları tam olarak toplanır;
+    her alt problem yalnızca kendi sınır kutusuna değen zone'ları görür.
+    Dönüş: (best_solution, best_fitness)
+    """
+    solution = {d.id: [] for d in drones}
+    if not deliveries or not drones:
+        return solution, fitness(solution, drones, deliveries, noflyzones)
+    rng = np.random.default_rng(seed)
+    positions = np.array([d.pos for d in deliveries], dtype=float)
+    k = max(1, min(math.ceil(len(deliveries) / cluster_size), len(drones)))
+    if method == "kmeans":
+        labels = kmeans_clusters(positions, k, rng)
+    elif method == "bisection":
+        labels = bisect_clusters(positions, k)
+    else:
+        raise ValueError(f"Bilinmeyen kümeleme yöntemi: {method}")
+    k = int(labels.max()) + 1
+    sizes = np.bincount(labels, minlength=k)
+    centroids = np.array([positions[labels == c].mean(axis=0) for c in range(k)])
+    owner = assign_drones(np.array([d.start_pos for d in drones], dtype=float), centroids, sizes)
+    bboxes = _zone_bboxes(noflyzones)
+    cluster_drones = [[d for d, o in zip(drones, owner) if o == c] for c in range(k)]
+    cluster_deliveries = [[deliveries[i] for i in np.flatnonzero(labels == c)] for c in range(k)]
+    seeds = np.random.SeedSequence(seed).spawn(k)
+    params = dict(pop_size=pop_size, generations=generations, crossover_rate=crossover_rate, mutation_rate=mutation_rate, memetic=memetic, heuristic_fraction=heuristic_fraction)
+    tasks = [(*_subproblem(cluster_drones[c], cluster_deliveries[c], noflyzones, bboxes), {**params, "seed": seeds[c]})
+             for c in range(k)]
+    if workers is None:
+        workers = min(k, os.cpu_count() or 1)
+    if workers > 1 and k > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_solve_cluster, tasks))
+    else:
+        results = [_solve_cluster(task) for task in tasks]
+    for routes, _ in results:
+        solution.update(routes)
+
+    # Sınır onarımı: her küme, merkezi en yakın repair_neighbors kümeyle birlikte yeniden aranır
+    delivery_by_id = {d.id: d for d in deliveries}
+    if k > 1 and repair_neighbors > 0:
+        gaps = np.sqrt(((centroids[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2))
+        np.fill_diagonal(gaps, np.inf)
+        pairs = sorted({(min(a, int(b)), max(a, int(b))) for a in range(k) for b in np.argsort(gaps[a], kind="stable")[:repair_neighbors]})
+        for a, b in pairs:
+            pair_drones = [d for d, o in zip(drones, owner) if o == a or o == b]
+            pair_deliveries = [delivery_by_id[x] for d in pair_drones for x in solution[d.id]]
+            if not pair_deliveries:
+                continue
+            scenario = compile_scenario(*_subproblem(pair_drones, pair_deliveries, noflyzones, bboxes))
+            tour, splits = encode_chromosome(solution, pair_drones, pair_deliveries)
+            tour, splits, _ = LocalSearch(scenario).improve(tour, splits)
+            solution.update(decode_chromosome(tour, splits, pair_drones, pair_deliveries))
+
+    total = 0.0
+    for c in range(k):
+        routes = {d.id: solution[d.id] for d in cluster_drones[c]}
+        owned = [delivery_by_id[x] for route in routes.values() for x in route]
+        total += fitness(routes, *_subproblem(cluster_drones[c], owned, noflyzones, bboxes))
+    return solution, total
@@ -3,6 +3,7 @@ from typing import Tuple, List
 
 @dataclass
 class Drone:
+    __slots__ = ("id", "max_weight", "battery", "speed", "start_pos")
     id: int
     max_weight: float
     battery: int
@@ -11,6 +12,7 @@ class Drone:
 
 @dataclass
 class DeliveryPoint:
+    __slots__ = ("id", "pos", "weight", "priority", "time_window")
     id: int
     pos: Tuple[float, float]
     weight: float
@@ -19,6 +21,7 @@ class DeliveryPoint:
 
 @dataclass
 class NoFlyZone:
+    __slots__ = ("id", "coordinates", "active_time")
     id: int
     coordinates: List[Tuple[float, float]]
     active_time: Tuple[str, str] 
\ No newline at end of file
@@ -0,0 +1,100 @@
+import hashlib
+import numpy as np
+from collections import OrderedDict
+
+# Bir kaydın yaklaşık bellek maliyeti: 16 baytlık özet (bytes nesnesi), float ve OrderedDict düğümü
+ENTRY_BYTES = 160
+
+def chromosome_key(tour: np.ndarray, splits: np.ndarray) -> bytes:
+    """
+    Kromozomun kanonik anahtarı. (tour, splits) rotaları tek biçimde kodladığından
+    aynı rotalar her zaman aynı anahtarı verir; 128 bitlik blake2b özeti saklanır.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(tour).tobytes())
+    digest.update(np.ascontiguousarray(splits).tobytes())
+    return digest.digest()
+
+class FitnessCache:
+    """
+    Kromozom anahtarı -> fitness LRU önbelleği; kayıt sayısı max_bytes / ENTRY_BYTES ile sınırlıdır.
+    Puanlar senaryoya bağlı olduğundan bir önbellek yalnızca tek bir senaryo için kullanılmalıdır;
+    aynı senaryodaki nesiller, GA çalıştırmaları ve (aynı süreçteki) adalar arasında paylaşılabilir.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entries = max(1, max_bytes // ENTRY_BYTES)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key: bytes):
+        score = self.entries.get(key)
+        if score is not None:
+            self.entries.move_to_end(key)
+        return score
+
+    def put(self, key: bytes, score: float):
+        self.entries[key] = score
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def record(self, hits: int, misses: int):
+        """Başka süreçlerdeki kopyaların sayaçlarını bu önbelleğin istatistiklerine ekler."""
+        self.hits += hits
+        self.misses += misses
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "entries": len(self.entries), "evictions": self.evictions}
+
+class CachedEvaluator:
+    """
+    Toplu değerlendiriciyi (PopulationEvaluator) FitnessCache ile sarar: önbellekte olan ya da aynı
+    çağrıda daha önce görülen kromozomlar yeniden puanlanmaz, kalanlar tek alt toplu geçişte puanlanır.
+    last_hits / last_misses son çağrının sayaçlarıdır.
+    """
+
+    def __init__(self, evaluate, cache: FitnessCache):
+        self.evaluate = evaluate
+        self.cache = cache
+        self.last_hits = 0
+        self.last_misses = 0
+
+    def __call__(self, tours: np.ndarray, splits: np.ndarray) -> np.ndarray:
+        tours = np.atleast_2d(tours)
+        splits = np.atleast_2d(splits)
+        scores = np.empty(len(tours), dtype=float)
+        keys = [chromosome_key(tour, split) for tour, split in zip(tours, splits)]
+        # Önbellekte olmayan her farklı anahtarın ilk satırı puanlanır
+        pending = {}
+        for row, key in enumerate(keys):
+            score = self.cache.get(key)
+            if score is not None:
+                scores[row] = score
+            elif key in pending:
+                pending[key].append(row)
+            else:
+                pending[key] = [row]
+        if pending:
+            first = [rows[0] for rows in pending.values()]
+            computed = self.evaluate(tours[first], splits[first])
+            for (key, rows), score in zip(pending.items(), computed.tolist()):
+                scores[rows] = score
+                self.cache.put(key, score)
+        self.last_misses = len(pending)
+        self.last_hits = len(tours) - self.last_misses
+        self.cache.record(self.last_hits, self.last_misses)
+        return scores
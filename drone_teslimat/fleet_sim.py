@@ -0,0 +1,316 @@
+import argparse
+import bisect
+import heapq
+import json
+import math
+import sys
+import numpy as np
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+from drone import Drone, DeliveryPoint, NoFlyZone
+from scenario_format import ScenarioArrays, minutes_to_time
+from graph_utils import segments_intersect
+from zone_index import NoFlyZoneIndex, segments_cross_polygon, time_to_minutes
+
+# Gecikme histogramı sınırları (dakika); i. kutu [LATENESS_EDGES[i], LATENESS_EDGES[i+1]), zamanında varışlar ilk kutuda
+LATENESS_EDGES = (0, 1, 5, 15, 30, 60, 120, 240, 480)
+
+@dataclass
+class FleetSnapshot:
+    """Akış metriği: simülasyon saati `time`a ulaştığında birikmiş sayaçlar."""
+    time: str
+    delivered: int
+    late: int
+    skipped: int
+    zone_incursions: int
+    swaps: int
+    energy: float
+    in_flight: int              # rotası bitmemiş drone sayısı
+
+# Gözlemci: her metrik diliminin sonunda FleetSnapshot ile çağrılan herhangi bir fonksiyon
+SnapshotObserver = Callable[[FleetSnapshot], None]
+
+@dataclass
+class SimulationReport:
+    """
+    Günün sonucu. Süreler dakika cinsindendir.
+    utilization: drone'un uçuş + servis + batarya değişimi süresinin gün uzunluğuna oranı
+    lateness_counts: LATENESS_EDGES kutularındaki teslimat sayıları
+    """
+    delivered: int
+    late: int
+    early: int
+    skipped_capacity: int
+    skipped_battery: int
+    unserved: int               # gün bitiminde (end_time) uçulmamış duraklar
+    zone_incursions: int
+    swaps: int
+    energy: float
+    makespan: float
+    events: int
+    lateness_edges: List[int]
+    lateness_counts: List[int]
+    drone_ids: np.ndarray
+    busy_minutes: np.ndarray
+    utilization: np.ndarray
+    drone_energy: np.ndarray
+    drone_delivered: np.ndarray
+
+    def summary(self) -> dict:
+        """JSON'a yazılabilir özet (drone başına diziler yerine dağılımları)."""
+        result = {key: value for key, value in asdict(self).items() if not isinstance(value, np.ndarray)}
+        if len(self.utilization):
+            result["utilization"] = {"mean": float(self.utilization.mean()), "min": float(self.utilization.min()),
+                                     "p50": float(np.percentile(self.utilization, 50)), "max": float(self.utilization.max())}
+        result["idle_drones"] = int((self.drone_delivered == 0).sum())
+        return result
+
+class FleetSimulator:
+    """
+    Bir planı ({drone_id: [teslimat_id, ...]}) tam bir iş günü boyunca yeniden oynatan ayrık olay simülatörü.
+    Her drone'un bir sonraki varışı (zaman, sıra, drone) olarak bir yığında durur; her olay O(log D)'dir.
+    Kurallar fitness ile aynı çizgidedir, ancak gerçek zamanlıdır:
+    - taşıyamadığı teslimat atlanır; bataryanın yetmediği bacakta swap_minutes verilmişse drone önce
+      başlangıç noktasına dönüp bataryasını değiştirir, verilmemişse teslimat atlanır,
+    - bacak, uçuş süresince [kalkış, varış] etkin olan bir zone'u keserse uçuş sürer ama ihlal sayılır
+      (uçuş ortasında açılan zone'lar da yakalanır),
+    - wait_for_window=True ise erken varan drone pencere açılana kadar bekler; her durakta service_minutes harcanır.
+    Plandaki bacakların zone kesişimleri başta vektörel hesaplanır; atlama ya da batarya değişimi yüzünden
+    değişen bacaklar olay anında zone ızgarası (NoFlyZoneIndex) üzerinden skaler testle denetlenir.
+    """
+
+    def __init__(self, arrays: ScenarioArrays, service_minutes: float = 0.0, swap_minutes: Optional[float] = None, wait_for_window: bool = False, start_time: str = "09:00", end_time: Optional[str] = None, bucket_minutes: float = 15.0):
+        self.arrays = arrays
+        self.service_minutes = service_minutes
+        self.swap_minutes = swap_minutes
+        self.wait_for_window = wait_for_window
+        self.start_minute = time_to_minutes(start_time)
+        self.end_minute = math.inf if end_time is None else time_to_minutes(end_time)
+        self.bucket_minutes = bucket_minutes
+        self.delivery_index = {int(x): i for i, x in enumerate(arrays.delivery_id.tolist())}
+        self.drone_index = {int(x): i for i, x in enumerate(arrays.drone_id.tolist())}
+        self.zone_coordinates = [[tuple(c) for c in zone] for zone in arrays.zone_coordinates.tolist()]
+        self.zone_active = arrays.zone_active.astype(float)
+        self.zone_index = NoFlyZoneIndex([NoFlyZone(id=i, coordinates=coords, active_time=(minutes_to_time(a), minutes_to_time(b)))
+                                          for i, coords, (a, b) in zip(arrays.zone_id.tolist(), self.zone_coordinates, arrays.zone_active.tolist())])
+        coords = arrays.zone_coordinates
+        self.zone_bbox = np.concatenate((coords.min(axis=1), coords.max(axis=1)), axis=1).reshape(len(coords), 4)
+
+    @classmethod
+    def from_objects(cls, drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], **options) -> "FleetSimulator":
+        return cls(ScenarioArrays.from_objects(drones, deliveries, noflyzones), **options)
+
+    def _leg_zones(self, ax: np.ndarray, ay: np.ndarray, bx: np.ndarray, by: np.ndarray) -> Dict[int, List[int]]:
+        """Bacak indeksi -> geometrik olarak kestiği zone indeksleri (zamandan bağımsız)."""
+        hits = {}
+        x1, x2 = np.minimum(ax, bx), np.maximum(ax, bx)
+        y1, y2 = np.minimum(ay, by), np.maximum(ay, by)
+        for z, (zx1, zy1, zx2, zy2) in enumerate(self.zone_bbox.tolist()):
+            idx = np.flatnonzero((x1 <= zx2) & (x2 >= zx1) & (y1 <= zy2) & (y2 >= zy1))
+            if len(idx) == 0:
+                continue
+            idx = idx[segments_cross_polygon(ax[idx], ay[idx], bx[idx], by[idx], self.zone_coordinates[z])]
+            for leg in idx.tolist():
+                hits.setdefault(leg, []).append(z)
+        return hits
+
+    def _zones_between(self, a, b) -> List[int]:
+        """Tek bacak için _leg_zones; ızgara adayları üzerinde skaler kesişim testi."""
+        hits = []
+        for z in self.zone_index.candidates(a, b):
+            coords = self.zone_coordinates[z]
+            n = len(coords)
+            if any(segments_intersect(a, b, coords[i], coords[(i + 1) % n]) for i in range(n)):
+                hits.append(z)
+        return hits
+
+    def run(self, plan: Dict[int, List[int]], observer: Optional[SnapshotObserver] = None) -> SimulationReport:
+        arrays = self.arrays
+        num_drones = len(arrays.drone_id)
+        routes = [[] for _ in range(num_drones)]
+        for drone_id, route in plan.items():
+            routes[self.drone_index[drone_id]] = [self.delivery_index[x] for x in route]
+
+        # Plandaki bacaklar: (önceki durak ya da başlangıç) -> durak, tümü tek dizide
+        delivery_pos = arrays.delivery_pos
+        lengths = np.array([len(route) for route in routes], dtype=np.int64)
+        first_leg = np.zeros(num_drones + 1, dtype=np.int64)
+        np.cumsum(lengths, out=first_leg[1:])
+        targets = np.array([x for route in routes for x in route], dtype=np.int64)
+        previous = np.roll(targets, 1)
+        is_first = np.zeros(len(targets), dtype=bool)
+        is_first[first_leg[:-1][lengths > 0]] = True
+        owner = np.repeat(np.arange(num_drones), lengths)
+        origins = np.where(is_first[:, None], arrays.drone_start[owner], delivery_pos[previous]).reshape(len(targets), 2)
+        ends = delivery_pos[targets].reshape(len(targets), 2)
+        leg_distance = np.sqrt(((ends - origins) ** 2).sum(axis=1)).tolist()
+        leg_zones = self._leg_zones(origins[:, 0], origins[:, 1], ends[:, 0], ends[:, 1])
+
+        pos = delivery_pos.tolist()
+        weight = arrays.delivery_weight.tolist()
+        window_start = arrays.delivery_window[:, 0].astype(float).tolist()
+        window_end = arrays.delivery_window[:, 1].astype(float).tolist()
+        max_weight = arrays.drone_max_weight.tolist()
+        capacity = arrays.drone_battery.astype(float).tolist()
+        speed = arrays.drone_speed.tolist()
+        depot = arrays.drone_start.tolist()
+        zone_active = self.zone_active.tolist()
+        first = first_leg.tolist()
+
+        battery = list(capacity)
+        location = [tuple(p) for p in depot]
+        nominal = [True] * num_drones       # drone plandaki bir önceki durakta mı (bacak önceden hesaplı)
+        stop = [0] * num_drones             # sıradaki durağın rota içi indeksi
+        pending = [-1] * num_drones         # uçulmakta olan teslimat
+        busy = [0.0] * num_drones
+        drone_energy = [0.0] * num_drones
+        drone_delivered = [0] * num_drones
+        counts = [0] * len(LATENESS_EDGES)
+        delivered = late = early = skipped_capacity = skipped_battery = unserved = incursions = swaps = events = 0
+        energy = 0.0
+        makespan = float(self.start_minute)
+        swap_minutes = self.swap_minutes
+        service = self.service_minutes
+        end_minute = self.end_minute
+
+        heap = [(float(self.start_minute), d, d) for d in range(num_drones) if routes[d]]
+        heapq.heapify(heap)
+        sequence = num_drones
+        in_flight = len(heap)
+        bucket = self.start_minute + self.bucket_minutes
+
+        def snapshot(minute):
+            observer(FleetSnapshot(minutes_to_time(int(minute)), delivered, late, skipped_capacity + skipped_battery,
+                                   incursions, swaps, energy, in_flight))
+
+        while heap:
+            now, _, d = heapq.heappop(heap)
+            events += 1
+            if observer is not None:
+                while now >= bucket:
+                    snapshot(bucket)
+                    bucket += self.bucket_minutes
+            target = pending[d]
+            if target >= 0:
+                # Varış: teslimatı kaydet
+                lateness = now - window_end[target]
+                if lateness > 0:
+                    late += 1
+                elif now < window_start[target]:
+                    early += 1
+                counts[max(0, bisect.bisect_right(LATENESS_EDGES, lateness) - 1)] += 1
+                delivered += 1
+                drone_delivered[d] += 1
+                if self.wait_for_window and now < window_start[target]:
+                    busy[d] += window_start[target] - now
+                    now = window_start[target]
+                busy[d] += service
+                now += service
+                pending[d] = -1
+            # Sıradaki bacağı planla
+            route = routes[d]
+            while stop[d] < len(route):
+                k = stop[d]
+                target = route[k]
+                if now >= end_minute:
+                    unserved += len(route) - k
+                    stop[d] = len(route)
+                    break
+                stop[d] += 1
+                if weight[target] > max_weight[d]:
+                    skipped_capacity += 1
+                    nominal[d] = False
+                    continue
+                origin = location[d]
+                if nominal[d]:
+                    distance = leg_distance[first[d] + k]
+                    zones = leg_zones.get(first[d] + k, ())
+                else:
+                    distance = math.dist(origin, pos[target])
+                    zones = None
+                departure = now
+                if distance > battery[d]:
+                    home = math.dist(origin, depot[d])
+                    direct = math.dist(depot[d], pos[target])
+                    if swap_minutes is None or home > battery[d] or direct > capacity[d]:
+                        skipped_battery += 1
+                        nominal[d] = False
+                        continue
+                    # Başlangıç noktasına dön, bataryayı değiştir, oradan devam et
+                    trip = home / speed[d] * 60
+                    incursions += self._incursions(self._zones_between(origin, depot[d]), departure, departure + trip, zone_active)
+                    energy += home
+                    drone_energy[d] += home
+                    busy[d] += trip + swap_minutes
+                    departure += trip + swap_minutes
+                    battery[d] = capacity[d]
+                    swaps += 1
+                    origin, distance, zones = tuple(depot[d]), direct, None
+                if zones is None:
+                    zones = self._zones_between(origin, pos[target])
+                flight = distance / speed[d] * 60
+                arrival = departure + flight
+                incursions += self._incursions(zones, departure, arrival, zone_active)
+                battery[d] -= distance
+                energy += distance
+                drone_energy[d] += distance
+                busy[d] += flight
+                location[d] = pos[target]
+                nominal[d] = True
+                pending[d] = target
+                sequence += 1
+                heapq.heappush(heap, (arrival, sequence, d))
+                break
+            if pending[d] < 0:
+                in_flight -= 1
+                makespan = max(makespan, now)
+        if observer is not None:
+            snapshot(makespan)
+
+        day = max(makespan - self.start_minute, 1e-9)
+        busy_minutes = np.array(busy)
+        return SimulationReport(
+            delivered=delivered, late=late, early=early, skipped_capacity=skipped_capacity, skipped_battery=skipped_battery,
+            unserved=unserved, zone_incursions=incursions, swaps=swaps, energy=energy, makespan=makespan - self.start_minute,
+            events=events, lateness_edges=list(LATENESS_EDGES), lateness_counts=counts, drone_ids=arrays.drone_id.copy(),
+            busy_minutes=busy_minutes, utilization=busy_minutes / day, drone_energy=np.array(drone_energy),
+            drone_delivered=np.array(drone_delivered, dtype=np.int64))
+
+    @staticmethod
+    def _incursions(zones, departure: float, arrival: float, zone_active) -> int:
+        """Uçuş aralığında [kalkış, varış] etkin olan kesilen zone sayısı (bacak başına en fazla 1)."""
+        for z in zones:
+            start, end = zone_active[z]
+            if departure < end and arrival >= start:
+                return 1
+        return 0
+
+def simulate_plan(plan: Dict[int, List[int]], drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], observer: Optional[SnapshotObserver] = None, **options) -> SimulationReport:
+    """FleetSimulator.from_objects(...).run(plan) kısayolu."""
+    return FleetSimulator.from_objects(drones, deliveries, noflyzones, **options).run(plan, observer)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bir planı ayrık olay simülasyonuyla tam gün boyunca yeniden oynatır")
+    parser.add_argument("scenario", nargs="+", help="ikili senaryo (.bin) ya da drones/deliveries/noflyzones .txt dosyaları")
+    parser.add_argument("--plan", required=True, help='{"drone_id": [teslimat_id, ...]} biçiminde JSON plan')
+    parser.add_argument("--service-minutes", type=float, default=0.0)
+    parser.add_argument("--swap-minutes", type=float, default=None, help="verilirse batarya yetmeyince drone dönüp batarya değiştirir")
+    parser.add_argument("--wait-for-window", action="store_true")
+    parser.add_argument("--end-time", default=None, help="gün bitişi (HH:MM)")
+    parser.add_argument("--bucket-minutes", type=float, default=60.0)
+    parser.add_argument("--stream", action="store_true", help="metrik dilimlerini JSON satırları olarak yaz")
+    args = parser.parse_args()
+    if len(args.scenario) == 1:
+        from scenario_format import load_scenario
+        arrays = load_scenario(args.scenario[0])
+    else:
+        from data_loader import load_drones, load_deliveries, load_noflyzones
+        arrays = ScenarioArrays.from_objects(load_drones(args.scenario[0]), load_deliveries(args.scenario[1]), load_noflyzones(args.scenario[2]))
+    with open(args.plan) as f:
+        plan = {int(drone_id): route for drone_id, route in json.load(f).items()}
+    simulator = FleetSimulator(arrays, service_minutes=args.service_minutes, swap_minutes=args.swap_minutes,
+                               wait_for_window=args.wait_for_window, end_time=args.end_time, bucket_minutes=args.bucket_minutes)
+    observer = (lambda snapshot: print(json.dumps(asdict(snapshot)), flush=True)) if args.stream else None
+    report = simulator.run(plan, observer)
+    json.dump(report.summary(), sys.stdout, indent=2)
+    print()
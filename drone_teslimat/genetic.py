@@ -1,141 +1,336 @@
-import random
-from typing import List, Dict, Tuple
+import time
+import numpy as np
+from typing import List, Dict, Tuple, Optional
 from drone import Drone, DeliveryPoint, NoFlyZone
-from graph_utils import euclidean_distance, edge_crosses_noflyzones
+from geometry import GeometryCache, LegGeometry
+from scenario import CompiledScenario, compile_scenario
+from chromosome import decode_chromosome, delivery_owners
+from batch_fitness import PopulationEvaluator
+from route_state import ChromosomeState, IncrementalEvaluator, Move
+from observer import GenerationStats, Observer
+from local_search import LocalSearch
+from construction import heuristic_chromosomes
+from fitness_cache import CachedEvaluator, FitnessCache, chromosome_key
 from datetime import datetime, timedelta
 
-def create_random_chromosome(drones: List[Drone], deliveries: List[DeliveryPoint]) -> Dict[int, List[int]]:
-    """
-    Her drone'a rastgele teslimat atayan bir kromozom üretir.
-    Dönüş: {drone_id: [teslimat_id, ...], ...}
-    """
-    chromosome = {drone.id: [] for drone in drones}
-    delivery_ids = [d.id for d in deliveries]
-    random.shuffle(delivery_ids)
-    for i, delivery_id in enumerate(delivery_ids):
-        drone = drones[i % len(drones)]
-        chromosome[drone.id].append(delivery_id)
-    return chromosome
+# Kromozom: (tour, splits) dizi çifti, bkz. chromosome.py
+Chromosome = Tuple[np.ndarray, np.ndarray]
 
-def create_initial_population(pop_size: int, drones: List[Drone], deliveries: List[DeliveryPoint]) -> List[Dict[int, List[int]]]:
-    return [create_random_chromosome(drones, deliveries) for _ in range(pop_size)]
+def create_random_chromosome(num_drones: int, num_deliveries: int, rng: np.random.Generator) -> Chromosome:
+    """
+    Teslimatları karıştırıp drone'lara sırayla (round-robin) dağıtan bir kromozom üretir.
+    Dönüş: (tour, splits)
+    """
+    owners = np.arange(num_deliveries) % num_drones
+    tour = rng.permutation(num_deliveries)[np.argsort(owners, kind="stable")]
+    splits = np.zeros(num_drones + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=num_drones), out=splits[1:])
+    return tour, splits
+
+def create_initial_population(pop_size: int, drones: List[Drone], deliveries: List[DeliveryPoint], rng: Optional[np.random.Generator] = None, scenario: Optional[CompiledScenario] = None, heuristic_fraction: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    heuristic_fraction > 0 ise popülasyonun bu kadarı (farklı olanlar) construction.py'deki kurucu
+    sezgisellerden gelir (scenario gerekir); geri kalanı çeşitlilik için rastgeledir.
+    Dönüş: (P, N) tours ve (P, D+1) splits dizileri
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    num_drones, num_deliveries = len(drones), len(deliveries)
+    tours = np.empty((pop_size, num_deliveries), dtype=np.int64)
+    splits = np.empty((pop_size, num_drones + 1), dtype=np.int64)
+    seeds = []
+    if heuristic_fraction > 0 and num_drones > 0:
+        seeds = heuristic_chromosomes(scenario, min(pop_size, round(pop_size * heuristic_fraction)), rng)
+    for i, (tour, split) in enumerate(seeds):
+        tours[i], splits[i] = tour, split
+    for i in range(len(seeds), pop_size):
+        tours[i], splits[i] = create_random_chromosome(num_drones, num_deliveries, rng)
+    return tours, splits
 
 def parse_time(timestr):
     return datetime.strptime(timestr, "%H:%M")
 
-def fitness(chromosome: Dict[int, List[int]], drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], nofly_penalty: float = 1000.0, time_penalty: float = 500.0) -> float:
+def minutes_of_day(moment: datetime) -> float:
+    """parse_time ile üretilen bir zamanı gece yarısından itibaren dakikaya çevirir."""
+    return (moment - parse_time("00:00")) / timedelta(minutes=1)
+
+def simulate_chromosome(chromosome: Dict[int, List[int]], drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], time_penalty: float = 500.0, cache: Optional[GeometryCache] = None, scenario: Optional[CompiledScenario] = None) -> ChromosomeState:
+    """
+    Kromozomu drone drone simüle eder.
+    Derlenmiş senaryo (scenario) verilirse drones/deliveries/noflyzones ve cache kullanılmaz.
+    İkisi de verilmezse senaryo derlenmez (M x M matris kurulmaz); yalnızca rotalardaki bacakların
+    mesafe ve kesişimleri hesaplanır (LegGeometry).
+    Dönüş: her rota için durak durak batarya, zaman ve konum içeren ChromosomeState
+    """
+    if scenario is None:
+        if cache is None:
+            cache = LegGeometry(drones, deliveries, noflyzones)
+        scenario = CompiledScenario(drones, deliveries, noflyzones, cache)
+    evaluator = IncrementalEvaluator(scenario, time_penalty)
+    drone_index, delivery_index = scenario.drone_index, scenario.delivery_index
+    routes = [evaluator.simulate_route(drone_index[drone_id], [delivery_index[delivery_id] for delivery_id in route])
+              for drone_id, route in chromosome.items()]
+    return ChromosomeState(routes, time_penalty)
+
+def fitness(chromosome: Dict[int, List[int]], drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], nofly_penalty: float = 1000.0, time_penalty: float = 500.0, cache: Optional[GeometryCache] = None, scenario: Optional[CompiledScenario] = None) -> float:
     """
     Fitness = teslimat sayısı × 50 – (toplam enerji × 0.1) – (ihlal edilen kısıt × 1000) – (zaman penceresi ihlali × 500)
+    Tekrarlanan çağrılarda senaryo bir kez derlenip (compile_scenario) scenario olarak verilmelidir;
+    verilmezse yalnızca rotadaki bacaklar tek tek hesaplanır (bkz. simulate_chromosome).
+    Rota durumları gerekiyorsa simulate_chromosome kullanılmalıdır.
     """
-    delivery_map = {d.id: d for d in deliveries}
-    drone_map = {d.id: d for d in drones}
-    total_energy = 0.0
-    total_delivered = 0
-    total_violations = 0
-    total_time_violations = 0
-    for drone_id, route in chromosome.items():
-        drone = drone_map[drone_id]
-        current_pos = drone.start_pos
-        current_battery = drone.battery
-        current_time = parse_time("09:00")  # Her drone 09:00'da başlıyor varsayalım
-        for delivery_id in route:
-            delivery = delivery_map[delivery_id]
-            distance = euclidean_distance(current_pos, delivery.pos)
-            travel_time = distance / drone.speed  # saat cinsinden
-            # Kapasite kontrolü
-            if delivery.weight > drone.max_weight:
-                total_violations += 1
-                continue
-            # Batarya kontrolü
-            if distance > current_battery:
-                total_violations += 1
-                continue
-            # No-fly zone kontrolü
-            if edge_crosses_noflyzones(current_pos, delivery.pos, noflyzones):
-                total_violations += 1
-                total_energy += distance
-                current_battery -= distance
-                current_time = current_time  # zaman ilerlemesin
-                current_pos = delivery.pos
-                continue
-            # Zaman penceresi kontrolü
-            arrival_time = current_time + timedelta(hours=travel_time)
-            window_start = parse_time(delivery.time_window[0])
-            window_end = parse_time(delivery.time_window[1])
-            if arrival_time < window_start or arrival_time > window_end:
-                total_time_violations += 1
-            # Başarılı teslimat
-            total_delivered += 1
-            total_energy += distance
-            current_battery -= distance
-            current_time = arrival_time
-            current_pos = delivery.pos
-    return (total_delivered * 50) - (total_energy * 0.1) - (total_violations * 1000) - (total_time_violations * time_penalty)
+    return simulate_chromosome(chromosome, drones, deliveries, noflyzones, time_penalty, cache, scenario).score
 
-def crossover(parent1: Dict[int, List[int]], parent2: Dict[int, List[int]]) -> Dict[int, List[int]]:
+def crossover(parent1: Chromosome, parent2: Chromosome, rng: np.random.Generator) -> Chromosome:
     """
     İki ebeveyn kromozomdan yeni bir çocuk kromozom üretir.
-    Her teslimat rastgele bir ebeveynden alınır.
-    """
-    child = {drone_id: [] for drone_id in parent1}
-    all_deliveries = set()
-    for drone_id in parent1:
-        all_deliveries.update(parent1[drone_id])
-        all_deliveries.update(parent2[drone_id])
-    all_deliveries = list(all_deliveries)
-    random.shuffle(all_deliveries)
-    for delivery_id in all_deliveries:
-        chosen_parent = parent1 if random.random() < 0.5 else parent2
-        for drone_id in chosen_parent:
-            if delivery_id in chosen_parent[drone_id]:
-                child[drone_id].append(delivery_id)
-                break
-    return child
+    Her teslimat rastgele bir ebeveynden alınır ve o ebeveyndeki drone'una,
+    karıştırılmış sırayla eklenir. Teslimat -> drone dizileri sayesinde O(n).
+    """
+    tour1, splits1 = parent1
+    num_drones = len(splits1) - 1
+    owners1 = delivery_owners(tour1, splits1)
+    owners2 = delivery_owners(*parent2)
+    order = rng.permutation(len(tour1))
+    from_first = rng.random(len(tour1)) < 0.5
+    owners = np.where(from_first, owners1[order], owners2[order])
+    # Drone'a göre kararlı sıralama, karıştırılmış ekleme sırasını korur
+    tour = order[np.argsort(owners, kind="stable")]
+    splits = np.zeros(num_drones + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=num_drones), out=splits[1:])
+    return tour, splits
 
-def mutate(chromosome: Dict[int, List[int]], drones: List[Drone]) -> Dict[int, List[int]]:
+def mutate_move(chromosome: Chromosome, rng: np.random.Generator) -> Tuple[Chromosome, Optional[Move]]:
     """
     Rastgele bir teslimatı başka bir drone'a veya rotada başka bir yere atar.
+    Dönüş: (çocuk, hamle) — hamle (drone, rotadaki konum, yeni drone, yeni konum), artımlı değerlendirme için
     """
-    mutant = {k: v[:] for k, v in chromosome.items()}
-    drone_ids = list(mutant.keys())
-    # Tüm teslimatları tek listede topla
-    all_deliveries = [(drone_id, i, delivery_id)
-                      for drone_id in drone_ids
-                      for i, delivery_id in enumerate(mutant[drone_id])]
-    if not all_deliveries:
-        return mutant
-    # Rastgele bir teslimat seç
-    drone_id, idx, delivery_id = random.choice(all_deliveries)
-    # O teslimatı çıkar
-    mutant[drone_id].pop(idx)
+    tour, splits = chromosome
+    if len(tour) == 0:
+        return (tour.copy(), splits.copy()), None
+    # Rastgele bir teslimat seç ve çıkar
+    pos = int(rng.integers(len(tour)))
+    drone = int(np.searchsorted(splits, pos, side="right")) - 1
+    delivery = tour[pos]
+    tour = np.delete(tour, pos)
+    splits = splits.copy()
+    local_pos = pos - int(splits[drone])
+    splits[drone + 1:] -= 1
     # Başka bir drone'a veya aynı drone'da başka bir yere ekle
-    new_drone_id = random.choice(drone_ids)
-    insert_pos = random.randint(0, len(mutant[new_drone_id]))
-    mutant[new_drone_id].insert(insert_pos, delivery_id)
-    return mutant
+    new_drone = int(rng.integers(len(splits) - 1))
+    insert_pos = int(rng.integers(splits[new_drone + 1] - splits[new_drone] + 1))
+    tour = np.insert(tour, splits[new_drone] + insert_pos, delivery)
+    splits[new_drone + 1:] += 1
+    return (tour, splits), (drone, local_pos, new_drone, insert_pos)
 
-def genetic_algorithm(drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], pop_size=20, generations=50, crossover_rate=0.7, mutation_rate=0.2):
-    population = create_initial_population(pop_size, drones, deliveries)
-    best_solution = None
-    best_fitness = float('-inf')
-    for gen in range(generations):
-        scored = [(fitness(chrom, drones, deliveries, noflyzones), chrom) for chrom in population]
-        scored.sort(reverse=True, key=lambda x: x[0])
-        if scored[0][0] > best_fitness:
-            best_fitness = scored[0][0]
-            best_solution = scored[0][1]
+def mutate(chromosome: Chromosome, rng: np.random.Generator) -> Chromosome:
+    """
+    Rastgele bir teslimatı başka bir drone'a veya rotada başka bir yere atar.
+    """
+    return mutate_move(chromosome, rng)[0]
+
+# Uyarlamalı mod: farklı puan oranı bunun altına düşünce çeşitlilik çökmüş sayılır
+DIVERSITY_FLOOR = 0.3
+MAX_MUTATION_RATE = 0.9
+
+def evolve_population(tours: np.ndarray, splits: np.ndarray, evaluate, generations: Optional[int], rng: np.random.Generator, crossover_rate=0.7, mutation_rate=0.2, best: Optional[Chromosome] = None, best_fitness: float = float('-inf'), observer: Optional[Observer] = None, local_search: Optional[LocalSearch] = None, deadline: Optional[float] = None, stall_generations: Optional[int] = None, adaptive: bool = False, deduplicate: bool = False):
+    """
+    Popülasyonu verilen nesil sayısı kadar evrilir.
+    evaluate bir PopulationEvaluator (toplu) ya da IncrementalEvaluator (artımlı) olabilir;
+    ikisi de aynı puanları verdiğinden aynı seed ile aynı sonuca ulaşılır.
+    Ada modelinde dönemler arasında durumu taşıyabilmek için en iyi çözüm girdi olarak da alınır.
+    observer verilirse her nesilden sonra GenerationStats ile çağrılır; verilmezse süre ölçülmez.
+    local_search verilirse her nesilde elit kromozomlar yerel aramayla iyileştirilir (memetik GA).
+    Erken durma (ilk nesil her zaman tamamlanır): deadline (time.perf_counter() anı) geçtiyse ya da
+    en iyi puan stall_generations nesildir artmadıysa yeni nesle başlanmaz; generations None ise
+    yalnızca bunlarla durulur.
+    adaptive=True ise çeşitlilik çöktüğünde (DIVERSITY_FLOOR) mutasyon oranı artırılır ve popülasyon
+    rastgele göçmenlerle başlangıç boyutunun iki katına kadar büyütülür; çeşitlilik dönünce ikisi de
+    başlangıç değerlerine geri çekilir.
+    evaluate bir CachedEvaluator ise önbellekten gelen puanlar değerlendirme sayısına katılmaz.
+    deduplicate=True ise yeni nesilde daha önce üretilmiş (ya da elit) bir kromozomun kopyası
+    mutasyonla, birkaç denemede ayrışmazsa rastgele bir kromozomla değiştirilir.
+    Dönüş: (tours, splits, best, best_fitness, puanlanan nesil sayısı)
+    """
+    pop_size = len(tours)
+    base_size, base_mutation_rate = pop_size, mutation_rate
+    step = max(1, base_size // 4)
+    num_drones, num_deliveries = splits.shape[1] - 1, tours.shape[1]
+    incremental = isinstance(evaluate, IncrementalEvaluator)
+    cached = isinstance(evaluate, CachedEvaluator)
+    observing = observer is not None
+    if observing:
+        started = time.perf_counter()
+        evaluations = cache_hits = duplicates = 0
+    if incremental:
+        states = [evaluate.evaluate(tours[i], splits[i]) for i in range(pop_size)]
+        if observing:
+            evaluations = pop_size
+    gen = stalled = 0
+    while generations is None or gen < generations:
+        if gen > 0 and ((deadline is not None and time.perf_counter() >= deadline)
+                        or (stall_generations is not None and stalled >= stall_generations)):
+            break
+        pop_size = len(tours)
+        num_elite = max(1, pop_size//10)
+        if observing:
+            t_eval = t_select = t_cross = t_mut = t_local = 0.0
+            mark = time.perf_counter()
+        if incremental:
+            scores = np.array([state.score for state in states])
+            # Değişmeden devralınan rotalar bu tablodan yeniden kullanılır
+            memo = {(route.drone, route.route): route for state in states for route in state.routes}
+        else:
+            # Tüm popülasyon tek geçişte puanlanır
+            scores = evaluate(tours, splits)
+            if observing:
+                evaluations = evaluate.last_misses if cached else pop_size
+                cache_hits = evaluate.last_hits if cached else 0
+        if observing:
+            now = time.perf_counter()
+            t_eval += now - mark
+            mark = now
+        ranking = np.argsort(-scores, kind="stable")
+        if local_search is not None:
+            for i in ranking[:num_elite]:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                tours[i], splits[i], state = local_search.improve(tours[i], splits[i])
+                scores[i] = state.score
+                if incremental:
+                    states[i] = state
+            ranking = np.argsort(-scores, kind="stable")
+            if observing:
+                now = time.perf_counter()
+                t_local += now - mark
+                mark = now
+        if scores[ranking[0]] > best_fitness:
+            best_fitness = float(scores[ranking[0]])
+            best = (tours[ranking[0]].copy(), splits[ranking[0]].copy())
+            stalled = 0
+        else:
+            stalled += 1
+        next_size = pop_size
+        if adaptive:
+            if len(np.unique(scores)) / pop_size < DIVERSITY_FLOOR:
+                mutation_rate = min(MAX_MUTATION_RATE, mutation_rate * 1.5)
+                next_size = min(2 * base_size, pop_size + step)
+            else:
+                mutation_rate = max(base_mutation_rate, mutation_rate / 1.5)
+                next_size = max(base_size, pop_size - step)
+        # Büyüyen popülasyonun yeni yerleri rastgele göçmenlerle doldurulur
+        first_immigrant = min(next_size, pop_size)
         # Elitizm: en iyi %10'u koru
-        next_gen = [chrom for _, chrom in scored[:max(1, pop_size//10)]]
+        next_tours = np.empty((next_size, num_deliveries), dtype=tours.dtype)
+        next_splits = np.empty((next_size, num_drones + 1), dtype=splits.dtype)
+        next_tours[:num_elite] = tours[ranking[:num_elite]]
+        next_splits[:num_elite] = splits[ranking[:num_elite]]
+        if incremental:
+            next_states = [states[i] for i in ranking[:num_elite]]
+        if deduplicate:
+            seen = {chromosome_key(next_tours[i], next_splits[i]) for i in range(num_elite)}
+        if observing:
+            now = time.perf_counter()
+            t_select += now - mark
+            mark = now
         # Yeni nesil üret
-        while len(next_gen) < pop_size:
-            if random.random() < crossover_rate:
-                p1 = random.choice(population)
-                p2 = random.choice(population)
-                child = crossover(p1, p2)
+        for k in range(num_elite, next_size):
+            parent = None
+            move = None
+            if k >= first_immigrant:
+                child = create_random_chromosome(num_drones, num_deliveries, rng)
             else:
-                child = random.choice(population)
-            if random.random() < mutation_rate:
-                child = mutate(child, drones)
-            next_gen.append(child)
-        population = next_gen
-    return best_solution, best_fitness 
\ No newline at end of file
+                if rng.random() < crossover_rate:
+                    p1, p2 = rng.integers(pop_size, size=2)
+                    child = crossover((tours[p1], splits[p1]), (tours[p2], splits[p2]), rng)
+                else:
+                    parent = rng.integers(pop_size)
+                    child = (tours[parent], splits[parent])
+                if observing:
+                    now = time.perf_counter()
+                    t_cross += now - mark
+                    mark = now
+                if rng.random() < mutation_rate:
+                    child, move = mutate_move(child, rng)
+            if deduplicate:
+                key = chromosome_key(*child)
+                retries = 0
+                while key in seen and retries < 6:
+                    child = mutate_move(child, rng)[0] if retries < 3 else create_random_chromosome(num_drones, num_deliveries, rng)
+                    key = chromosome_key(*child)
+                    retries += 1
+                if retries:
+                    # Değiştirilen klon ebeveyninden tek hamleyle türemeyebilir; baştan puanlanır
+                    parent, move = None, None
+                    if observing:
+                        duplicates += 1
+                seen.add(key)
+            next_tours[k], next_splits[k] = child
+            if observing:
+                now = time.perf_counter()
+                t_mut += now - mark
+                mark = now
+            if incremental:
+                if parent is None:
+                    next_states.append(evaluate.evaluate(*child, memo))
+                elif move is None:
+                    next_states.append(states[parent])
+                else:
+                    next_states.append(evaluate.apply_move(states[parent], *child, move))
+                if observing:
+                    evaluations += parent is None or move is not None
+                    now = time.perf_counter()
+                    t_eval += now - mark
+                    mark = now
+        tours, splits = next_tours, next_splits
+        if incremental:
+            states = next_states
+        if observing:
+            observer(GenerationStats(
+                generation=gen, best_fitness=float(scores[ranking[0]]), mean_fitness=float(scores.mean()),
+                fitness_std=float(scores.std()), unique_ratio=len(np.unique(scores)) / pop_size, best_so_far=best_fitness,
+                evaluation=t_eval, selection=t_select, crossover=t_cross, mutation=t_mut,
+                evaluations=evaluations, elapsed=time.perf_counter() - started, local_search=t_local,
+                pop_size=pop_size, mutation_rate=mutation_rate, cache_hits=cache_hits, duplicates=duplicates))
+            evaluations = cache_hits = duplicates = 0
+        gen += 1
+    return tours, splits, best, best_fitness, gen
+
+def genetic_algorithm(drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], pop_size=20, generations=50, crossover_rate=0.7, mutation_rate=0.2, cache: Optional[GeometryCache] = None, seed: Optional[int] = None, incremental: bool = False, scenario: Optional[CompiledScenario] = None, observer: Optional[Observer] = None, memetic: bool = False, time_budget: Optional[float] = None, stall_generations: Optional[int] = None, adaptive: bool = False, heuristic_fraction: float = 0.0, fitness_cache: Optional[FitnessCache] = None, deduplicate: bool = False):
+    """
+    Popülasyon (tours, splits) dizileri üzerinde evrilir; en iyi çözüm
+    yalnızca dönüşte {drone_id: [teslimat_id, ...]} sözlüğüne çevrilir.
+    incremental=True ise puanlar rota durumları üzerinden artımlı hesaplanır
+    (mutasyonda yalnızca değişen rotaların değişen kısmı yeniden simüle edilir).
+    observer: her nesilden sonra çağrılan gözlemci (bkz. observer.GenerationRecorder).
+    memetic=True ise elitler her nesilde yerel aramayla (2-opt, or-opt, relocate, swap) iyileştirilir.
+    time_budget (saniye, derleme dahil) dolunca ya da stall_generations nesil iyileşme olmayınca
+    o ana kadarki en iyi çözüm döner; generations=None ise nesil sınırı yoktur.
+    adaptive=True ise çeşitlilik çöktüğünde mutasyon oranı ve popülasyon büyütülür.
+    heuristic_fraction: başlangıç popülasyonunda kurucu sezgisellerden gelen kromozomların oranı.
+    fitness_cache (fitness_cache.FitnessCache) verilirse toplu modda puanlar bu önbellekten okunur;
+    isabet oranı fitness_cache.stats() ile izlenir. Artımlı mod rota durumlarına ihtiyaç duyduğundan
+    incremental=True ile birlikte verilemez. deduplicate=True ise nesildeki klonlar değiştirilir.
+    """
+    if generations is None and time_budget is None and stall_generations is None:
+        raise ValueError("generations=None için time_budget ya da stall_generations gerekli")
+    if incremental and fitness_cache is not None:
+        raise ValueError("fitness_cache yalnızca toplu değerlendirmeyle kullanılabilir (incremental=False)")
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    if scenario is None:
+        scenario = compile_scenario(drones, deliveries, noflyzones, cache)
+    rng = np.random.default_rng(seed)
+    if incremental:
+        evaluate = IncrementalEvaluator(scenario)
+    else:
+        evaluate = PopulationEvaluator(scenario)
+        if fitness_cache is not None:
+            evaluate = CachedEvaluator(evaluate, fitness_cache)
+    tours, splits = create_initial_population(pop_size, drones, deliveries, rng, scenario, heuristic_fraction)
+    _, _, best_solution, best_fitness, _ = evolve_population(tours, splits, evaluate, generations, rng, crossover_rate, mutation_rate, observer=observer,
+                                                             local_search=LocalSearch(scenario) if memetic else None,
+                                                             deadline=deadline, stall_generations=stall_generations, adaptive=adaptive,
+                                                             deduplicate=deduplicate)
+    if best_solution is not None:
+        best_solution = decode_chromosome(*best_solution, drones, deliveries)
+    return best_solution, best_fitness
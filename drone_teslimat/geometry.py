@@ -0,0 +1,176 @@
+import bisect
+import math
+import copy
+import numpy as np
+from drone import Drone, DeliveryPoint, NoFlyZone
+from zone_index import NoFlyZoneIndex
+from typing import List, Optional, Tuple
+
+class GeometryCache:
+    """
+    Senaryo başına bir kez hesaplanan mesafe ve no-fly kesişim matrisleri.
+    Düğüm sırası: önce teslimatlar (0..N-1), ardından drone başlangıç noktaları (N..N+D-1).
+    distance[i, j]: i ve j arasındaki öklid mesafesi
+    crosses[i, j]: i -> j doğru parçası herhangi bir no-fly zone kenarını kesiyor mu (zamandan bağımsız)
+    crosses_at(i, j, t, until): aynı soru, yalnızca [t, until] uçuş aralığında etkin olan zone'lar için
+    detour[i, j]: düz bacak zone kestiğinde uçulabilecek, hiçbir zone'a girmeyen yolun uzunluğu (inf: yok, None: tablo yok)
+    Zaman sorguları için her çiftin kestiği ilk zone (first_zone) yoğun bir matriste, birden fazla zone
+    kesen (seyrek) çiftlerin diğer zone'ları CSR dizilerinde (extra_keys/extra_ptr/extra_zone) tutulur; bellek zone sayısından bağımsızdır.
+    """
+
+    def __init__(self, drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], zone_index: Optional[NoFlyZoneIndex] = None):
+        n = len(deliveries)
+        self.num_deliveries = n
+        self.num_drones = len(drones)
+        self.delivery_index = {d.id: i for i, d in enumerate(deliveries)}
+        self.drone_index = {d.id: n + i for i, d in enumerate(drones)}
+        coords = [d.pos for d in deliveries] + [d.start_pos for d in drones]
+        self.positions = np.array(coords, dtype=float).reshape(len(coords), 2)
+        dx = self.positions[:, 0][:, None] - self.positions[:, 0][None, :]
+        dy = self.positions[:, 1][:, None] - self.positions[:, 1][None, :]
+        self.distance = np.sqrt(dx * dx + dy * dy)
+        if zone_index is None:
+            zone_index = NoFlyZoneIndex(noflyzones)
+        self.zone_index = zone_index
+        self.detour = None
+        self._build_crossings()
+
+    def _build_crossings(self):
+        m = len(self.positions)
+        index = self.zone_index
+        self.crosses = np.zeros((m, m), dtype=bool)
+        self.first_zone = np.full((m, m), -1, dtype=np.int16 if len(index) < 2 ** 15 else np.int32)
+        extra_pairs, extra_zones = [], []
+        for z in range(len(index)):
+            src, dst = index.zone_crossing_pairs(self.positions, z)
+            again = self.crosses[src, dst]
+            extra_pairs.append(src[again] * m + dst[again])
+            extra_zones.append(np.full(int(again.sum()), z, dtype=np.int64))
+            self.first_zone[src[~again], dst[~again]] = z
+            self.crosses[src, dst] = True
+        empty = np.zeros(0, dtype=np.int64)
+        self._set_extra(np.concatenate(extra_pairs) if extra_pairs else empty, np.concatenate(extra_zones) if extra_zones else empty)
+        # Etkinlik aralıkları [açılış, kapanış); first_zone = -1 hiç etkin olmayan son nöbetçiyi gösterir
+        self.zone_open = np.append(index.active[:, 0], np.inf)
+        self.zone_close = np.append(index.active[:, 1], -np.inf)
+        self._open_list = self.zone_open.tolist()
+        self._close_list = self.zone_close.tolist()
+
+    def _set_extra(self, pairs: np.ndarray, zones: np.ndarray):
+        """Birden fazla zone kesen çiftlerin ilk zone dışındaki zone'ları: çift anahtarına (i * M + j) göre CSR."""
+        order = np.argsort(pairs, kind="stable")
+        self.extra_keys, first = np.unique(pairs[order], return_index=True)
+        self.extra_ptr = np.append(first, len(pairs)).astype(np.int64)
+        self.extra_zone = zones[order]
+        self._extra_lists = (self.extra_keys.tolist(), self.extra_ptr.tolist(), self.extra_zone.tolist())
+
+    def with_detours(self, detour: np.ndarray) -> "GeometryCache":
+        """detour[i, j] dolanma uzunluklarını taşıyan sığ kopya (diğer matrisler paylaşılır)."""
+        result = copy.copy(self)
+        result.detour = detour
+        return result
+
+    def delivery_node(self, delivery_id: int) -> int:
+        return self.delivery_index[delivery_id]
+
+    def drone_node(self, drone_id: int) -> int:
+        return self.drone_index[drone_id]
+
+    def crosses_at(self, src, dst, t, until=None):
+        """
+        src -> dst bacağı t anında (dakika) etkin bir zone'u kesiyor mu? until verilirse soru [t, until]
+        uçuş aralığı içindir: uçuş sırasında açılan zone'lar da sayılır.
+        Skaler ya da dizi (vektörel) girdileri kabul eder; t None ise zamandan bağımsızdır.
+        """
+        if t is None:
+            return self.crosses[src, dst]
+        if until is None:
+            until = t
+        if isinstance(t, (int, float)) and isinstance(src, (int, np.integer)) and isinstance(dst, (int, np.integer)):
+            z = int(self.first_zone[src, dst])
+            if z < 0:
+                return False
+            opens, closes = self._open_list, self._close_list
+            if opens[z] <= until and t < closes[z]:
+                return True
+            keys, ptr, zones = self._extra_lists
+            pair = int(src) * len(self.positions) + int(dst)
+            k = bisect.bisect_left(keys, pair)
+            if k < len(keys) and keys[k] == pair:
+                return any(opens[x] <= until and t < closes[x] for x in zones[ptr[k]:ptr[k + 1]])
+            return False
+        src, dst, t, until = np.broadcast_arrays(src, dst, t, until)
+        z = self.first_zone[src, dst]
+        hit = (self.zone_open[z] <= until) & (t < self.zone_close[z])
+        if len(self.extra_keys):
+            pair = (src.astype(np.int64) * len(self.positions) + dst).ravel()
+            at = np.minimum(np.searchsorted(self.extra_keys, pair), len(self.extra_keys) - 1)
+            rows = np.flatnonzero((self.extra_keys[at] == pair) & ~hit.ravel())
+            if len(rows):
+                # Adayların ek zone'ları tek dizide açılır
+                lo, hi = self.extra_ptr[at[rows]], self.extra_ptr[at[rows] + 1]
+                counts = hi - lo
+                rows = np.repeat(rows, counts)
+                zones = self.extra_zone[np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)]
+                ok = (self.zone_open[zones] <= until.ravel()[rows]) & (t.ravel()[rows] < self.zone_close[zones])
+                hit = hit.copy()
+                hit.ravel()[rows[ok]] = True
+        return hit
+
+    def leg(self, src: int, dst: int, t: Optional[float] = None, until: Optional[float] = None) -> Tuple[float, bool]:
+        """İki düğüm indeksi arasındaki (mesafe, no-fly kesişimi) çifti."""
+        return float(self.distance[src, dst]), bool(self.crosses_at(src, dst, t, until))
+
+class _LegRows:
+    """rows[i][j] erişimini fn(i, j) çağrısına çeviren satır görünümü (skaler döngüler için)."""
+    __slots__ = ("fn", "src")
+
+    def __init__(self, fn, src: Optional[int] = None):
+        self.fn = fn
+        self.src = src
+
+    def __getitem__(self, key):
+        if self.src is None:
+            return _LegRows(self.fn, key)
+        return self.fn(self.src, key)
+
+class LegGeometry:
+    """
+    GeometryCache ile aynı düğüm sırası ve sorgular, ama matrissiz: mesafe ve zone kesişimi yalnızca
+    sorulan bacak için hesaplanır (kesişim NoFlyZoneIndex ızgarasından). Senaryo derlenmeden yapılan
+    tek seferlik değerlendirmeler içindir; maliyet M x M yerine bacak sayısıyla orantılıdır.
+    """
+
+    def __init__(self, drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], zone_index: Optional[NoFlyZoneIndex] = None):
+        n = len(deliveries)
+        self.num_deliveries = n
+        self.num_drones = len(drones)
+        self.delivery_index = {d.id: i for i, d in enumerate(deliveries)}
+        self.drone_index = {d.id: n + i for i, d in enumerate(drones)}
+        self.points = [tuple(map(float, d.pos)) for d in deliveries] + [tuple(map(float, d.start_pos)) for d in drones]
+        self.zone_index = zone_index if zone_index is not None else NoFlyZoneIndex(noflyzones)
+        self.detour = None
+
+    def delivery_node(self, delivery_id: int) -> int:
+        return self.delivery_index[delivery_id]
+
+    def drone_node(self, drone_id: int) -> int:
+        return self.drone_index[drone_id]
+
+    def distance_at(self, src: int, dst: int) -> float:
+        (ax, ay), (bx, by) = self.points[src], self.points[dst]
+        dx, dy = ax - bx, ay - by
+        return math.sqrt(dx * dx + dy * dy)
+
+    def crosses_at(self, src: int, dst: int, t: Optional[float] = None, until: Optional[float] = None) -> bool:
+        return bool(self.zone_index.crosses(self.points[src], self.points[dst], t, until))
+
+    def distance_rows(self) -> _LegRows:
+        return _LegRows(self.distance_at)
+
+    def may_cross_rows(self) -> _LegRows:
+        # Ucuz ön eleme yok: kesişim zaten crosses_at'te aday zone'larla sınanır
+        return _LegRows(lambda src, dst: True)
+
+    def leg(self, src: int, dst: int, t: Optional[float] = None, until: Optional[float] = None) -> Tuple[float, bool]:
+        return self.distance_at(src, dst), self.crosses_at(src, dst, t, until)
@@ -1,6 +1,10 @@
 import math
+import numpy as np
+from dataclasses import dataclass
 from drone import DeliveryPoint, Drone, NoFlyZone
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
+from geometry import GeometryCache
+from zone_index import NoFlyZoneIndex, time_to_minutes
 
 def euclidean_distance(a: Tuple[float, float], b: Tuple[float, float]) -> float:
     return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2)
@@ -14,8 +18,15 @@ def ccw(A, B, C):
 def segments_intersect(A, B, C, D):
     return ccw(A, C, D) != ccw(B, C, D) and ccw(A, B, C) != ccw(A, B, D)
 
-def edge_crosses_noflyzones(start: Tuple[float, float], end: Tuple[float, float], noflyzones: List[NoFlyZone]) -> bool:
+def edge_crosses_noflyzones(start: Tuple[float, float], end: Tuple[float, float], noflyzones: List[NoFlyZone], at_time: Optional[str] = None) -> bool:
+    """
+    at_time ("HH:MM") verilirse yalnızca o anda etkin olan zone'lar dikkate alınır.
+    Çok sayıda zone için zone_index.NoFlyZoneIndex tercih edilmelidir.
+    """
+    minutes = time_to_minutes(at_time) if at_time is not None else None
     for zone in noflyzones:
+        if minutes is not None and not (time_to_minutes(zone.active_time[0]) <= minutes < time_to_minutes(zone.active_time[1])):
+            continue
         coords = zone.coordinates
         n = len(coords)
         for i in range(n):
@@ -23,35 +34,257 @@ def edge_crosses_noflyzones(start: Tuple[float, float], end: Tuple[float, float]
                 return True
     return False
 
-def build_graph(deliveries: List[DeliveryPoint], drones: List[Drone], noflyzones: List[NoFlyZone], nofly_penalty: float = 1000.0) -> Dict[int, List[Tuple[int, float]]]:
+def build_graph(deliveries: List[DeliveryPoint], drones: List[Drone], noflyzones: List[NoFlyZone], nofly_penalty: float = 1000.0, cache: Optional[GeometryCache] = None, at_time: Optional[str] = None) -> Dict[int, List[Tuple[int, float]]]:
     """
     Komşuluk listesi olarak graf döndürür.
     Her düğümün (teslimat noktası ve drone başlangıç noktası) komşularını ve maliyetlerini içerir.
     No-fly zone cezası ve kapasite/batarya kısıtları eklenir.
+    cache verilmezse mesafe ve kesişimler için bir GeometryCache oluşturulur.
+    at_time ("HH:MM") verilirse yalnızca o anda etkin zone'lar cezalandırılır.
     """
-    nodes = {d.id: d.pos for d in deliveries}
+    if cache is None:
+        cache = GeometryCache(drones, deliveries, noflyzones)
+    minutes = time_to_minutes(at_time) if at_time is not None else None
+    # (düğüm id, matris indeksi) çiftleri
+    nodes = [(d.id, cache.delivery_node(d.id)) for d in deliveries]
     drone_id_map = {}
     for i, drone in enumerate(drones):
         drone_id = -(i+1)
-        nodes[drone_id] = drone.start_pos
+        nodes.append((drone_id, cache.drone_node(drone.id)))
         drone_id_map[drone_id] = drone
 
-    graph = {node_id: [] for node_id in nodes}
-    for src_id, src_pos in nodes.items():
-        for dst_id, dst_pos in nodes.items():
+    graph = {node_id: [] for node_id, _ in nodes}
+    for src_id, src_idx in nodes:
+        for delivery in deliveries:
+            dst_id = delivery.id
             if src_id == dst_id:
                 continue
-            if dst_id > 0:
-                delivery = next(d for d in deliveries if d.id == dst_id)
-                distance = euclidean_distance(src_pos, dst_pos)
-                penalty = nofly_penalty if edge_crosses_noflyzones(src_pos, dst_pos, noflyzones) else 0.0
-                # Kapasite ve batarya kısıtları sadece drone'dan teslimata giden kenarlarda kontrol edilir
-                if src_id < 0:
-                    drone = drone_id_map[src_id]
-                    if delivery.weight > drone.max_weight:
-                        continue  # Kapasiteyi aşan teslimat
-                    if distance > drone.battery:  # Basit model: batarya kapasitesi mesafeye eşit
-                        continue  # Batarya yetmiyor
-                cost = cost_function(distance, delivery.weight, delivery.priority, penalty)
-                graph[src_id].append((dst_id, cost))
-    return graph 
\ No newline at end of file
+            dst_idx = cache.delivery_node(dst_id)
+            distance = float(cache.distance[src_idx, dst_idx])
+            penalty = nofly_penalty if cache.crosses_at(src_idx, dst_idx, minutes) else 0.0
+            # Kapasite ve batarya kısıtları sadece drone'dan teslimata giden kenarlarda kontrol edilir
+            if src_id < 0:
+                drone = drone_id_map[src_id]
+                if delivery.weight > drone.max_weight:
+                    continue  # Kapasiteyi aşan teslimat
+                if distance > drone.battery:  # Basit model: batarya kapasitesi mesafeye eşit
+                    continue  # Batarya yetmiyor
+            cost = cost_function(distance, delivery.weight, delivery.priority, penalty)
+            graph[src_id].append((dst_id, cost))
+    return graph
+
+@dataclass
+class SparseGraph:
+    graph: Dict[int, List[Tuple[int, float]]]
+    nodes_pos: Dict[int, Tuple[float, float]]
+    corner_ids: List[int]
+
+def knn_pairs(points: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Her noktayı en yakın k komşusuna bağlayan (i, j) çiftleri.
+    Noktalar düzenli ızgaraya dağıtılır; bir hücrenin adayları, k. komşu mesafesi
+    taranan halkanın içinde kalana kadar genişletilir (ortalama O(n·k)).
+    """
+    n = len(points)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    low = points.min(axis=0)
+    span = np.maximum(points.max(axis=0) - low, 1e-9)
+    cell = max(math.sqrt(span[0] * span[1] * k / n), float(span.max()) / max(1, int(math.sqrt(n))), 1e-9)
+    ncx, ncy = int(span[0] // cell) + 1, int(span[1] // cell) + 1
+    cx = ((points[:, 0] - low[0]) // cell).astype(np.int64)
+    cy = ((points[:, 1] - low[1]) // cell).astype(np.int64)
+    keys = cx * ncy + cy
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    sources, targets = [], []
+    for key in np.unique(sorted_keys):
+        members = order[np.searchsorted(sorted_keys, key, "left"):np.searchsorted(sorted_keys, key, "right")]
+        x, y = divmod(int(key), ncy)
+        ring = 1
+        while True:
+            x1, x2, y1, y2 = max(x - ring, 0), min(x + ring, ncx - 1), max(y - ring, 0), min(y + ring, ncy - 1)
+            columns = [order[np.searchsorted(sorted_keys, col * ncy + y1, "left"):np.searchsorted(sorted_keys, col * ncy + y2, "right")]
+                       for col in range(x1, x2 + 1)]
+            candidates = np.concatenate(columns)
+            whole_grid = x1 == 0 and y1 == 0 and x2 == ncx - 1 and y2 == ncy - 1
+            if len(candidates) > k:
+                diff = points[members][:, None, :] - points[candidates][None, :, :]
+                dist = np.sqrt((diff ** 2).sum(axis=2))
+                dist[members[:, None] == candidates[None, :]] = np.inf
+                nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+                kth = np.take_along_axis(dist, nearest, axis=1).max(axis=1)
+                # Halkanın dışındaki her nokta en az ring * cell uzaktadır
+                if whole_grid or kth.max() <= ring * cell:
+                    sources.append(np.repeat(members, k))
+                    targets.append(candidates[nearest].ravel())
+                    break
+            elif whole_grid:
+                for m in members:
+                    others = candidates[candidates != m]
+                    sources.append(np.full(len(others), m))
+                    targets.append(others)
+                break
+            ring += 1
+    return np.concatenate(sources), np.concatenate(targets)
+
+def zone_corner_points(noflyzones: List[NoFlyZone], clearance: float = 0.01) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """
+    Zone köşelerini merkezden dışarı, zone boyutunun `clearance` oranı kadar iter.
+    Dönüş: (C, 2) köşe noktaları ve aynı zone'un komşu köşe çiftleri (indeks)
+    """
+    points, sides = [], []
+    for zone in noflyzones:
+        coords = np.array(zone.coordinates, dtype=float)
+        center = coords.mean(axis=0)
+        size = float(np.linalg.norm(coords.max(axis=0) - coords.min(axis=0)))
+        base = len(points)
+        for corner in coords:
+            direction = corner - center
+            norm = float(np.linalg.norm(direction)) or 1.0
+            points.append(corner + direction / norm * size * clearance)
+        n = len(coords)
+        sides.extend((base + i, base + (i + 1) % n) for i in range(n))
+    return np.array(points, dtype=float).reshape(len(points), 2), sides
+
+def _components(num_points: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Yönsüz (a, b) kenarlarının bağlı bileşen etiketleri (birleşim-bul)."""
+    parent = list(range(num_points))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for u, v in zip(a.tolist(), b.tolist()):
+        ru, rv = find(u), find(v)
+        if ru != rv:
+            parent[ru] = rv
+    return np.array([find(x) for x in range(num_points)], dtype=np.int64)
+
+def _connect_components(points: np.ndarray, a: np.ndarray, b: np.ndarray, zone_index: NoFlyZoneIndex, minutes: Optional[float], k: int, block: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k-en yakın komşuları zone arkasında kaldığı için ana graftan kopan bileşenleri bağlar:
+    en küçük bileşenden başlayarak üyelerinin başka bileşendeki en yakın adayları (k, 4k, ...
+    tüm noktalar) denenir ve zone kesmeyen en kısa çift eklenir. Etkin bir zone'un içindeki noktalar
+    ve hiç görünür adayı olmayan bileşenler kopuk bırakılır.
+    Dönüş: eklenen yönsüz kenarlar (a, b)
+    """
+    labels = _components(len(points), a, b)
+    # Etkin bir zone'un içindeki noktalar dışarıyı göremez: ne bağlanır ne de aday olur
+    inside = zone_index.contains(points[:, 0], points[:, 1], minutes)
+    hopeless = set(labels[inside].tolist()) - set(labels[~inside].tolist())
+    extra_a, extra_b = [], []
+    while True:
+        roots, sizes = np.unique(labels, return_counts=True)
+        pending = [(size, root) for size, root in zip(sizes.tolist(), roots.tolist()) if root not in hopeless]
+        # Görünürlük simetriktir: kopuk bırakılanlara kalan tek bileşenden de ulaşılamaz
+        if len(pending) < 2:
+            break
+        _, root = min(pending)
+        members = np.flatnonzero((labels == root) & ~inside)
+        outside = ~inside & (labels != root)
+        found = None
+        width = k
+        while found is None and outside.any():
+            best = None
+            for lo in range(0, len(members), block):
+                rows = members[lo:lo + block]
+                dist = np.sqrt(((points[rows][:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+                dist[:, ~outside] = np.inf
+                count = min(width, int(outside.sum()))
+                nearest = np.argpartition(dist, count - 1, axis=1)[:, :count]
+                src = np.repeat(rows, count)
+                dst = nearest.ravel()
+                length = dist[np.repeat(np.arange(len(rows)), count), dst]
+                src, dst, length = src[np.isfinite(length)], dst[np.isfinite(length)], length[np.isfinite(length)]
+                visible = ~(zone_index.segments_cross(points[src, 0], points[src, 1], points[dst, 0], points[dst, 1], minutes)
+                            | zone_index.segments_cross(points[dst, 0], points[dst, 1], points[src, 0], points[src, 1], minutes))
+                if visible.any():
+                    i = np.flatnonzero(visible)[length[visible].argmin()]
+                    if best is None or length[i] < best[0]:
+                        best = (length[i], int(src[i]), int(dst[i]))
+            if best is not None:
+                found = best
+            elif width >= outside.sum():
+                break
+            else:
+                width *= 4
+        if found is None:
+            hopeless.add(root)
+            continue
+        _, u, v = found
+        extra_a.append(u)
+        extra_b.append(v)
+        labels[labels == root] = labels[v]
+    return np.array(extra_a, dtype=np.int64), np.array(extra_b, dtype=np.int64)
+
+def visibility_edges(deliveries: List[DeliveryPoint], drones: List[Drone], noflyzones: List[NoFlyZone], k: int = 8, clearance: float = 0.01, at_time: Optional[str] = None, zone_index: Optional[NoFlyZoneIndex] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Teslimatlar, drone başlangıçları ve dışarı itilmiş zone köşeleri (bu sırayla) arasında
+    k-en yakın komşu ve zone kenarı çiftlerinden, hiçbir zone'u kesmeyen yönlü kenarlar.
+    Graf kopuk kalırsa her bileşen başka bir bileşendeki en yakın görünür noktaya bağlanır.
+    Dönüş: (P, 2) noktalar, kaynak ve hedef nokta indeksleri, kenar uzunlukları
+    """
+    if zone_index is None:
+        zone_index = NoFlyZoneIndex(noflyzones)
+    minutes = time_to_minutes(at_time) if at_time is not None else None
+    corners, sides = zone_corner_points(noflyzones, clearance)
+    points = np.concatenate([np.array([d.pos for d in deliveries], dtype=float).reshape(len(deliveries), 2),
+                             np.array([d.start_pos for d in drones], dtype=float).reshape(len(drones), 2),
+                             corners])
+    src, dst = knn_pairs(points, k)
+    corner_base = len(deliveries) + len(drones)
+    if sides:
+        side_src, side_dst = np.array(sides, dtype=np.int64).T + corner_base
+        src, dst = np.concatenate((src, side_src)), np.concatenate((dst, side_dst))
+    # Yönsüz kenar kümesi: tekrarları at, iki yöne de ekle
+    pairs = np.unique(np.stack((np.minimum(src, dst), np.maximum(src, dst)), axis=1), axis=0)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    a, b = pairs[:, 0], pairs[:, 1]
+    # Köşeden geçen (doğrusal) parçalarda ccw testi yöne duyarlıdır; iki yön de denetlenir
+    blocked = (zone_index.segments_cross(points[a, 0], points[a, 1], points[b, 0], points[b, 1], minutes)
+               | zone_index.segments_cross(points[b, 0], points[b, 1], points[a, 0], points[a, 1], minutes))
+    a, b = a[~blocked], b[~blocked]
+    # Engellenen kNN çiftleri yüzünden kopan düğümler en yakın görünür düğüme bağlanır
+    link_a, link_b = _connect_components(points, a, b, zone_index, minutes, k)
+    a, b = np.concatenate((a, link_a)), np.concatenate((b, link_b))
+    src, dst = np.concatenate((a, b)), np.concatenate((b, a))
+    distance = np.sqrt(((points[src] - points[dst]) ** 2).sum(axis=1))
+    return points, src, dst, distance
+
+def build_sparse_graph(deliveries: List[DeliveryPoint], drones: List[Drone], noflyzones: List[NoFlyZone], k: int = 8, clearance: float = 0.01, at_time: Optional[str] = None, zone_index: Optional[NoFlyZoneIndex] = None) -> SparseGraph:
+    """
+    build_graph'ın seyrek karşılığı: yoğun tam graf yerine yaklaşık doğrusal zamanda
+    k-en yakın komşu kenarları ve no-fly zone köşeleri üzerinden görünürlük kenarları üretir.
+    Zone kesen kenarlar cezalandırılmak yerine hiç eklenmez; böylece astar zone'ların
+    etrafından gerçek dolanma yollarını bulur.
+    Düğümler: teslimatlar (id), drone başlangıçları (-(i+1)), zone köşeleri (-(D+1+c)).
+    Teslimata giden kenarların maliyeti cost_function ile, diğerlerininki mesafe ile hesaplanır.
+    """
+    num_drones = len(drones)
+    points, src, dst, distance = visibility_edges(deliveries, drones, noflyzones, k, clearance, at_time, zone_index)
+    corner_base = len(deliveries) + num_drones
+    node_ids = np.array([d.id for d in deliveries] + [-(i+1) for i in range(num_drones)]
+                        + [-(num_drones+1+c) for c in range(len(points) - corner_base)], dtype=np.int64)
+
+    num_deliveries = len(deliveries)
+    is_delivery = dst < num_deliveries
+    weight = np.array([d.weight for d in deliveries] + [0.0], dtype=float)
+    priority = np.array([d.priority for d in deliveries] + [0], dtype=float)
+    target = np.where(is_delivery, dst, num_deliveries)
+    cost = np.where(is_delivery, distance * weight[target] + priority[target] * 100, distance)
+    # Drone'dan teslimata giden kenarlarda kapasite ve batarya kısıtları
+    is_drone = (src >= num_deliveries) & (src < corner_base)
+    drone_of = np.clip(src - num_deliveries, 0, max(num_drones - 1, 0))
+    max_weight = np.array([d.max_weight for d in drones] or [0.0], dtype=float)
+    battery = np.array([d.battery for d in drones] or [0.0], dtype=float)
+    keep = ~(is_drone & is_delivery & ((weight[target] > max_weight[drone_of]) | (distance > battery[drone_of])))
+
+    graph = {int(node_id): [] for node_id in node_ids}
+    for s, d, c in zip(node_ids[src[keep]].tolist(), node_ids[dst[keep]].tolist(), cost[keep].tolist()):
+        graph[s].append((d, c))
+    nodes_pos = {int(node_id): (float(x), float(y)) for node_id, (x, y) in zip(node_ids, points)}
+    return SparseGraph(graph, nodes_pos, node_ids[corner_base:].tolist())
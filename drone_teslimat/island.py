@@ -0,0 +1,78 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+from drone import Drone, DeliveryPoint, NoFlyZone
+from geometry import GeometryCache
+from scenario import CompiledScenario, compile_scenario
+from batch_fitness import PopulationEvaluator
+from chromosome import decode_chromosome
+from genetic import create_initial_population, evolve_population
+from fitness_cache import CachedEvaluator, FitnessCache
+
+# Her işçi süreçte bir kez kurulan değerlendirici
+_worker_evaluate = None
+
+def _init_worker(scenario: CompiledScenario, cache_bytes: Optional[int] = None):
+    global _worker_evaluate
+    _worker_evaluate = PopulationEvaluator(scenario)
+    if cache_bytes is not None:
+        # Bu süreçte evrilen tüm adalar ve dönemler aynı önbelleği paylaşır
+        _worker_evaluate = CachedEvaluator(_worker_evaluate, FitnessCache(cache_bytes))
+
+def _run_epoch(task):
+    tours, splits, rng, generations, crossover_rate, mutation_rate, best, best_fitness = task
+    cache = _worker_evaluate.cache if isinstance(_worker_evaluate, CachedEvaluator) else None
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    tours, splits, best, best_fitness, _ = evolve_population(tours, splits, _worker_evaluate, generations, rng, crossover_rate, mutation_rate, best, best_fitness)
+    if cache is not None:
+        hits, misses = cache.hits - hits, cache.misses - misses
+    # rng durumu da geri döner; böylece sonuç hangi işçinin çalıştırdığından bağımsızdır
+    return tours, splits, rng, best, best_fitness, hits, misses
+
+def island_genetic_algorithm(drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], islands=4, migration_interval=10, pop_size=20, generations=50, crossover_rate=0.7, mutation_rate=0.2, cache: Optional[GeometryCache] = None, seed: Optional[int] = None, workers: Optional[int] = None, scenario: Optional[CompiledScenario] = None, fitness_cache: Optional[FitnessCache] = None):
+    """
+    Ada modeli genetik algoritma: her biri pop_size büyüklüğünde `islands` bağımsız popülasyon
+    bir süreç havuzunda paralel evrilir. Her migration_interval nesilde adalar en iyi
+    kromozomlarını halka şeklinde bir sonraki adaya gönderir (alıcıda son birey yerine konur).
+    Aynı seed ile sonuç deterministiktir.
+    fitness_cache verilirse her işçi süreç aynı bellek sınırıyla kendi önbelleğini kurar (o süreçteki
+    adalar arasında paylaşılır); işçilerin isabet/ıskalama sayıları fitness_cache'e eklenir.
+    Dönüş: (best_solution, best_fitness) — tüm adaların en iyisi
+    """
+    if scenario is None:
+        scenario = compile_scenario(drones, deliveries, noflyzones, cache)
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(islands)]
+    states = []
+    for rng in rngs:
+        tours, splits = create_initial_population(pop_size, drones, deliveries, rng)
+        states.append([tours, splits, rng, None, float('-inf')])
+    if workers is None:
+        workers = min(islands, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(scenario, None if fitness_cache is None else fitness_cache.max_bytes)) as pool:
+        done = 0
+        while done < generations:
+            step = min(migration_interval, generations - done)
+            tasks = [(tours, splits, rng, step, crossover_rate, mutation_rate, best, best_fitness)
+                     for tours, splits, rng, best, best_fitness in states]
+            states = []
+            for *state, hits, misses in pool.map(_run_epoch, tasks):
+                states.append(state)
+                if fitness_cache is not None:
+                    fitness_cache.record(hits, misses)
+            done += step
+            if done >= generations or islands < 2:
+                continue
+            # Halka göçü: k. adanın en iyisi (k+1). adaya
+            migrants = [state[3] for state in states]
+            for k, state in enumerate(states):
+                migrant = migrants[k - 1]
+                if migrant is not None:
+                    state[0][-1], state[1][-1] = migrant
+    best_solution, best_fitness = None, float('-inf')
+    for _, _, _, best, fitness_value in states:
+        if fitness_value > best_fitness:
+            best_solution, best_fitness = best, fitness_value
+    if best_solution is not None:
+        best_solution = decode_chromosome(*best_solution, drones, deliveries)
+    return best_solution, best_fitness
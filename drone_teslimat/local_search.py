@@ -0,0 +1,241 @@
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from scenario import CompiledScenario
+from route_state import ChromosomeState, IncrementalEvaluator, RouteState
+
+class LocalSearch:
+    """
+    Elit kromozomlar için memetik yerel arama.
+    Hamleler: rota içi 2-opt ve or-opt (1-3 duraklık parça), drone'lar arası relocate ve swap.
+    Her hamle önce önceden hesaplanmış mesafelerden O(1) mesafe farkıyla elenir (yalnızca rotayı
+    kısaltanlar); kapasite ve (nominal rota uzunluğuyla) batarya da O(1) denetlenir. Geçen aday,
+    değişen rotaların yalnızca ilk değişen duraktan sonrası yeniden simüle edilerek kesin olarak
+    doğrulanır; böylece zaman pencereleri ve zone'lar da hesaba katılır ve yalnızca fitness'ı
+    artıran hamleler kabul edilir.
+    Drone'lar arası hamleler her teslimatın en yakın `neighbors` komşusuyla sınırlıdır.
+    """
+
+    def __init__(self, scenario: CompiledScenario, time_penalty: float = 500.0, neighbors: int = 10, max_segment: int = 3, max_evaluations: int = 2000, memory: int = 1024):
+        self.scenario = scenario
+        self.evaluator = IncrementalEvaluator(scenario, time_penalty)
+        self.time_penalty = time_penalty
+        self.max_segment = max_segment
+        self.max_evaluations = max_evaluations
+        self.memory = memory
+        self.distance = scenario.distance_rows()
+        self.weight = scenario.weight.tolist()
+        self.max_weight = scenario.max_weight.tolist()
+        self.battery = scenario.battery.tolist()
+        self.start_node = scenario.start_node.tolist()
+        n = scenario.num_deliveries
+        k = min(neighbors, n - 1)
+        if k > 0:
+            distance = scenario.cache.distance[:n, :n].copy()
+            np.fill_diagonal(distance, np.inf)
+            near = np.argpartition(distance, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(distance, near, axis=1), axis=1, kind="stable")
+            self.near = np.take_along_axis(near, order, axis=1).tolist()
+        else:
+            self.near = [[] for _ in range(n)]
+        # Yerel optimum olduğu bilinen kromozomlar (tekrar aranmaz)
+        self._optima = OrderedDict()
+        self.evaluations = 0
+        self.moves = 0
+
+    def _route_score(self, state: RouteState) -> float:
+        return (state.delivered[-1] * 50) - (sum(state.energy) * 0.1) - (state.violations[-1] * 1000) - (state.time_violations[-1] * self.time_penalty)
+
+    def _length(self, drone: int, route: List[int]) -> float:
+        distance = self.distance
+        node, total = self.start_node[drone], 0.0
+        for target in route:
+            total += distance[node][target]
+            node = target
+        return total
+
+    def improve(self, tour: np.ndarray, splits: np.ndarray) -> Tuple[np.ndarray, np.ndarray, ChromosomeState]:
+        """
+        Kromozomu iyileştiren hamle kalmayana (ya da doğrulama bütçesi bitene) kadar arar.
+        Dönüş: (tour, splits, ChromosomeState)
+        """
+        key = (tour.tobytes(), splits.tobytes())
+        if key in self._optima:
+            self._optima.move_to_end(key)
+            return tour, splits, self.evaluator.evaluate(tour, splits)
+        state = self.evaluator.evaluate(tour, splits)
+        self.routes = [list(route.route) for route in state.routes]
+        self.states = list(state.routes)
+        self.scores = [self._route_score(route) for route in self.states]
+        self.lengths = [self._length(d, route) for d, route in enumerate(self.routes)]
+        self.where = {}
+        for d in range(len(self.routes)):
+            self._index(d)
+        self.budget = self.max_evaluations
+        improved = True
+        while improved and self.budget > 0:
+            improved = False
+            for d in range(len(self.routes)):
+                improved |= self._two_opt(d)
+                improved |= self._or_opt(d)
+            improved |= self._inter_route()
+        new_tour = np.array([x for route in self.routes for x in route], dtype=tour.dtype)
+        new_splits = np.zeros_like(splits)
+        np.cumsum([len(route) for route in self.routes], out=new_splits[1:])
+        if self.budget > 0:
+            self._optima[(new_tour.tobytes(), new_splits.tobytes())] = True
+            if len(self._optima) > self.memory:
+                self._optima.popitem(last=False)
+        return new_tour, new_splits, ChromosomeState(self.states, self.time_penalty)
+
+    def _index(self, drone: int):
+        for pos, x in enumerate(self.routes[drone]):
+            self.where[x] = (drone, pos)
+
+    def _try(self, changes: Dict[int, Tuple[List[int], int]]) -> bool:
+        """Değişen rotaları ilk değişen duraktan itibaren simüle eder; fitness artıyorsa uygular."""
+        self.budget -= 1
+        self.evaluations += 1
+        simulated = {}
+        gain = 0.0
+        for d, (route, start) in changes.items():
+            state = self.evaluator.simulate_route(d, route, self.states[d], start)
+            simulated[d] = state
+            gain += self._route_score(state) - self.scores[d]
+        if gain <= 1e-7:
+            return False
+        for d, state in simulated.items():
+            self.routes[d] = list(state.route)
+            self.states[d] = state
+            self.scores[d] = self._route_score(state)
+            self.lengths[d] = self._length(d, self.routes[d])
+            self._index(d)
+        self.moves += 1
+        return True
+
+    def _two_opt(self, d: int) -> bool:
+        """a[i..j] parçasını ters çevirir (açık rota: son durağın ardılı yoktur)."""
+        distance = self.distance
+        improved = False
+        route = self.routes[d]
+        nodes = [self.start_node[d]] + route
+        last = len(route)
+        i = 1
+        while i < last and self.budget > 0:
+            prev, first = nodes[i - 1], nodes[i]
+            for j in range(i + 1, last + 1):
+                delta = distance[prev][nodes[j]] - distance[prev][first]
+                if j < last:
+                    delta += distance[first][nodes[j + 1]] - distance[nodes[j]][nodes[j + 1]]
+                if delta < -1e-9:
+                    candidate = route[:i - 1] + route[i - 1:j][::-1] + route[j:]
+                    if self._try({d: (candidate, i - 1)}):
+                        improved = True
+                        route = self.routes[d]
+                        nodes = [self.start_node[d]] + route
+                        break
+                    if self.budget <= 0:
+                        break
+            i += 1
+        return improved
+
+    def _or_opt(self, d: int) -> bool:
+        """1..max_segment duraklık parçayı aynı rotada başka bir yere taşır."""
+        distance = self.distance
+        improved = False
+        for size in range(1, self.max_segment + 1):
+            route = self.routes[d]
+            i = 0
+            while i + size <= len(route) and self.budget > 0:
+                nodes = [self.start_node[d]] + route
+                prev, first, last = nodes[i], route[i], route[i + size - 1]
+                after = route[i + size] if i + size < len(route) else None
+                gain = distance[prev][first]
+                if after is not None:
+                    gain += distance[last][after] - distance[prev][after]
+                rest = route[:i] + route[i + size:]
+                rest_nodes = [self.start_node[d]] + rest
+                moved = False
+                for p in range(len(rest) + 1):
+                    if p == i:
+                        continue
+                    a = rest_nodes[p]
+                    cost = distance[a][first]
+                    if p < len(rest):
+                        b = rest_nodes[p + 1]
+                        cost += distance[last][b] - distance[a][b]
+                    if cost - gain < -1e-9:
+                        candidate = rest[:p] + route[i:i + size] + rest[p:]
+                        if self._try({d: (candidate, min(i, p))}):
+                            improved = moved = True
+                            route = self.routes[d]
+                            break
+                        if self.budget <= 0:
+                            break
+                if not moved:
+                    i += 1
+        return improved
+
+    def _removal_gain(self, d: int, pos: int) -> float:
+        distance = self.distance
+        route = self.routes[d]
+        prev = route[pos - 1] if pos > 0 else self.start_node[d]
+        x = route[pos]
+        gain = distance[prev][x]
+        if pos + 1 < len(route):
+            after = route[pos + 1]
+            gain += distance[x][after] - distance[prev][after]
+        return gain
+
+    def _replace_delta(self, d: int, pos: int, new: int) -> float:
+        distance = self.distance
+        route = self.routes[d]
+        prev = route[pos - 1] if pos > 0 else self.start_node[d]
+        old = route[pos]
+        delta = distance[prev][new] - distance[prev][old]
+        if pos + 1 < len(route):
+            after = route[pos + 1]
+            delta += distance[new][after] - distance[old][after]
+        return delta
+
+    def _inter_route(self) -> bool:
+        """Relocate: x'i komşusunun rotasına (komşudan önce/sonra) taşır. Swap: x ile komşusunu değiştirir."""
+        distance = self.distance
+        weight = self.weight
+        improved = False
+        for x in range(len(self.near)):
+            if self.budget <= 0:
+                break
+            for y in self.near[x]:
+                a, i = self.where[x]
+                b, j = self.where[y]
+                if a == b:
+                    continue
+                route_a, route_b = self.routes[a], self.routes[b]
+                gain = self._removal_gain(a, i)
+                if weight[x] <= self.max_weight[b]:
+                    for p in (j, j + 1):
+                        before = route_b[p - 1] if p > 0 else self.start_node[b]
+                        cost = distance[before][x]
+                        if p < len(route_b):
+                            cost += distance[x][route_b[p]] - distance[before][route_b[p]]
+                        if cost - gain < -1e-9 and self.lengths[b] + cost <= self.battery[b]:
+                            changes = {a: (route_a[:i] + route_a[i + 1:], i), b: (route_b[:p] + [x] + route_b[p:], p)}
+                            if self._try(changes):
+                                improved = True
+                                break
+                            if self.budget <= 0:
+                                return improved
+                    if self.where[x][0] != a:
+                        continue
+                if weight[x] <= self.max_weight[b] and weight[y] <= self.max_weight[a]:
+                    delta_a = self._replace_delta(a, i, y)
+                    delta_b = self._replace_delta(b, j, x)
+                    if (delta_a + delta_b < -1e-9 and self.lengths[a] + delta_a <= self.battery[a]
+                            and self.lengths[b] + delta_b <= self.battery[b]):
+                        changes = {a: (route_a[:i] + [y] + route_a[i + 1:], i), b: (route_b[:j] + [x] + route_b[j + 1:], j)}
+                        if self._try(changes):
+                            improved = True
+                        elif self.budget <= 0:
+                            return improved
+        return improved
@@ -1,56 +1,98 @@
 from data_loader import load_drones, load_deliveries, load_noflyzones
 from graph_utils import build_graph
+from scenario import compile_scenario, hours_to_us, US_PER_MINUTE
 from astar import astar
 from genetic import genetic_algorithm
+from island import island_genetic_algorithm
+from decomposition import decomposed_genetic_algorithm, simulate_by_drone
+from route_state import ChromosomeState
 from visualize import plot_solution
 from data_generator import generate_scenario
 import time
 import random
 
-def analyze_solution(solution, drones, deliveries, noflyzones):
+def analyze_solution(solution, drones, deliveries, noflyzones, cache=None, scenario=None, routes=None, fit=None):
+    """
+    Çözümün teslimat, fitness ve ihlal özetini yazdırır.
+    routes (RouteState listesi, ör. decomposition.simulate_by_drone çıktısı) verilirse özet bu rota
+    durumlarından çıkarılır ve tüm senaryo derlenmez; fit verilmezse rota durumlarından hesaplanır.
+    """
     from genetic import fitness
-    total_delivered = sum(len(route) for route in solution.values())
     total_deliveries = len(deliveries)
-    fit = fitness(solution, drones, deliveries, noflyzones)
+    if routes is not None:
+        if fit is None:
+            fit = ChromosomeState(routes).score
+        total_delivered = sum(len(route) for route in solution.values())
+        print(f"Tamamlanan teslimat: {total_delivered}/{total_deliveries} (%{100*total_delivered/max(total_deliveries, 1):.1f})")
+        print(f"Fitness: {fit}")
+        print(f"Kural ihlali sayısı: {sum(route.violations[-1] for route in routes)}")
+        print(f"Zaman penceresi ihlali: {sum(route.time_violations[-1] for route in routes)}")
+        return
+    if scenario is None:
+        scenario = compile_scenario(drones, deliveries, noflyzones, cache)
+    cache = scenario.cache
+    total_delivered = sum(len(route) for route in solution.values())
+    fit = fitness(solution, drones, deliveries, noflyzones, scenario=scenario)
     print(f"Tamamlanan teslimat: {total_delivered}/{total_deliveries} (%{100*total_delivered/total_deliveries:.1f})")
     print(f"Fitness: {fit}")
-    # Kural ve zaman ihlali sayısı
-    delivery_map = {d.id: d for d in deliveries}
-    drone_map = {d.id: d for d in drones}
-    from datetime import datetime, timedelta
+    # Kural ve zaman ihlali sayısı (zamanlar gece yarısından itibaren mikro saniye)
+    weight = scenario.weight.tolist()
+    window_start = (scenario.window_start.astype(int) * US_PER_MINUTE).tolist()
+    window_end = (scenario.window_end.astype(int) * US_PER_MINUTE).tolist()
     kural_ihlali = 0
     zaman_ihlali = 0
     for drone_id, route in solution.items():
-        drone = drone_map[drone_id]
-        current_pos = drone.start_pos
-        current_battery = drone.battery
-        current_time = datetime.strptime("09:00", "%H:%M")
+        drone = scenario.drone_index[drone_id]
+        max_weight, speed = float(scenario.max_weight[drone]), float(scenario.speed[drone])
+        current_pos = int(scenario.start_node[drone])
+        current_battery = float(scenario.battery[drone])
+        current_time = round(float(scenario.ready_minute[drone]) * US_PER_MINUTE)
         for delivery_id in route:
-            delivery = delivery_map[delivery_id]
-            from graph_utils import euclidean_distance, edge_crosses_noflyzones
-            distance = euclidean_distance(current_pos, delivery.pos)
-            travel_time = distance / drone.speed
-            if delivery.weight > drone.max_weight or distance > current_battery or edge_crosses_noflyzones(current_pos, delivery.pos, noflyzones):
+            target = scenario.delivery_index[delivery_id]
+            distance = float(cache.distance[current_pos, target])
+            arrival_time = current_time + hours_to_us(distance / speed)
+            crossed = cache.crosses_at(current_pos, target, current_time / US_PER_MINUTE, arrival_time / US_PER_MINUTE)
+            if crossed and cache.detour is not None and cache.detour[current_pos, target] < float("inf"):
+                # Etkin zone'un etrafından dolanılır
+                distance = float(cache.detour[current_pos, target])
+                arrival_time = current_time + hours_to_us(distance / speed)
+                crossed = False
+            if weight[target] > max_weight or distance > current_battery or crossed:
                 kural_ihlali += 1
-            arrival_time = current_time + timedelta(hours=travel_time)
-            window_start = datetime.strptime(delivery.time_window[0], "%H:%M")
-            window_end = datetime.strptime(delivery.time_window[1], "%H:%M")
-            if arrival_time < window_start or arrival_time > window_end:
+            if arrival_time < window_start[target] or arrival_time > window_end[target]:
                 zaman_ihlali += 1
             current_battery -= distance
             current_time = arrival_time
-            current_pos = delivery.pos
+            current_pos = target
     print(f"Kural ihlali sayısı: {kural_ihlali}")
     print(f"Zaman penceresi ihlali: {zaman_ihlali}")
 
-def run_scenario(drones, deliveries, noflyzones, scenario_name, pop_size=30, generations=50):
-    """Belirli bir senaryoyu çalıştırır."""
+def run_scenario(drones, deliveries, noflyzones, scenario_name, pop_size=30, generations=50, islands=1, migration_interval=10, seed=None, cluster_size=None, paths=None):
+    """
+    Belirli bir senaryoyu çalıştırır.
+    islands > 1 ise ada modeli genetik algoritma CPU çekirdeklerine dağıtılır.
+    cluster_size verilirse senaryo uzamsal kümelere ayrılıp kümeler paralel çözülür.
+    paths (path_table.PathTable) verilirse bacaklar zone'ların etrafından dolanan yollarla puanlanır (kümeli modda kullanılmaz).
+    """
     print(f"\n--- {scenario_name} ---")
     start_time = time.time()
-    best_solution, best_fitness = genetic_algorithm(drones, deliveries, noflyzones, pop_size=pop_size, generations=generations)
+    scenario = routes = None
+    if cluster_size is not None:
+        # Kümeler kendi alt senaryolarını derler; tüm senaryo için M x M matris kurulmaz
+        best_solution, best_fitness = decomposed_genetic_algorithm(drones, deliveries, noflyzones, cluster_size=cluster_size, pop_size=pop_size, generations=generations, seed=seed)
+    elif islands > 1:
+        scenario = compile_scenario(drones, deliveries, noflyzones, paths=paths)
+        best_solution, best_fitness = island_genetic_algorithm(drones, deliveries, noflyzones, islands=islands, migration_interval=migration_interval, pop_size=pop_size, generations=generations, seed=seed, scenario=scenario)
+    else:
+        # Senaryo (mesafe ve kesişim matrisleri dahil) bir kez derlenir
+        scenario = compile_scenario(drones, deliveries, noflyzones, paths=paths)
+        best_solution, best_fitness = genetic_algorithm(drones, deliveries, noflyzones, pop_size=pop_size, generations=generations, seed=seed, scenario=scenario)
     elapsed = time.time() - start_time
+    if cluster_size is not None:
+        # Rapor da drone başına alt senaryolarla çıkarılır
+        routes = simulate_by_drone(best_solution, drones, deliveries, noflyzones)
     print(f"Sonuçlar:")
-    analyze_solution(best_solution, drones, deliveries, noflyzones)
+    analyze_solution(best_solution, drones, deliveries, noflyzones, scenario=scenario, routes=routes, fit=best_fitness)
     print(f"Çalışma süresi: {elapsed:.2f} sn")
     plot_solution(drones, deliveries, noflyzones, best_solution)
     return best_solution, best_fitness, elapsed
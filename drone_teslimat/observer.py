@@ -0,0 +1,63 @@
+import csv
+import json
+from dataclasses import dataclass, asdict, fields
+from typing import Callable, List
+
+@dataclass
+class GenerationStats:
+    """
+    Bir neslin özeti. Süreler saniye cinsindendir:
+    evaluation: puanlama (artımlı modda çocukların durum hesabı dahil)
+    selection: sıralama ve elitizm
+    crossover: ebeveyn seçimi ve çaprazlama, mutation: mutasyon
+    local_search: elitlerin yerel aramayla iyileştirilmesi (memetik mod)
+    pop_size / mutation_rate: bu neslin boyutu ve sonraki nesli üretirken kullanılan oran (uyarlamalı modda değişir)
+    cache_hits: fitness önbelleğinden (ya da aynı nesildeki kopyasından) gelen puan sayısı
+    duplicates: yeni nesilde değiştirilen klon sayısı
+    evaluations: bu nesilde puanlanan kromozom sayısı (önbellekten/ebeveynden gelenler hariç)
+    """
+    generation: int
+    best_fitness: float
+    mean_fitness: float
+    fitness_std: float          # popülasyon puanlarının standart sapması
+    unique_ratio: float         # farklı puan sayısı / popülasyon (çeşitlilik göstergesi)
+    best_so_far: float
+    evaluation: float
+    selection: float
+    crossover: float
+    mutation: float
+    evaluations: int
+    elapsed: float              # evrimin başından bu neslin sonuna kadar geçen süre
+    local_search: float = 0.0
+    pop_size: int = 0
+    mutation_rate: float = 0.0
+    cache_hits: int = 0
+    duplicates: int = 0
+
+# Gözlemci: her nesilden sonra GenerationStats ile çağrılan herhangi bir fonksiyon
+Observer = Callable[[GenerationStats], None]
+
+class GenerationRecorder:
+    """Nesil istatistiklerini biriktiren ve CSV/JSON olarak dışa aktaran hazır gözlemci."""
+
+    def __init__(self):
+        self.records: List[GenerationStats] = []
+
+    def __call__(self, stats: GenerationStats):
+        self.records.append(stats)
+
+    def totals(self) -> dict:
+        """Aşama sürelerinin, değerlendirme, önbellek isabeti ve klon sayılarının toplamı."""
+        keys = ("evaluation", "selection", "crossover", "mutation", "local_search", "evaluations", "cache_hits", "duplicates")
+        return {key: sum(getattr(r, key) for r in self.records) for key in keys}
+
+    def to_csv(self, filename: str):
+        with open(filename, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(GenerationStats)])
+            writer.writeheader()
+            for record in self.records:
+                writer.writerow(asdict(record))
+
+    def to_json(self, filename: str):
+        with open(filename, "w") as f:
+            json.dump([asdict(record) for record in self.records], f, indent=2)
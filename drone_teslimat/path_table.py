@@ -0,0 +1,128 @@
+import hashlib
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+from drone import Drone, DeliveryPoint, NoFlyZone
+from geometry import GeometryCache
+from graph_utils import visibility_edges
+from zone_index import NoFlyZoneIndex
+from astar import dijkstra
+
+# workers verilmediğinde bu kaynak sayısının altında Dijkstra'lar seri çalışır;
+# küçük haritalarda süreç havuzunu kurmak aramaların kendisinden pahalıdır
+SERIAL_SOURCES = 256
+
+# Her işçi süreçte bir kez kurulan kenar listeleri (offsets, targets, weights)
+_worker_edges = None
+
+def _init_worker(edges):
+    global _worker_edges
+    _worker_edges = edges
+
+def _run_sources(task):
+    sources, num_nodes = task
+    costs, preds = [], []
+    for source in sources:
+        dist, pred = dijkstra(None, source, _worker_edges)
+        costs.append(dist[:num_nodes])
+        preds.append(pred)
+    return costs, preds
+
+def map_key(drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], k: int = 8, clearance: float = 0.01) -> str:
+    """Harita parmak izi: düğüm konumları, zone köşeleri ve graf parametreleri aynıysa tablo yeniden kullanılabilir."""
+    digest = hashlib.sha1()
+    digest.update(np.array([d.pos for d in deliveries] + [d.start_pos for d in drones], dtype=float).tobytes())
+    for zone in noflyzones:
+        digest.update(np.array(zone.coordinates, dtype=float).tobytes())
+    digest.update(f"{k}:{clearance}".encode())
+    return digest.hexdigest()
+
+class PathTable:
+    """
+    Senaryo düğümleri (GeometryCache sırası: teslimatlar, ardından drone başlangıçları) arasında
+    zone'lara girmeyen en kısa yollar. Graf build_sparse_graph ile aynı görünürlük kenarlarıdır
+    (k-en yakın komşu + zone köşeleri), kenar ağırlığı yalnızca mesafedir.
+    Her senaryo düğümünden tek kaynaklı Dijkstra bir kez çalıştırılır:
+    cost[i, j]: i -> j en kısa yol uzunluğu (yol yoksa inf)
+    pred[i, v]: i kaynaklı en kısa yol ağacında v graf düğümünün öncülü (-1: yok)
+    Tablo aynı harita üzerindeki GA çalıştırmalarında (ve save/load ile süreçler arasında) yeniden kullanılır.
+    """
+
+    def __init__(self, points: np.ndarray, cost: np.ndarray, pred: np.ndarray, key: str):
+        self.points = points
+        self.cost = cost
+        self.pred = pred
+        self.key = key
+
+    @classmethod
+    def build(cls, drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], k: int = 8, clearance: float = 0.01, workers: Optional[int] = None, zone_index: Optional[NoFlyZoneIndex] = None) -> "PathTable":
+        """
+        Kaynaklar işçi süreçlere parçalar halinde dağıtılır; sonuç işçi sayısından bağımsızdır.
+        workers=None: SERIAL_SOURCES düğümden küçük haritalarda seri, aksi halde tüm çekirdekler.
+        """
+        points, src, dst, distance = visibility_edges(deliveries, drones, noflyzones, k, clearance, zone_index=zone_index)
+        num_points = len(points)
+        num_nodes = len(deliveries) + len(drones)
+        order = np.argsort(src, kind="stable")
+        offsets = np.zeros(num_points + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_points), out=offsets[1:])
+        edges = (offsets.tolist(), dst[order].tolist(), distance[order].tolist())
+        if workers is None:
+            workers = 1 if num_nodes < SERIAL_SOURCES else os.cpu_count() or 1
+        sources = list(range(num_nodes))
+        if workers > 1 and num_nodes > 1:
+            chunk = max(1, -(-num_nodes // (workers * 4)))
+            tasks = [(sources[i:i + chunk], num_nodes) for i in range(0, num_nodes, chunk)]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(edges,)) as pool:
+                results = list(pool.map(_run_sources, tasks))
+        else:
+            _init_worker(edges)
+            results = [_run_sources((sources, num_nodes))]
+        costs = [row for rows, _ in results for row in rows]
+        preds = [row for _, rows in results for row in rows]
+        cost = np.array(costs, dtype=float).reshape(num_nodes, num_nodes)
+        pred = np.array(preds, dtype=np.int32).reshape(num_nodes, num_points)
+        return cls(points, cost, pred, map_key(drones, deliveries, noflyzones, k, clearance))
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.cost)
+
+    def path(self, src: int, dst: int) -> Optional[List[int]]:
+        """src -> dst en kısa yolunun graf nokta indeksleri (ilk ve son eleman senaryo düğümleridir)."""
+        if not np.isfinite(self.cost[src, dst]):
+            return None
+        pred = self.pred[src]
+        path = [dst]
+        while path[-1] != src:
+            path.append(int(pred[path[-1]]))
+        return path[::-1]
+
+    def path_points(self, src: int, dst: int) -> Optional[np.ndarray]:
+        """src -> dst en kısa yolunun (L, 2) koordinatları."""
+        path = self.path(src, dst)
+        return None if path is None else self.points[path]
+
+    def apply(self, cache: GeometryCache) -> GeometryCache:
+        """
+        Düz bacağı bir zone'u kesen ve zone'lara girmeyen bir yolu olan çiftlere dolanma uzunluğunu ekler
+        (cache.detour, diğer çiftlerde inf). Kesişimler korunur: dolanma yolu yalnızca düz bacağın uçuş
+        süresince kestiği zone'lardan biri etkinse uçulur, zone kapalıyken düz bacak kullanılır.
+        cache değiştirilmez; kopyası döner.
+        """
+        if cache.positions.shape != (self.num_nodes, 2) or not np.array_equal(cache.positions, self.points[:self.num_nodes]):
+            raise ValueError("Yol tablosu bu senaryonun haritasına ait değil")
+        return cache.with_detours(np.where(cache.crosses, self.cost, np.inf))
+
+    def save(self, filename: str):
+        np.savez(filename, points=self.points, cost=self.cost, pred=self.pred, key=np.array(self.key))
+
+    @classmethod
+    def load(cls, filename: str, drones: Optional[List[Drone]] = None, deliveries: Optional[List[DeliveryPoint]] = None, noflyzones: Optional[List[NoFlyZone]] = None, k: int = 8, clearance: float = 0.01) -> "PathTable":
+        """Senaryo verilirse tablonun aynı haritaya (ve graf parametrelerine) ait olduğu doğrulanır."""
+        with np.load(filename) as data:
+            table = cls(data["points"], data["cost"], data["pred"], str(data["key"]))
+        if drones is not None and table.key != map_key(drones, deliveries, noflyzones, k, clearance):
+            raise ValueError(f"{filename} başka bir haritaya ait")
+        return table
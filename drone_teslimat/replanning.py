@@ -0,0 +1,221 @@
+import time
+import copy
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+from drone import Drone, DeliveryPoint, NoFlyZone
+from scenario import compile_scenario
+from batch_fitness import PopulationEvaluator
+from chromosome import encode_chromosome, decode_chromosome
+from genetic import create_initial_population, evolve_population
+from observer import Observer
+from zone_index import time_to_minutes
+
+@dataclass
+class AddDelivery:
+    delivery: DeliveryPoint
+
+@dataclass
+class CancelDelivery:
+    delivery_id: int
+
+@dataclass
+class ActivateZone:
+    zone: NoFlyZone
+
+@dataclass
+class DeactivateZone:
+    zone_id: int
+
+@dataclass
+class DroneUpdate:
+    """
+    Drone'un güncel konumu ve bataryası; completed, bu arada uçulup teslim edilen teslimatlar.
+    ready_time: drone'un pos'tan yeni plana kalkabileceği an ("HH:MM" ya da gece yarısından dakika);
+    verilmezse replan'daki şimdiki zaman kullanılır.
+    """
+    drone_id: int
+    pos: Tuple[float, float]
+    battery: float
+    completed: List[int] = field(default_factory=list)
+    ready_time: Optional[Union[str, float]] = None
+
+Event = Union[AddDelivery, CancelDelivery, ActivateZone, DeactivateZone, DroneUpdate]
+
+def _minutes(value: Union[str, float]) -> float:
+    return float(time_to_minutes(value)) if isinstance(value, str) else float(value)
+
+@dataclass
+class ReplanResult:
+    solution: Dict[int, List[int]]  # dondurulmuş (uçulmuş) bacaklar + yeni plan
+    fitness: float                  # yalnızca bekleyen teslimatların planı için
+    latency: float                  # saniye
+    generations: int
+    events: int
+
+class Replanner:
+    """
+    Olay güdümlü yeniden planlayıcı.
+    Son popülasyon saklanır; olaylar geldiğinde popülasyon yerinde onarılır
+    (iptal/teslim edilenler çıkarılır, yeniler en yakın durağın arkasına eklenir)
+    ve sonraki koşu sıfırdan değil bu popülasyondan başlar.
+    Uçulmuş bacaklar (DroneUpdate.completed) dondurulur: optimizasyondan çıkar, plana önek olarak eklenir.
+    time_budget (saniye) verilirse her plan/replan çağrısı, olayların uygulanması dahil bu süre dolunca
+    (en az bir nesil puanlandıktan sonra) o ana kadarki en iyi planla döner.
+    now (şimdiki zaman, "HH:MM" ya da dakika) verilirse yeni plan 09:00'dan değil bu andan başlar; her drone
+    max(now, DroneUpdate.ready_time) anında kalkar, zaman pencereleri ve zone'lar buna göre değerlendirilir.
+    """
+
+    def __init__(self, drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], pop_size=30, generations=50, replan_generations=15, crossover_rate=0.7, mutation_rate=0.2, seed: Optional[int] = None, observer: Optional[Observer] = None, time_budget: Optional[float] = None, now: Optional[Union[str, float]] = None):
+        self.drones = [copy.copy(d) for d in drones]
+        self.deliveries = list(deliveries)
+        self.noflyzones = list(noflyzones)
+        self.pop_size = pop_size
+        self.generations = generations
+        self.replan_generations = replan_generations
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.rng = np.random.default_rng(seed)
+        self.observer = observer
+        self.time_budget = time_budget
+        self.frozen = {d.id: [] for d in drones}
+        self.now = None if now is None else _minutes(now)
+        self.ready = {}  # drone id -> DroneUpdate.ready_time (dakika)
+        self.population = None
+        self.latencies = []
+        self._rebuild()
+
+    def _rebuild(self):
+        ready = dict(self.ready)
+        if self.now is not None:
+            ready = {d.id: max(self.now, ready.get(d.id, self.now)) for d in self.drones}
+        self.scenario = compile_scenario(self.drones, self.deliveries, self.noflyzones, ready=ready)
+        self.cache = self.scenario.cache
+        self.evaluate = PopulationEvaluator(self.scenario)
+
+    def plan(self) -> ReplanResult:
+        """İlk (soğuk) planlama."""
+        start = time.perf_counter()
+        self.population = create_initial_population(self.pop_size, self.drones, self.deliveries, self.rng)
+        return self._run(self.generations, start, 0)
+
+    def replan(self, events: List[Event], generations: Optional[int] = None, now: Optional[Union[str, float]] = None) -> ReplanResult:
+        """
+        Olayları uygular, popülasyonu onarır ve sıcak başlangıçla yeniden planlar.
+        now verilirse plan bu andan başlar (önceki now'ın yerine geçer).
+        """
+        start = time.perf_counter()
+        # Önce tüm toplu olaylar doğrulanır; hatalı bir olay durumu yarım değiştirmez
+        self._validate(events)
+        if now is not None:
+            self.now = _minutes(now)
+        if self.population is None:
+            self._apply(events, [])
+            self.population = create_initial_population(self.pop_size, self.drones, self.deliveries, self.rng)
+        else:
+            routes = [decode_chromosome(t, s, self.drones, self.deliveries) for t, s in zip(*self.population)]
+            self._apply(events, routes)
+            encoded = [encode_chromosome(r, self.drones, self.deliveries) for r in routes]
+            self.population = (np.array([t for t, _ in encoded], dtype=np.int64).reshape(len(encoded), len(self.deliveries)),
+                               np.array([s for _, s in encoded], dtype=np.int64))
+        return self._run(self.replan_generations if generations is None else generations, start, len(events))
+
+    def _run(self, generations: int, start: float, events: int) -> ReplanResult:
+        tours, splits = self.population
+        deadline = None if self.time_budget is None else start + self.time_budget
+        tours, splits, best, best_fitness, generations = evolve_population(tours, splits, self.evaluate, generations, self.rng, self.crossover_rate, self.mutation_rate,
+                                                                           observer=self.observer, deadline=deadline)
+        self.population = (tours, splits)
+        if best is None:
+            scores = self.evaluate(tours, splits)
+            best, best_fitness = (tours[0], splits[0]), float(scores[0])
+        plan = decode_chromosome(*best, self.drones, self.deliveries)
+        solution = {drone_id: self.frozen[drone_id] + route for drone_id, route in plan.items()}
+        latency = time.perf_counter() - start
+        self.latencies.append(latency)
+        return ReplanResult(solution, best_fitness, latency, generations, events)
+
+    def _validate(self, events: List[Event]):
+        """
+        Olay grubunu uygulamadan denetler: tekrarlanan teslimat/zone id'leri, bilinmeyen drone,
+        teslimat ya da zone id'leri ve tanınmayan olaylar ValueError'dur.
+        """
+        deliveries = {d.id for d in self.deliveries}
+        zones = {z.id for z in self.noflyzones}
+        drones = {d.id for d in self.drones}
+        seen = set(deliveries)
+        for event in events:
+            if isinstance(event, AddDelivery):
+                if event.delivery.id in seen:
+                    raise ValueError(f"Teslimat {event.delivery.id} zaten var")
+                if not drones:
+                    raise ValueError("Drone olmadan teslimat eklenemez")
+                seen.add(event.delivery.id)
+                deliveries.add(event.delivery.id)
+            elif isinstance(event, CancelDelivery):
+                if event.delivery_id not in deliveries:
+                    raise ValueError(f"Bilinmeyen ya da zaten kaldırılmış teslimat: {event.delivery_id}")
+                deliveries.discard(event.delivery_id)
+            elif isinstance(event, ActivateZone):
+                if event.zone.id in zones:
+                    raise ValueError(f"Zone {event.zone.id} zaten var")
+                zones.add(event.zone.id)
+            elif isinstance(event, DeactivateZone):
+                if event.zone_id not in zones:
+                    raise ValueError(f"Bilinmeyen zone: {event.zone_id}")
+                zones.discard(event.zone_id)
+            elif isinstance(event, DroneUpdate):
+                if event.drone_id not in drones:
+                    raise ValueError(f"Bilinmeyen drone: {event.drone_id}")
+                for delivery_id in event.completed:
+                    if delivery_id not in deliveries:
+                        raise ValueError(f"Bilinmeyen ya da zaten kaldırılmış teslimat: {delivery_id}")
+                    deliveries.discard(delivery_id)
+                if event.ready_time is not None:
+                    _minutes(event.ready_time)
+            else:
+                raise ValueError(f"Bilinmeyen olay: {event!r}")
+
+    def _apply(self, events: List[Event], routes: List[Dict[int, List[int]]]):
+        """Olayları senaryoya ve (varsa) popülasyonun rota sözlüklerine uygular (olaylar _validate'ten geçmiş olmalıdır)."""
+        removed, added = set(), []
+        for event in events:
+            if isinstance(event, AddDelivery):
+                added.append(event.delivery)
+            elif isinstance(event, CancelDelivery):
+                removed.add(event.delivery_id)
+            elif isinstance(event, ActivateZone):
+                self.noflyzones.append(event.zone)
+            elif isinstance(event, DeactivateZone):
+                self.noflyzones = [z for z in self.noflyzones if z.id != event.zone_id]
+            elif isinstance(event, DroneUpdate):
+                drone = next(d for d in self.drones if d.id == event.drone_id)
+                drone.start_pos = event.pos
+                drone.battery = event.battery
+                if event.ready_time is not None:
+                    self.ready[drone.id] = _minutes(event.ready_time)
+                self.frozen[drone.id].extend(event.completed)
+                removed.update(event.completed)
+        added = [d for d in added if d.id not in removed]
+        self.deliveries = [d for d in self.deliveries if d.id not in removed] + added
+        self._rebuild()
+        for chromosome in routes:
+            for drone_id in chromosome:
+                chromosome[drone_id] = [x for x in chromosome[drone_id] if x not in removed]
+            for delivery in added:
+                self._insert_nearest(chromosome, delivery)
+
+    def _insert_nearest(self, chromosome: Dict[int, List[int]], delivery: DeliveryPoint):
+        """Yeni teslimatı en yakın durağın (drone başlangıcı ya da teslimat) hemen arkasına ekler."""
+        target = self.cache.delivery_node(delivery.id)
+        distances = self.cache.distance[target]
+        best = None
+        for drone_id, route in chromosome.items():
+            stops = [self.cache.drone_node(drone_id)] + [self.cache.delivery_node(x) for x in route]
+            for position, node in enumerate(stops):
+                if best is None or distances[node] < best[0]:
+                    best = (distances[node], drone_id, position)
+        if best is None:
+            raise ValueError("Drone olmadan teslimat eklenemez")
+        _, drone_id, position = best
+        chromosome[drone_id].insert(position, delivery.id)
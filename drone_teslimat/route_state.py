@@ -0,0 +1,168 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from scenario import CompiledScenario, US_PER_MINUTE, hours_to_us
+from geometry import LegGeometry
+
+# Mutasyon hamlesi: (çıkarılan drone, rotadaki konumu, eklenen drone, eklenme konumu)
+Move = Tuple[int, int, int, int]
+
+class RouteState:
+    """
+    Tek bir drone rotasının simülasyon durumu.
+    nodes/battery/times: k durak işlendikten sonraki konum (düğüm indeksi), batarya ve zaman (uzunluk L+1)
+    times: gece yarısından itibaren mikro saniye (tamsayı)
+    delivered/violations/time_violations: k duraktan sonraki kümülatif sayılar (uzunluk L+1)
+    energy: her durağın bacak enerjisi (atlanan duraklar için 0.0, uzunluk L)
+    """
+    __slots__ = ("drone", "route", "nodes", "battery", "times", "delivered", "violations", "time_violations", "energy")
+
+    def __init__(self, drone: int, route: Tuple[int, ...]):
+        self.drone = drone
+        self.route = route
+
+class ChromosomeState:
+    """Drone rotalarının durumları ve bunlardan hesaplanan fitness."""
+    __slots__ = ("routes", "score")
+
+    def __init__(self, routes: List[RouteState], time_penalty: float = 500.0):
+        self.routes = routes
+        total_energy = 0.0
+        total_delivered = total_violations = total_time_violations = 0
+        for state in routes:
+            # fitness ile aynı toplama sırası: bacak bacak, drone sırasıyla
+            for energy in state.energy:
+                total_energy += energy
+            total_delivered += state.delivered[-1]
+            total_violations += state.violations[-1]
+            total_time_violations += state.time_violations[-1]
+        self.score = (total_delivered * 50) - (total_energy * 0.1) - (total_violations * 1000) - (total_time_violations * time_penalty)
+
+class IncrementalEvaluator:
+    """
+    Rota durumlarını tutan skaler değerlendirici.
+    scenario.cache bir LegGeometry ise mesafe ve kesişim matrisleri kurulmaz, her bacak ayrı hesaplanır.
+    Bir mutasyondan sonra yalnızca etkilenen iki drone, değişen duraktan itibaren yeniden
+    simüle edilir; çaprazlama çocukları değişmeden devraldıkları rotaların durumlarını
+    (drone, rota) anahtarlı bir tablodan yeniden kullanır.
+    """
+
+    def __init__(self, scenario: CompiledScenario, time_penalty: float = 500.0):
+        self.scenario = scenario
+        self.cache = scenario.cache
+        self.time_penalty = time_penalty
+        # Sıcak döngüde numpy skaler erişiminden kaçınmak için liste kopyaları
+        self.weight = scenario.weight.tolist()
+        self.window_start = (scenario.window_start.astype(np.int64) * US_PER_MINUTE).tolist()
+        self.window_end = (scenario.window_end.astype(np.int64) * US_PER_MINUTE).tolist()
+        self.max_weight = scenario.max_weight.tolist()
+        self.battery = scenario.battery.tolist()
+        self.speed = scenario.speed.tolist()
+        self.start_node = scenario.start_node.tolist()
+        self.start_time = np.rint(scenario.ready_minute * US_PER_MINUTE).astype(np.int64).tolist()
+        self.simulated_stops = 0
+        if isinstance(self.cache, LegGeometry):
+            # Derlenmemiş senaryo: bacaklar sorulduğunda hesaplanır
+            self._distance = self.cache.distance_rows()
+            self._may_cross = self.cache.may_cross_rows()
+        else:
+            self._distance = scenario.distance_rows()
+            self._may_cross = scenario.may_cross_rows()
+
+    def simulate_route(self, drone: int, route: Sequence[int], base: Optional[RouteState] = None, start: int = 0) -> RouteState:
+        """
+        drone indeksinin rotasını (teslimat indeksleri) simüle eder.
+        base verilirse ilk `start` durağın durumu ondan kopyalanır ve simülasyon oradan sürer.
+        """
+        max_weight, speed = self.max_weight[drone], self.speed[drone]
+        state = RouteState(drone, tuple(route))
+        if base is None:
+            start = 0
+            state.nodes = [self.start_node[drone]]
+            state.battery = [self.battery[drone]]
+            state.times = [self.start_time[drone]]
+            state.delivered, state.violations, state.time_violations = [0], [0], [0]
+            state.energy = []
+        else:
+            state.nodes = base.nodes[:start + 1]
+            state.battery = base.battery[:start + 1]
+            state.times = base.times[:start + 1]
+            state.delivered = base.delivered[:start + 1]
+            state.violations = base.violations[:start + 1]
+            state.time_violations = base.time_violations[:start + 1]
+            state.energy = base.energy[:start]
+        node, battery, current_time = state.nodes[-1], state.battery[-1], state.times[-1]
+        delivered, violations, time_violations = state.delivered[-1], state.violations[-1], state.time_violations[-1]
+        distances = self._distance
+        may_cross = self._may_cross
+        crosses_at = self.cache.crosses_at
+        detour = self.cache.detour
+        for target in state.route[start:]:
+            distance = distances[node][target]
+            energy = 0.0
+            crossed = False
+            if may_cross[node][target] and self.weight[target] <= max_weight:
+                # Uçuş süresince ([kalkış, varış]) etkin olan zone kesilir; dolanma yolu varsa o uçulur
+                crossed = crosses_at(node, target, current_time / US_PER_MINUTE, (current_time + hours_to_us(distance / speed)) / US_PER_MINUTE)
+                if crossed and detour is not None and detour[node, target] < np.inf:
+                    distance = float(detour[node, target])
+                    crossed = False
+            if self.weight[target] > max_weight or distance > battery:
+                # Kapasite ya da batarya yetersiz: teslimat atlanır
+                violations += 1
+            else:
+                if crossed:
+                    # Zone ihlali: zaman ilerlemez
+                    violations += 1
+                else:
+                    arrival_time = current_time + hours_to_us(distance / speed)
+                    if arrival_time < self.window_start[target] or arrival_time > self.window_end[target]:
+                        time_violations += 1
+                    delivered += 1
+                    current_time = arrival_time
+                energy = distance
+                battery -= distance
+                node = target
+            state.energy.append(energy)
+            state.nodes.append(node)
+            state.battery.append(battery)
+            state.times.append(current_time)
+            state.delivered.append(delivered)
+            state.violations.append(violations)
+            state.time_violations.append(time_violations)
+        self.simulated_stops += len(state.route) - start
+        return state
+
+    def evaluate(self, tour: np.ndarray, splits: np.ndarray, memo: Optional[Dict[Tuple[int, Tuple[int, ...]], RouteState]] = None) -> ChromosomeState:
+        """Kromozomun tüm rotalarını (memo'da olmayanları) simüle eder."""
+        bounds = splits.tolist()
+        stops = tour.tolist()
+        routes = []
+        for drone in range(len(bounds) - 1):
+            route = tuple(stops[bounds[drone]:bounds[drone + 1]])
+            state = memo.get((drone, route)) if memo is not None else None
+            if state is None:
+                state = self.simulate_route(drone, route)
+                if memo is not None:
+                    memo[(drone, route)] = state
+            routes.append(state)
+        return ChromosomeState(routes, self.time_penalty)
+
+    def apply_move(self, parent: ChromosomeState, tour: np.ndarray, splits: np.ndarray, move: Move) -> ChromosomeState:
+        """
+        Mutasyonla (move) elde edilen çocuğu değerlendirir: yalnızca iki drone,
+        ilk değişen duraktan itibaren yeniden simüle edilir.
+        """
+        drone, pos, new_drone, insert_pos = move
+        routes = list(parent.routes)
+        bounds = splits.tolist()
+        changed = {drone: pos} if drone != new_drone else {drone: min(pos, insert_pos)}
+        if drone != new_drone:
+            changed[new_drone] = insert_pos
+        for d, start in changed.items():
+            route = tour[bounds[d]:bounds[d + 1]].tolist()
+            routes[d] = self.simulate_route(d, route, parent.routes[d], start)
+        return ChromosomeState(routes, self.time_penalty)
+
+    def __call__(self, tours: np.ndarray, splits: np.ndarray) -> np.ndarray:
+        """PopulationEvaluator ile aynı arayüz: (P,) fitness dizisi."""
+        return np.array([self.evaluate(tours[i], splits[i]).score for i in range(len(tours))], dtype=float)
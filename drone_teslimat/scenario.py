@@ -0,0 +1,90 @@
+import math
+import numpy as np
+from typing import Dict, List, Optional
+from drone import Drone, DeliveryPoint, NoFlyZone
+from geometry import GeometryCache
+from zone_index import time_to_minutes
+from scenario_format import ScenarioArrays
+
+US_PER_HOUR = 3600000000
+US_PER_MINUTE = 60000000
+
+def hours_to_us(hours: float) -> int:
+    """timedelta(hours=h) ile aynı mikro saniye yuvarlaması (tam kısım + kesirli kısmın çifte yuvarlanması)."""
+    whole = math.floor(hours)
+    return int(whole) * US_PER_HOUR + round((hours - whole) * US_PER_HOUR)
+
+class CompiledScenario:
+    """
+    Senaryonun bir kez derlenmiş, sıcak döngülere uygun gösterimi.
+    Teslimatlar 0..N-1, drone'lar 0..D-1 yoğun indekslerle adreslenir (deliveries/drones listelerindeki sıra).
+    Zaman pencereleri gece yarısından itibaren tamsayı dakikadır; ağırlık, öncelik, hız ve
+    batarya tipli dizilerdir. Mesafe ve kesişimler cache (GeometryCache) üzerinden okunur.
+    ready_minute[d]: d. drone'un ilk bacağa kalkabileceği dakika (ready'de verilmeyenler start_minute).
+    """
+    __slots__ = ("drones", "deliveries", "noflyzones", "cache", "delivery_ids", "drone_ids",
+                 "delivery_index", "drone_index", "weight", "priority", "window_start", "window_end",
+                 "max_weight", "battery", "speed", "start_node", "start_minute", "ready_minute", "_distance_rows", "_may_cross_rows")
+
+    def __init__(self, drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], cache: Optional[GeometryCache] = None, ready: Optional[Dict[int, float]] = None):
+        if cache is None:
+            cache = GeometryCache(drones, deliveries, noflyzones)
+        self.drones = drones
+        self.deliveries = deliveries
+        self.noflyzones = noflyzones
+        self.cache = cache
+        self.delivery_ids = np.array([d.id for d in deliveries], dtype=np.int64)
+        self.drone_ids = np.array([d.id for d in drones], dtype=np.int64)
+        self.delivery_index = {d.id: i for i, d in enumerate(deliveries)}
+        self.drone_index = {d.id: i for i, d in enumerate(drones)}
+        self.weight = np.array([d.weight for d in deliveries], dtype=np.float64)
+        self.priority = np.array([d.priority for d in deliveries], dtype=np.int8)
+        self.window_start = np.array([time_to_minutes(d.time_window[0]) for d in deliveries], dtype=np.int32)
+        self.window_end = np.array([time_to_minutes(d.time_window[1]) for d in deliveries], dtype=np.int32)
+        self.max_weight = np.array([d.max_weight for d in drones], dtype=np.float64)
+        self.battery = np.array([d.battery for d in drones], dtype=np.float64)
+        self.speed = np.array([d.speed for d in drones], dtype=np.float64)
+        self.start_node = np.array([cache.drone_node(d.id) for d in drones], dtype=np.int64)
+        self.start_minute = time_to_minutes("09:00")  # Her drone 09:00'da başlıyor varsayalım
+        ready = ready or {}
+        self.ready_minute = np.array([ready.get(d.id, self.start_minute) for d in drones], dtype=np.float64)
+        self._distance_rows = None
+        self._may_cross_rows = None
+
+    @classmethod
+    def from_arrays(cls, arrays: ScenarioArrays, cache: Optional[GeometryCache] = None) -> "CompiledScenario":
+        """scenario_format ile yüklenmiş sütunlu senaryodan derler."""
+        return cls(*arrays.to_objects(), cache=cache)
+
+    @property
+    def num_deliveries(self) -> int:
+        return len(self.deliveries)
+
+    @property
+    def num_drones(self) -> int:
+        return len(self.drones)
+
+    def distance_rows(self) -> List[List[float]]:
+        """Skaler döngüler için mesafe matrisinin liste kopyası (ilk çağrıda oluşturulur)."""
+        if self._distance_rows is None:
+            self._distance_rows = self.cache.distance.tolist()
+        return self._distance_rows
+
+    def may_cross_rows(self) -> List[List[bool]]:
+        """Zamandan bağımsız kesişim matrisinin liste kopyası (ilk çağrıda oluşturulur)."""
+        if self._may_cross_rows is None:
+            self._may_cross_rows = self.cache.crosses.tolist()
+        return self._may_cross_rows
+
+def compile_scenario(drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], cache: Optional[GeometryCache] = None, paths=None, ready: Optional[Dict[int, float]] = None) -> CompiledScenario:
+    """
+    Yüklenen dataclass listelerini bir kez CompiledScenario'ya çevirir.
+    paths (path_table.PathTable) verilirse zone kesen bacaklar düz çizgi yerine zone'ların
+    etrafından dolanan en kısa yolun uzunluğuyla puanlanır.
+    ready (drone id -> dakika) verilirse drone'lar 09:00 yerine bu anlarda kalkar (ör. yeniden planlamada şimdiki zaman).
+    """
+    if paths is not None:
+        if cache is None:
+            cache = GeometryCache(drones, deliveries, noflyzones)
+        cache = paths.apply(cache)
+    return CompiledScenario(drones, deliveries, noflyzones, cache, ready)
@@ -0,0 +1,119 @@
+import json
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from drone import Drone, DeliveryPoint, NoFlyZone
+from zone_index import time_to_minutes
+
+# Dosya düzeni: MAGIC | başlık uzunluğu (uint64, little endian) | JSON başlık | 64 bayta hizalı ham sütunlar
+MAGIC = b"DRNSCN1\0"
+ALIGN = 64
+
+DRONE_COLUMNS = ("drone_id", "drone_max_weight", "drone_battery", "drone_speed", "drone_start")
+DELIVERY_COLUMNS = ("delivery_id", "delivery_pos", "delivery_weight", "delivery_priority", "delivery_window")
+ZONE_COLUMNS = ("zone_id", "zone_coordinates", "zone_active")
+
+def minutes_to_time(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+@dataclass
+class ScenarioArrays:
+    """
+    Senaryonun sütunlu (struct-of-arrays) gösterimi.
+    Zamanlar gece yarısından itibaren dakika (int16), zone köşeleri (Z, 4, 2) dizisidir.
+    """
+    drone_id: np.ndarray
+    drone_max_weight: np.ndarray
+    drone_battery: np.ndarray
+    drone_speed: np.ndarray
+    drone_start: np.ndarray
+    delivery_id: np.ndarray
+    delivery_pos: np.ndarray
+    delivery_weight: np.ndarray
+    delivery_priority: np.ndarray
+    delivery_window: np.ndarray
+    zone_id: np.ndarray
+    zone_coordinates: np.ndarray
+    zone_active: np.ndarray
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in DRONE_COLUMNS + DELIVERY_COLUMNS + ZONE_COLUMNS}
+
+    @classmethod
+    def from_objects(cls, drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone]) -> "ScenarioArrays":
+        return cls(
+            drone_id=np.array([d.id for d in drones], dtype=np.int64),
+            drone_max_weight=np.array([d.max_weight for d in drones], dtype=np.float64),
+            drone_battery=np.array([d.battery for d in drones], dtype=np.int64),
+            drone_speed=np.array([d.speed for d in drones], dtype=np.float64),
+            drone_start=np.array([d.start_pos for d in drones], dtype=np.float64).reshape(len(drones), 2),
+            delivery_id=np.array([d.id for d in deliveries], dtype=np.int64),
+            delivery_pos=np.array([d.pos for d in deliveries], dtype=np.float64).reshape(len(deliveries), 2),
+            delivery_weight=np.array([d.weight for d in deliveries], dtype=np.float64),
+            delivery_priority=np.array([d.priority for d in deliveries], dtype=np.int8),
+            delivery_window=np.array([(time_to_minutes(d.time_window[0]), time_to_minutes(d.time_window[1])) for d in deliveries], dtype=np.int16).reshape(len(deliveries), 2),
+            zone_id=np.array([z.id for z in noflyzones], dtype=np.int64),
+            zone_coordinates=np.array([z.coordinates for z in noflyzones], dtype=np.float64).reshape(len(noflyzones), 4, 2),
+            zone_active=np.array([(time_to_minutes(z.active_time[0]), time_to_minutes(z.active_time[1])) for z in noflyzones], dtype=np.int16).reshape(len(noflyzones), 2),
+        )
+
+    def to_objects(self) -> Tuple[List[Drone], List[DeliveryPoint], List[NoFlyZone]]:
+        """Mevcut algoritmaların kullandığı dataclass listelerine çevirir."""
+        drones = [Drone(id=i, max_weight=w, battery=b, speed=s, start_pos=(x, y))
+                  for i, w, b, s, (x, y) in zip(self.drone_id.tolist(), self.drone_max_weight.tolist(), self.drone_battery.tolist(),
+                                               self.drone_speed.tolist(), self.drone_start.tolist())]
+        deliveries = [DeliveryPoint(id=i, pos=(x, y), weight=w, priority=p, time_window=(minutes_to_time(a), minutes_to_time(b)))
+                      for i, (x, y), w, p, (a, b) in zip(self.delivery_id.tolist(), self.delivery_pos.tolist(), self.delivery_weight.tolist(),
+                                                         self.delivery_priority.tolist(), self.delivery_window.tolist())]
+        noflyzones = [NoFlyZone(id=i, coordinates=[tuple(c) for c in coords], active_time=(minutes_to_time(a), minutes_to_time(b)))
+                      for i, coords, (a, b) in zip(self.zone_id.tolist(), self.zone_coordinates.tolist(), self.zone_active.tolist())]
+        return drones, deliveries, noflyzones
+
+def save_columns(filename: str, columns: Dict[str, np.ndarray]):
+    """Sütunları başlık + hizalı ham diziler olarak tek dosyaya yazar."""
+    layout = {}
+    offset = 0
+    arrays = {}
+    for name, array in columns.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    header = json.dumps({"version": 1, "columns": layout}).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+    with open(filename, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+
+def load_columns(filename: str, mmap: bool = True) -> Dict[str, np.ndarray]:
+    """
+    save_columns ile yazılmış dosyayı okur.
+    mmap=True ise sütunlar salt okunur np.memmap olarak döner; veri ancak erişildikçe diskten okunur.
+    """
+    with open(filename, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{filename} bir senaryo dosyası değil")
+        header_length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(header_length))
+        data_start = -(-(len(MAGIC) + 8 + header_length) // ALIGN) * ALIGN
+        columns = {}
+        for name, spec in header["columns"].items():
+            dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+            if mmap and int(np.prod(shape)) > 0:
+                columns[name] = np.memmap(filename, dtype=dtype, mode="r", offset=data_start + spec["offset"], shape=shape)
+            else:
+                f.seek(data_start + spec["offset"])
+                count = int(np.prod(shape))
+                columns[name] = np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype, count=count).reshape(shape)
+    return columns
+
+def save_scenario(filename: str, scenario: ScenarioArrays):
+    save_columns(filename, scenario.columns())
+
+def load_scenario(filename: str, mmap: bool = True) -> ScenarioArrays:
+    return ScenarioArrays(**load_columns(filename, mmap))
@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+import numpy as np
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from data_loader import load_drones, load_deliveries, load_noflyzones, load_scenario_objects
+from scenario import compile_scenario
+from genetic import genetic_algorithm, simulate_chromosome
+from decomposition import decomposed_genetic_algorithm, simulate_by_drone
+from fitness_cache import FitnessCache
+
+# /solve isteklerinde kabul edilen çözücü parametreleri ve varsayılanları (batch.DEFAULT_PARAMS ile aynı,
+# gecikme sınırlı planlama için süre ve durgunluk sınırları eklenmiş)
+SOLVE_PARAMS = {"pop_size": 30, "generations": 50, "crossover_rate": 0.7, "mutation_rate": 0.2, "seed": 0,
+                "memetic": False, "incremental": False, "cluster_size": None, "heuristic_fraction": 0.0,
+                "time_budget": None, "stall_generations": None, "adaptive": False, "deduplicate": False}
+
+# /solve parametrelerinin JSON türleri ve alt sınırları (None: parametre boş bırakılabilir)
+_INT, _NUMBER, _BOOL = "int", "number", "bool"
+PARAM_TYPES = {"pop_size": (_INT, 1, False), "generations": (_INT, 1, True), "crossover_rate": (_NUMBER, 0, False),
+               "mutation_rate": (_NUMBER, 0, False), "seed": (_INT, 0, True), "memetic": (_BOOL, None, False),
+               "incremental": (_BOOL, None, False), "cluster_size": (_INT, 1, True), "heuristic_fraction": (_NUMBER, 0, False),
+               "time_budget": (_NUMBER, 0, True), "stall_generations": (_INT, 1, True), "adaptive": (_BOOL, None, False),
+               "deduplicate": (_BOOL, None, False)}
+
+def check_params(params: Dict):
+    """İstek parametrelerini PARAM_TYPES'a göre denetler; hatalı tür ya da aralık ValueError'dur (HTTP 400)."""
+    for name, value in params.items():
+        kind, minimum, optional = PARAM_TYPES[name]
+        if value is None:
+            if not optional:
+                raise ValueError(f"{name} boş olamaz")
+            continue
+        if kind == _BOOL:
+            valid = isinstance(value, bool)
+        elif kind == _INT:
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        else:
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if not valid:
+            raise ValueError(f"{name} {kind} olmalı: {value!r}")
+        if minimum is not None and value < minimum:
+            raise ValueError(f"{name} en az {minimum} olmalı: {value!r}")
+
+# Kümeli çözücünün (cluster_size) desteklemediği parametreler; varsayılan dışı değerler reddedilir
+CLUSTER_UNSUPPORTED = ("time_budget", "stall_generations", "adaptive", "deduplicate", "incremental")
+
+# Bir işçi sürecin sıcak tuttuğu en fazla senaryo sayısı (LRU)
+WORKER_SCENARIOS = 4
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# İşçi süreçte (anahtar -> (drones, deliveries, noflyzones, CompiledScenario, FitnessCache)) sıcak senaryolar
+_worker_scenarios = OrderedDict()
+
+def _load(files: Tuple[str, ...]):
+    if len(files) == 1:
+        return load_scenario_objects(files[0])
+    return load_drones(files[0]), load_deliveries(files[1]), load_noflyzones(files[2])
+
+def _warm(key: Tuple[str, int], files: Tuple[str, ...], cache_bytes: Optional[int]):
+    """Senaryoyu bu süreçte yükleyip derler (zaten sıcaksa yalnızca LRU sırasını günceller)."""
+    entry = _worker_scenarios.get(key)
+    if entry is None:
+        drones, deliveries, noflyzones = _load(files)
+        scenario = compile_scenario(drones, deliveries, noflyzones)
+        entry = (drones, deliveries, noflyzones, scenario, None if cache_bytes is None else FitnessCache(cache_bytes))
+        _worker_scenarios[key] = entry
+        if len(_worker_scenarios) > WORKER_SCENARIOS:
+            _worker_scenarios.popitem(last=False)
+    _worker_scenarios.move_to_end(key)
+    return entry
+
+def _warm_task(key: Tuple[str, int], files: Tuple[str, ...], cache_bytes: Optional[int]) -> int:
+    _warm(key, files, cache_bytes)
+    return os.getpid()
+
+def _solve(key: Tuple[str, int], files: Tuple[str, ...], params: Dict, cache_bytes: Optional[int]) -> Dict:
+    """
+    Tek bir isteği işçi süreçte çözer; senaryo, geometri matrisleri ve fitness önbelleği
+    bu süreçteki istekler arasında paylaşılır. Hata olursa istisna yerine "error" alanlı bir kayıt döner
+    (parametreler solve() içinde doğrulandığından bu bir çözücü hatasıdır; /solve 500 döner).
+    """
+    drones, deliveries, noflyzones, scenario, fitness_cache = _warm(key, files, cache_bytes)
+    params = dict(params)
+    cluster_size = params.pop("cluster_size")
+    start = time.perf_counter()
+    try:
+        if cluster_size is not None:
+            # solve() bu parametrelerin varsayılanda kaldığını doğrular
+            for name in CLUSTER_UNSUPPORTED:
+                params.pop(name)
+            solution, best_fitness = decomposed_genetic_algorithm(drones, deliveries, noflyzones, cluster_size=cluster_size, workers=1, **params)
+            routes = simulate_by_drone(solution, drones, deliveries, noflyzones)
+        else:
+            if params["incremental"]:
+                # Artımlı mod puan önbelleğini kullanamaz; yanıtta "fitness_cache": null görünür
+                fitness_cache = None
+            solution, best_fitness = genetic_algorithm(drones, deliveries, noflyzones, scenario=scenario, fitness_cache=fitness_cache, **params)
+            routes = simulate_chromosome(solution, drones, deliveries, noflyzones, scenario=scenario).routes
+    except Exception as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+    return {
+        "solution": solution, "fitness": best_fitness, "solve_time": time.perf_counter() - start,
+        "delivered": sum(route.delivered[-1] for route in routes),
+        "violations": sum(route.violations[-1] for route in routes),
+        "time_violations": sum(route.time_violations[-1] for route in routes),
+        "fitness_cache": None if cluster_size is not None or fitness_cache is None else fitness_cache.stats(),
+    }
+
+class PlanningServer:
+    """
+    Uzun ömürlü yerel planlama sunucusu (asyncio, HTTP/1.1 üzerinden JSON; TCP ya da Unix soketi).
+    Senaryolar bir kez kaydedilir; işçi süreçler her senaryoyu ilk kullanımda derleyip sıcak tutar.
+    Aynı senaryoya batch_window saniye içinde gelen (en fazla max_batch) /solve istekleri toplanır;
+    aynı parametreli istekler bir kez çözülür, farklı istekler ayrı havuz görevleri olarak paralel çözülür.
+    Uç noktalar:
+      GET  /health, /stats, /scenarios
+      POST /scenarios  {"name": ..., "files": [".bin"] ya da [drones, deliveries, noflyzones .txt]}
+      POST /solve      {"scenario": ..., "params": {SOLVE_PARAMS alt kümesi}}
+    """
+
+    def __init__(self, workers: Optional[int] = None, batch_window: float = 0.005, max_batch: int = 8, cache_bytes: Optional[int] = 16 * 1024 * 1024, latency_window: int = 1000):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.cache_bytes = cache_bytes
+        # spawn: işçiler dinleme soketini ve olay döngüsünün iş parçacıklarını devralmaz
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self.scenarios = {}
+        self.pending = {}               # senaryo anahtarı -> [(parametreler, future), ...]
+        self.timers = {}
+        self.waiting = 0                # havuza gönderilmeyi bekleyen istekler
+        self.running = 0                # havuzda çözülmekte olan istekler
+        self.latencies = deque(maxlen=latency_window)
+        self.counters = {"requests": 0, "solved": 0, "errors": 0, "batches": 0, "deduplicated": 0}
+        self.started = time.time()
+
+    async def register(self, name: str, files: List[str], warm: bool = True) -> Dict:
+        """Senaryoyu kaydeder (aynı adla yeniden kayıt yeni sürüm açar); warm=True ise işçileri ısıtır."""
+        files = tuple(files)
+        if len(files) not in (1, 3):
+            raise ValueError("files: bir .bin ya da drones/deliveries/noflyzones .txt üçlüsü olmalı")
+        loop = asyncio.get_running_loop()
+        # Dosyalar burada bir kez okunarak doğrulanır; olay döngüsü bloklanmaz
+        drones, deliveries, noflyzones = await loop.run_in_executor(None, _load, files)
+        previous = self.scenarios.get(name)
+        key = (name, previous["version"] + 1 if previous else 1)
+        info = {"name": name, "version": key[1], "files": list(files), "drones": len(drones),
+                "deliveries": len(deliveries), "noflyzones": len(noflyzones)}
+        self.scenarios[name] = info
+        if warm:
+            # Derleme süresi görevlerin farklı işçilere dağılmasına yeter
+            pids = await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_task, key, files, self.cache_bytes)
+                                          for _ in range(self.workers)))
+            info["warm_workers"] = len(set(pids))
+        return info
+
+    async def solve(self, name: str, params: Optional[Dict] = None) -> Dict:
+        info = self.scenarios.get(name)
+        if info is None:
+            raise LookupError(f"Bilinmeyen senaryo: {name}")
+        if params is not None and not isinstance(params, dict):
+            raise ValueError("params bir JSON nesnesi olmalı")
+        unknown = set(params or {}) - set(SOLVE_PARAMS)
+        if unknown:
+            raise ValueError(f"Bilinmeyen parametre: {', '.join(sorted(unknown))}")
+        check_params(params or {})
+        params = {**SOLVE_PARAMS, **(params or {})}
+        if params["generations"] is None and params["time_budget"] is None and params["stall_generations"] is None:
+            raise ValueError("generations=null için time_budget ya da stall_generations gerekli")
+        if params["cluster_size"] is not None:
+            ignored = [name for name in CLUSTER_UNSUPPORTED if params[name] != SOLVE_PARAMS[name]]
+            if ignored:
+                raise ValueError(f"cluster_size ile desteklenmeyen parametre: {', '.join(ignored)}")
+        key = (name, info["version"])
+        arrived = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self.counters["requests"] += 1
+        self.waiting += 1
+        batch = self.pending.setdefault(key, [])
+        batch.append((params, future))
+        if len(batch) >= self.max_batch:
+            self._flush(key)
+        elif key not in self.timers:
+            self.timers[key] = asyncio.get_running_loop().call_later(self.batch_window, self._flush, key)
+        record = await future
+        latency = time.perf_counter() - arrived
+        self.latencies.append(latency)
+        return {**record, "scenario": name, "version": key[1], "latency": latency}
+
+    def _flush(self, key):
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self.pending.pop(key, [])
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(key, batch))
+
+    async def _run_batch(self, key, batch):
+        # Aynı parametreli istekler tek çözüm paylaşır; farklı olanlar havuzda paralel çözülür
+        groups = OrderedDict()
+        for params, future in batch:
+            groups.setdefault(json.dumps(params, sort_keys=True), (params, []))[1].append(future)
+        self.waiting -= len(batch)
+        self.counters["batches"] += 1
+        self.counters["deduplicated"] += len(batch) - len(groups)
+        files = tuple(self.scenarios[key[0]]["files"])
+        await asyncio.gather(*(self._run_group(key, files, params, futures, len(batch)) for params, futures in groups.values()))
+
+    async def _run_group(self, key, files, params, futures, batch_size):
+        self.running += len(futures)
+        try:
+            record = await asyncio.get_running_loop().run_in_executor(self.pool, _solve, key, files, params, self.cache_bytes)
+        except Exception as error:
+            record = {"error": f"{type(error).__name__}: {error}"}
+        finally:
+            self.running -= len(futures)
+        record = {**record, "batch": batch_size, "shared": len(futures)}
+        failed = "error" in record
+        for future in futures:
+            self.counters["errors" if failed else "solved"] += 1
+            if not future.done():
+                future.set_result(record)
+
+    def stats(self) -> Dict:
+        latencies = np.array(self.latencies) * 1000
+        percentiles = ({f"p{q}": float(np.percentile(latencies, q)) for q in (50, 90, 99)}
+                       if len(latencies) else {"p50": None, "p90": None, "p99": None})
+        return {"queue_depth": self.waiting + self.running, "waiting": self.waiting, "running": self.running,
+                "workers": self.workers, "scenarios": len(self.scenarios), "uptime": time.time() - self.started,
+                "latency_ms": {**percentiles, "samples": len(latencies)}, **self.counters}
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        try:
+            payload = json.loads(body) if body else {}
+            if path == "/health":
+                return 200, {"status": "ok"}
+            if path == "/stats" and method == "GET":
+                return 200, self.stats()
+            if path == "/scenarios" and method == "GET":
+                return 200, {"scenarios": list(self.scenarios.values())}
+            if path == "/scenarios" and method == "POST":
+                return 200, await self.register(payload["name"], payload["files"], payload.get("warm", True))
+            if path == "/solve" and method == "POST":
+                record = await self.solve(payload["scenario"], payload.get("params"))
+                # Doğrulanmış parametrelerle çözücünün kendisi hata verdiyse sunucu hatasıdır
+                return (500 if "error" in record else 200), record
+            if path in ("/stats", "/scenarios", "/solve"):
+                return 405, {"error": f"{method} {path} desteklenmiyor"}
+            return 404, {"error": f"Bilinmeyen yol: {path}"}
+        except KeyError as error:
+            return 400, {"error": f"Eksik alan: {error}"}
+        except LookupError as error:
+            return 404, {"error": str(error)}
+        except (ValueError, TypeError, OSError) as error:
+            return 400, {"error": f"{type(error).__name__}: {error}"}
+        except Exception as error:
+            return 500, {"error": f"{type(error).__name__}: {error}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Kalıcı bağlantılı (keep-alive) en küçük HTTP/1.1 işleyicisi."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, path, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._route(method, path.split("?")[0], body)
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+                close = headers.get("connection", "").lower()
+                if close == "close" or (version == "HTTP/1.0" and close != "keep-alive"):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, unix: Optional[str] = None):
+        if unix is not None:
+            server = await asyncio.start_unix_server(self._handle, path=unix)
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, task.cancel)
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+async def _main(args):
+    server = PlanningServer(args.workers, args.batch_window, args.max_batch)
+    try:
+        for item in args.scenario:
+            name, _, files = item.partition("=")
+            info = await server.register(name, files.split(","))
+            print(json.dumps(info), flush=True)
+        where = args.unix or f"http://{args.host}:{args.port}"
+        print(f"Planlama sunucusu dinliyor: {where}", flush=True)
+        await server.serve(args.host, args.port, args.unix)
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Senaryoları sıcak tutan, istekleri toplayan yerel planlama sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="verilirse TCP yerine bu Unix soketinde dinlenir")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-window", type=float, default=0.005, help="aynı senaryo isteklerinin toplandığı süre (sn)")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--scenario", action="append", default=[], help="ad=dosya[,dosya,dosya] (tekrarlanabilir), başlangıçta kaydedilir")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modüller drone_teslimat/ altında düz durur (python main.py gibi); testler de oradan içe aktarır
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -1,36 +1,114 @@
-import matplotlib.pyplot as plt
+import os
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.lines import Line2D
 from drone import Drone, DeliveryPoint, NoFlyZone
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
-def plot_solution(drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], solution: Dict[int, List[int]]):
-    delivery_map = {d.id: d for d in deliveries}
-    # Noktaları çiz
-    for drone in drones:
-        plt.scatter(*drone.start_pos, c='blue', marker='s', s=100, label='Drone Start' if drone.id == drones[0].id else "")
-    for delivery in deliveries:
-        plt.scatter(*delivery.pos, c='green', marker='o', s=80, label='Delivery' if delivery.id == deliveries[0].id else "")
-    # No-fly zone'ları çiz
-    for i, zone in enumerate(noflyzones):
-        coords = zone.coordinates + [zone.coordinates[0]]
-        xs, ys = zip(*coords)
-        plt.plot(xs, ys, 'r--', label='No-Fly Zone' if i == 0 else "")
-    # Rotaları çiz
-    colors = ['orange', 'purple', 'brown', 'cyan', 'magenta', 'black']
+ROUTE_COLORS = ['orange', 'purple', 'brown', 'cyan', 'magenta', 'black']
+# Bundan fazla rotalı drone varsa lejantta drone başına satır yerine tek "Rotalar" satırı gösterilir
+MAX_ROUTE_LEGEND = 12
+
+def route_segments(drones: List[Drone], deliveries: List[DeliveryPoint], solution: Dict[int, List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tüm rota bacaklarını tek dizide toplar.
+    Dönüş: (S, 2, 2) bacak uçları ve her bacağın renk indeksi (çözümdeki drone sırası)
+    """
+    delivery_pos = {d.id: d.pos for d in deliveries}
+    start_pos = {d.id: d.start_pos for d in drones}
+    segments, colors = [], []
     for idx, (drone_id, route) in enumerate(solution.items()):
         if not route:
             continue
-        drone = next(d for d in drones if d.id == drone_id)
-        x, y = drone.start_pos
-        for delivery_id in route:
-            delivery = delivery_map[delivery_id]
-            plt.plot([x, delivery.pos[0]], [y, delivery.pos[1]], '-', color=colors[idx % len(colors)], linewidth=2, label=f"Drone {drone_id} Route" if delivery_id == route[0] else "")
-            x, y = delivery.pos
-    plt.xlabel('X')
-    plt.ylabel('Y')
-    plt.title('Drone Teslimat Rotaları ve No-Fly Zone Görselleştirmesi')
-    handles, labels = plt.gca().get_legend_handles_labels()
-    by_label = dict(zip(labels, handles))
-    plt.legend(by_label.values(), by_label.keys())
-    plt.grid(True)
-    plt.axis('equal')
-    plt.show() 
\ No newline at end of file
+        points = np.array([start_pos[drone_id]] + [delivery_pos[x] for x in route], dtype=float)
+        segments.append(np.stack((points[:-1], points[1:]), axis=1))
+        colors.append(np.full(len(route), idx))
+    if not segments:
+        return np.zeros((0, 2, 2)), np.zeros(0, dtype=np.int64)
+    return np.concatenate(segments), np.concatenate(colors)
+
+def draw_solution(ax, drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], solution: Dict[int, List[int]], route_alpha: float = 1.0):
+    """
+    Çözümü verilen eksene çizer: noktalar tek scatter, rotalar tek LineCollection, zone'lar tek PolyCollection.
+    Dönüş: (zone koleksiyonu, rota koleksiyonu)
+    """
+    zones = PolyCollection([zone.coordinates for zone in noflyzones], facecolors='none', edgecolors='red', linestyles='--', label='No-Fly Zone')
+    ax.add_collection(zones)
+    segments, color_index = route_segments(drones, deliveries, solution)
+    routes = LineCollection(segments, colors=[ROUTE_COLORS[i % len(ROUTE_COLORS)] for i in color_index], linewidths=2, alpha=route_alpha)
+    ax.add_collection(routes)
+    if drones:
+        ax.scatter(*np.array([d.start_pos for d in drones], dtype=float).T, c='blue', marker='s', s=100, label='Drone Start')
+    if deliveries:
+        ax.scatter(*np.array([d.pos for d in deliveries], dtype=float).T, c='green', marker='o', s=80, label='Delivery')
+    handles, labels = ax.get_legend_handles_labels()
+    routed = [(idx, drone_id) for idx, (drone_id, route) in enumerate(solution.items()) if route]
+    if len(routed) <= MAX_ROUTE_LEGEND:
+        handles += [Line2D([], [], color=ROUTE_COLORS[idx % len(ROUTE_COLORS)], linewidth=2) for idx, _ in routed]
+        labels += [f"Drone {drone_id} Route" for _, drone_id in routed]
+    else:
+        handles.append(Line2D([], [], color=ROUTE_COLORS[0], linewidth=2))
+        labels.append("Rotalar")
+    ax.legend(handles, labels)
+    ax.set_xlabel('X')
+    ax.set_ylabel('Y')
+    ax.set_title('Drone Teslimat Rotaları ve No-Fly Zone Görselleştirmesi')
+    ax.grid(True)
+    ax.autoscale_view()
+    ax.set_aspect('equal', adjustable='datalim')
+    return zones, routes
+
+def plot_solution(drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], solution: Dict[int, List[int]], output: Optional[str] = None, dpi: int = 100):
+    """
+    output verilirse grafik pencere açılmadan Agg ile bu dosyaya kaydedilir (biçim uzantıdan: .png, .svg, ...);
+    verilmezse pyplot penceresinde gösterilir.
+    """
+    if output is not None:
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        draw_solution(fig.add_subplot(), drones, deliveries, noflyzones, solution)
+        fig.savefig(output, dpi=dpi)
+        return
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    draw_solution(ax, drones, deliveries, noflyzones, solution)
+    plt.show()
+
+def render_frames(drones: List[Drone], deliveries: List[DeliveryPoint], noflyzones: List[NoFlyZone], solution: Dict[int, List[int]], directory: str, frames: int = 60, scenario=None, dpi: int = 100) -> List[str]:
+    """
+    Drone'ların zaman içindeki ilerleyişini PNG kareleri olarak directory'ye yazar.
+    Şekil bir kez kurulur; her karede yalnızca drone konumları, etkin zone'lar ve başlık güncellenir.
+    Konumlar simülasyondaki varış zamanları arasında doğrusal enterpolasyonla bulunur.
+    Dönüş: yazılan dosyaların listesi
+    """
+    from genetic import simulate_chromosome
+    from scenario import compile_scenario, US_PER_MINUTE
+    from zone_index import time_to_minutes
+    if scenario is None:
+        scenario = compile_scenario(drones, deliveries, noflyzones)
+    routes = simulate_chromosome(solution, drones, deliveries, noflyzones, scenario=scenario).routes
+    positions = scenario.cache.positions
+    tracks = [(np.array(route.times, dtype=float) / US_PER_MINUTE, positions[route.nodes]) for route in routes]
+    start = float(scenario.ready_minute.min()) if len(routes) else scenario.start_minute
+    end = max([times[-1] for times, _ in tracks] + [start + 1])
+    active = np.array([(time_to_minutes(z.active_time[0]), time_to_minutes(z.active_time[1])) for z in noflyzones], dtype=float).reshape(len(noflyzones), 2)
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    zones, _ = draw_solution(ax, drones, deliveries, noflyzones, solution, route_alpha=0.3)
+    markers = ax.scatter(np.zeros(len(tracks)), np.zeros(len(tracks)), c='red', marker='^', s=120, zorder=5)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for frame, t in enumerate(np.linspace(start, end, frames)):
+        current = [(np.interp(t, times, points[:, 0]), np.interp(t, times, points[:, 1])) for times, points in tracks]
+        markers.set_offsets(np.array(current, dtype=float).reshape(len(tracks), 2))
+        on = (active[:, 0] <= t) & (t < active[:, 1])
+        zones.set_facecolors([(1.0, 0.0, 0.0, 0.25 if a else 0.0) for a in on])
+        ax.set_title(f"{int(t) // 60:02d}:{int(t) % 60:02d}")
+        path = os.path.join(directory, f"frame_{frame:04d}.png")
+        fig.savefig(path, dpi=dpi)
+        paths.append(path)
+    return paths
@@ -0,0 +1,175 @@
+import math
+import numpy as np
+from collections import defaultdict
+from typing import List, Optional, Tuple
+from drone import NoFlyZone
+
+def time_to_minutes(timestr: str) -> int:
+    """"HH:MM" -> gece yarısından itibaren dakika."""
+    hours, minutes = timestr.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def _ccw(ax, ay, bx, by, cx, cy):
+    # graph_utils.ccw ile birebir aynı karşılaştırma, dizi üzerinde
+    return (cy - ay) * (bx - ax) > (by - ay) * (cx - ax)
+
+def segments_cross_polygon(ax, ay, bx, by, coords: List[Tuple[float, float]]) -> np.ndarray:
+    """
+    A -> B doğru parçalarının (yayınlanabilir diziler) çokgen kenarlarından birini kesip kesmediği.
+    graph_utils.segments_intersect ile aynı sonucu verir.
+    """
+    result = np.zeros(np.broadcast(ax, ay, bx, by).shape, dtype=bool)
+    n = len(coords)
+    for k in range(n):
+        cx, cy = coords[k]
+        dx, dy = coords[(k + 1) % n]
+        result |= ((_ccw(ax, ay, cx, cy, dx, dy) != _ccw(bx, by, cx, cy, dx, dy))
+                   & (_ccw(ax, ay, bx, by, cx, cy) != _ccw(ax, ay, bx, by, dx, dy)))
+    return result
+
+class NoFlyZoneIndex:
+    """
+    No-fly zone'lar için uzay-zaman indeksi.
+    Uzay: zone sınır kutuları düzenli bir ızgaraya yerleştirilir; bir sorgu yalnızca
+    doğru parçasının kutusunun değdiği hücrelerdeki adaylara bakar.
+    Zaman: zone, active_time aralığında [başlangıç, bitiş) etkindir (dakika cinsinden).
+    t verilmeyen sorgular zamandan bağımsızdır (her zone etkin sayılır).
+    """
+
+    def __init__(self, noflyzones: List[NoFlyZone], cell_size: Optional[float] = None):
+        self.zones = noflyzones
+        self.coordinates = [list(zone.coordinates) for zone in noflyzones]
+        self.bbox = np.array([(min(x for x, _ in c), min(y for _, y in c), max(x for x, _ in c), max(y for _, y in c))
+                              for c in self.coordinates], dtype=float).reshape(len(noflyzones), 4)
+        self.active = np.array([(time_to_minutes(z.active_time[0]), time_to_minutes(z.active_time[1])) for z in noflyzones],
+                               dtype=float).reshape(len(noflyzones), 2)
+        if cell_size is None:
+            extents = np.concatenate((self.bbox[:, 2] - self.bbox[:, 0], self.bbox[:, 3] - self.bbox[:, 1]))
+            cell_size = float(extents.mean()) if len(extents) and extents.mean() > 0 else 1.0
+        self.cell_size = cell_size
+        self.grid = defaultdict(list)
+        for z, (x1, y1, x2, y2) in enumerate(self.bbox):
+            for cx in range(self._cell(x1), self._cell(x2) + 1):
+                for cy in range(self._cell(y1), self._cell(y2) + 1):
+                    self.grid[(cx, cy)].append(z)
+
+    def __len__(self):
+        return len(self.zones)
+
+    def _cell(self, value: float) -> int:
+        return math.floor(value / self.cell_size)
+
+    def candidates(self, a: Tuple[float, float], b: Tuple[float, float]) -> List[int]:
+        """Sınır kutusu A -> B doğru parçasının kutusuyla çakışan zone indeksleri."""
+        x1, x2 = min(a[0], b[0]), max(a[0], b[0])
+        y1, y2 = min(a[1], b[1]), max(a[1], b[1])
+        cx1, cx2, cy1, cy2 = self._cell(x1), self._cell(x2), self._cell(y1), self._cell(y2)
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(self.grid):
+            cells = [zones for (cx, cy), zones in self.grid.items() if cx1 <= cx <= cx2 and cy1 <= cy <= cy2]
+        else:
+            cells = [self.grid[(cx, cy)] for cx in range(cx1, cx2 + 1) for cy in range(cy1, cy2 + 1) if (cx, cy) in self.grid]
+        found = set()
+        for zones in cells:
+            found.update(zones)
+        bbox = self.bbox
+        return [z for z in sorted(found)
+                if bbox[z, 0] <= x2 and bbox[z, 2] >= x1 and bbox[z, 1] <= y2 and bbox[z, 3] >= y1]
+
+    def is_active(self, zone: int, t: Optional[float], until: Optional[float] = None) -> bool:
+        """Zone t anında (until verilirse [t, until] aralığının herhangi bir anında) etkin mi?"""
+        if t is None:
+            return True
+        return self.active[zone, 0] <= (t if until is None else until) and t < self.active[zone, 1]
+
+    def crosses(self, a: Tuple[float, float], b: Tuple[float, float], t: Optional[float] = None, until: Optional[float] = None) -> bool:
+        """
+        A -> B doğru parçası t anında (dakika) etkin bir zone'u kesiyor mu?
+        until verilirse [t, until] uçuş aralığında etkin olan (uçuş ortasında açılan) zone'lar da sayılır.
+        """
+        for z in self.candidates(a, b):
+            if self.is_active(z, t, until) and segments_cross_polygon(a[0], a[1], b[0], b[1], self.coordinates[z]):
+                return True
+        return False
+
+    def zone_crossing_pairs(self, positions: np.ndarray, zone: int, chunk: int = 1 << 22) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        positions düğümleri arasında zone'u kesen (i, j) çiftleri.
+        Düğümler zone'un sınır kutusuna göre 3x3 bölgeye ayrılır; iki ucu da kutunun aynı dış tarafında
+        kalan bölge çiftleri hiç üretilmez. Kalan adaylar parça parça (en fazla chunk çift) önce ucuz
+        doğru-kutu testinden (kutunun dört köşesi doğrunun aynı tarafındaysa kesişim yok), sonra ccw testinden geçer.
+        """
+        x1, y1, x2, y2 = self.bbox[zone]
+        px, py = positions[:, 0], positions[:, 1]
+        column = (px >= x1).astype(np.int64) + (px > x2)   # 0: solda, 1: kutu hizasında, 2: sağda
+        row = (py >= y1).astype(np.int64) + (py > y2)
+        groups = [np.flatnonzero(column * 3 + row == region) for region in range(9)]
+        corners = ((x1, y1), (x2, y1), (x2, y2), (x1, y2))
+        src_hits, dst_hits = [], []
+        for a in range(9):
+            for b in range(9):
+                (ca, ra), (cb, rb) = divmod(a, 3), divmod(b, 3)
+                if (ca == cb != 1) or (ra == rb != 1) or len(groups[a]) == 0 or len(groups[b]) == 0:
+                    continue
+                step = max(1, chunk // len(groups[b]))
+                for lo in range(0, len(groups[a]), step):
+                    sources = groups[a][lo:lo + step]
+                    src = np.repeat(sources, len(groups[b]))
+                    dst = np.tile(groups[b], len(sources))
+                    ax, ay, dx, dy = px[src], py[src], px[dst] - px[src], py[dst] - py[src]
+                    side = [dx * (cy - ay) - dy * (cx - ax) for cx, cy in corners]
+                    keep = (np.minimum(np.minimum(side[0], side[1]), np.minimum(side[2], side[3])) <= 0) & \
+                           (np.maximum(np.maximum(side[0], side[1]), np.maximum(side[2], side[3])) >= 0)
+                    src, dst = src[keep], dst[keep]
+                    hit = segments_cross_polygon(px[src], py[src], px[dst], py[dst], self.coordinates[zone])
+                    src_hits.append(src[hit])
+                    dst_hits.append(dst[hit])
+        if not src_hits:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(src_hits), np.concatenate(dst_hits)
+
+    def contains(self, x, y, t: Optional[float] = None) -> np.ndarray:
+        """(x, y) noktaları t anında etkin bir zone'un içinde mi (çift-tek kuralı, vektörel)."""
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        result = np.zeros(len(x), dtype=bool)
+        for z, (x1, y1, x2, y2) in enumerate(self.bbox):
+            if not self.is_active(z, t):
+                continue
+            idx = np.flatnonzero((x >= x1) & (x <= x2) & (y >= y1) & (y <= y2) & ~result)
+            if len(idx) == 0:
+                continue
+            px, py = x[idx], y[idx]
+            inside = np.zeros(len(idx), dtype=bool)
+            coords = self.coordinates[z]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for (ax, ay), (bx, by) in zip(coords, coords[1:] + coords[:1]):
+                    inside ^= ((ay > py) != (by > py)) & (px < (bx - ax) * (py - ay) / (by - ay) + ax)
+            result[idx] = inside
+        return result
+
+    def segments_cross(self, ax, ay, bx, by, t: Optional[float] = None) -> np.ndarray:
+        """
+        Çok sayıda A -> B doğru parçası için vektörel sorgu (t anında etkin zone'lar).
+        Parçalar orta noktalarının x'ine göre sıralanır; her zone yalnızca x aralığına
+        düşebilecek parçaları inceler.
+        """
+        ax, ay, bx, by = (np.asarray(v, dtype=float) for v in (ax, ay, bx, by))
+        result = np.zeros(len(ax), dtype=bool)
+        if len(ax) == 0:
+            return result
+        mid = (ax + bx) / 2
+        half = float(np.abs(ax - bx).max()) / 2
+        order = np.argsort(mid, kind="stable")
+        sorted_mid = mid[order]
+        for z, (x1, y1, x2, y2) in enumerate(self.bbox):
+            if not self.is_active(z, t):
+                continue
+            lo = np.searchsorted(sorted_mid, x1 - half, side="left")
+            hi = np.searchsorted(sorted_mid, x2 + half, side="right")
+            idx = order[lo:hi]
+            idx = idx[~result[idx]]
+            sx1, sx2 = np.minimum(ax[idx], bx[idx]), np.maximum(ax[idx], bx[idx])
+            sy1, sy2 = np.minimum(ay[idx], by[idx]), np.maximum(ay[idx], by[idx])
+            idx = idx[(sx1 <= x2) & (sx2 >= x1) & (sy1 <= y2) & (sy2 >= y1)]
+            result[idx] = segments_cross_polygon(ax[idx], ay[idx], bx[idx], by[idx], self.coordinates[z])
+        return result